@@ -0,0 +1,14 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+"""
+Benchmark suite of pandapipes for airspeed velocity (asv), configured in asv.conf.json in the
+root directory of the repository. Typical calls are
+
+    asv run --quick --bench PipeflowModes     (single run of the pipeflow benchmarks)
+    asv continuous develop HEAD               (compare the current state with develop)
+
+The time_* benchmarks measure the runtime, the peakmem_* benchmarks the peak memory of the
+benchmark process.
+"""
@@ -0,0 +1,21 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import os
+
+from pandapipes.converter.stanet import stanet_to_pandapipes
+from pandapipes.test import test_path
+
+STANET_FILE = os.path.join(test_path, "converter", "converter_test_files", "Exampelonia_mini.csv")
+
+
+class StanetConverter:
+    """Runtime and peak memory of the STANET converter."""
+    timeout = 600
+
+    def time_stanet_to_pandapipes(self):
+        stanet_to_pandapipes(STANET_FILE, add_layers=False)
+
+    def peakmem_stanet_to_pandapipes(self):
+        stanet_to_pandapipes(STANET_FILE, add_layers=False)
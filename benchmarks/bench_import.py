@@ -0,0 +1,27 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+
+class Import:
+    """
+    Startup time of a fresh python process. The timeraw_* benchmarks return code that asv runs in
+    a new interpreter, so that modules imported by other benchmarks are not already loaded.
+    """
+    timeout = 600
+
+    def timeraw_import_pandapipes(self):
+        return "import pandapipes"
+
+    def timeraw_import_pipeflow(self):
+        return "from pandapipes import from_json, pipeflow"
+
+    def timeraw_import_plotting(self):
+        return "import pandapipes.plotting"
+
+    def timeraw_first_pipeflow(self):
+        return """
+        import pandapipes
+        from pandapipes.networks import simple_water_networks
+        pandapipes.pipeflow(simple_water_networks.water_meshed_delta())
+        """
@@ -0,0 +1,35 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import os
+import tempfile
+
+import pandapipes
+from .common import water_net
+
+
+class JsonIO:
+    """Runtime and peak memory of saving and loading nets in the json format."""
+    params = [1000, 10000, 100000]
+    param_names = ["n_branches"]
+    timeout = 1800
+
+    def setup(self, n_branches):
+        self.net = water_net(n_branches)
+        pandapipes.pipeflow(self.net)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp_dir.name, "net.json")
+        pandapipes.to_json(self.net, self.filename)
+
+    def teardown(self, n_branches):
+        self.tmp_dir.cleanup()
+
+    def time_to_json(self, n_branches):
+        pandapipes.to_json(self.net)
+
+    def time_from_json(self, n_branches):
+        pandapipes.from_json(self.filename)
+
+    def peakmem_from_json(self, n_branches):
+        pandapipes.from_json(self.filename)
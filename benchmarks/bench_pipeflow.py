@@ -0,0 +1,42 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import pandapipes
+from .common import SIZES, heat_net, hydraulic_solution
+
+
+class PipeflowModes:
+    """Runtime and peak memory of the pipeflow in all calculation modes."""
+    params = (SIZES, ["hydraulics", "heat", "sequential", "bidirectional"], [True, False])
+    param_names = ["n_branches", "mode", "use_numba"]
+    timeout = 3600
+
+    def setup(self, n_branches, mode, use_numba):
+        self.net = heat_net(n_branches)
+        self.sol_vec = hydraulic_solution(self.net, use_numba) if mode == "heat" else None
+        # first call, so that numba compilation is not timed
+        self.run(mode, use_numba)
+
+    def run(self, mode, use_numba):
+        pandapipes.pipeflow(self.net, sol_vec=self.sol_vec, mode=mode, use_numba=use_numba,
+                            max_iter_hyd=30, max_iter_therm=30, max_iter_bidirect=30)
+
+    def time_pipeflow(self, n_branches, mode, use_numba):
+        self.run(mode, use_numba)
+
+    def peakmem_pipeflow(self, n_branches, mode, use_numba):
+        self.run(mode, use_numba)
+
+
+class PipeflowSetup:
+    """Runtime of the pipeflow setup (options, lookups and internal tables) without solving."""
+    params = SIZES
+    param_names = ["n_branches"]
+    timeout = 3600
+
+    def setup(self, n_branches):
+        self.net = heat_net(n_branches)
+
+    def time_setup(self, n_branches):
+        pandapipes.PipeflowSession(self.net)
@@ -0,0 +1,43 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import numpy as np
+import pandas as pd
+from pandapower.control import ConstControl
+from pandapower.timeseries import DFData, OutputWriter
+
+from pandapipes.timeseries import run_timeseries
+from .common import water_net
+
+N_TIME_STEPS = 24
+
+
+class TimeSeries:
+    """Runtime and peak memory of a time series calculation with constant controllers."""
+    params = ([1000, 10000, 100000], ["hydraulics", "sequential"])
+    param_names = ["n_branches", "mode"]
+    timeout = 3600
+
+    def setup(self, n_branches, mode):
+        self.net = water_net(n_branches)
+        rng = np.random.default_rng(0)
+        profiles = pd.DataFrame(
+            rng.uniform(0.5, 1.5, (N_TIME_STEPS, len(self.net.sink)))
+            * self.net.sink.mdot_kg_per_s.values,
+            columns=self.net.sink.index.astype(str))
+        ConstControl(self.net, element="sink", variable="mdot_kg_per_s",
+                     element_index=self.net.sink.index.values, data_source=DFData(profiles),
+                     profile_name=self.net.sink.index.astype(str))
+        OutputWriter(self.net, range(N_TIME_STEPS), output_path=None,
+                     log_variables=[("res_junction", "p_bar"), ("res_pipe", "v_mean_m_per_s")])
+
+    def run(self, mode):
+        run_timeseries(self.net, range(N_TIME_STEPS), verbose=False, mode=mode,
+                       max_iter_hyd=30, max_iter_therm=30)
+
+    def time_run_timeseries(self, n_branches, mode):
+        self.run(mode)
+
+    def peakmem_run_timeseries(self, n_branches, mode):
+        self.run(mode)
@@ -0,0 +1,54 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import numpy as np
+
+import pandapipes
+from pandapipes.idx_branch import MDOTINIT
+from pandapipes.idx_node import PINIT
+from pandapipes.networks import synthetic_heat_network, synthetic_water_network
+
+# number of branches of the synthetic networks used in the benchmarks
+SIZES = [1000, 10000, 100000, 1000000]
+
+
+def heat_net(n_branches):
+    """
+    Creates a synthetic district heating network with approximately the given number of
+    branches (flow and return pipes and heat consumers), which can be calculated in all modes.
+
+    :param n_branches: approximate number of branches
+    :type n_branches: int
+    :return: net - the district heating network
+    :rtype: pandapipesNet
+    """
+    return synthetic_heat_network(n_branches // 3, loop_ratio=0.05, seed=0)
+
+
+def water_net(n_branches):
+    """
+    Creates a synthetic water distribution network with approximately the given number of pipes.
+
+    :param n_branches: approximate number of pipes
+    :type n_branches: int
+    :return: net - the water network
+    :rtype: pandapipesNet
+    """
+    return synthetic_water_network(int(n_branches / 1.2), loop_ratio=0.2, seed=0)
+
+
+def hydraulic_solution(net, use_numba=True):
+    """
+    Calculates the hydraulics of a net and returns the solution vector that is required for a
+    pipeflow in "heat" mode.
+
+    :param net: the net to calculate
+    :type net: pandapipesNet
+    :param use_numba: option "use_numba" of the pipeflow
+    :type use_numba: bool, default True
+    :return: sol_vec - pressures of all nodes and mass flows of all branches
+    :rtype: numpy.ndarray
+    """
+    pandapipes.pipeflow(net, mode="hydraulics", use_numba=use_numba)
+    return np.concatenate([net["_pit"]["node"][:, PINIT], net["_pit"]["branch"][:, MDOTINIT]])
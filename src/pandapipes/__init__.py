@@ -9,6 +9,7 @@ __format_version__ = '0.11.0'
 
 import pandas as pd
 import os
+from importlib import import_module
 
 pd.options.mode.chained_assignment = None  # default='warn'
 pp_dir = os.path.dirname(os.path.realpath(__file__))
@@ -17,7 +18,27 @@ from pandapipes.properties.fluids import *
 from pandapipes.create import *
 from pandapipes.io.file_io import *
 from pandapipes.pipeflow import *
+from pandapipes.pipeflow_session import *
 from pandapipes.toolbox import *
 from pandapipes.pf.pipeflow_setup import *
 from pandapipes.std_types import *
-import pandapipes.plotting
+from pandapipes.warmup import warmup
+
+# subpackages with heavy dependencies (matplotlib, networkx) are only imported when they are
+# accessed for the first time (PEP 562)
+_LAZY_SUBMODULES = ("control", "converter", "multinet", "plotting", "timeseries", "topology")
+_LAZY_ATTRIBUTES = {"create_nxgraph": "pandapipes.topology", "has_path": "networkx"}
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return import_module("%s.%s" % (__name__, name))
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_SUBMODULES) | set(_LAZY_ATTRIBUTES))
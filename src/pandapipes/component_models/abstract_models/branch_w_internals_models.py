@@ -88,6 +88,13 @@ class BranchWInternalsComponent(BranchComponent):
         internal_nodes = cls.get_internal_pipe_number(net) - 1
         end = current_start
         ft_lookups[cls.table_name()] = None
+        # CSR like offsets of the sections of each branch (in the order of the table) within the
+        # branch pit entries of this component, i.e. the sections of the i-th branch are the
+        # entries offsets[i]:offsets[i + 1]
+        section_offsets = np.zeros(len(internal_nodes) + 1, dtype=np.int64)
+        np.cumsum(internal_nodes + 1, out=section_offsets[1:])
+        internal_nodes_lookup.setdefault("section_offsets", dict())[cls.table_name()] = \
+            section_offsets
         if np.any(internal_nodes > 0):
             int_nodes_num = int(np.sum(internal_nodes))
             internal_pipes = internal_nodes + 1
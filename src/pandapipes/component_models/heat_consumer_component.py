@@ -15,6 +15,7 @@ from pandapipes.idx_node import TINIT
 from pandapipes.pf.internals_toolbox import get_from_nodes_corrected
 from pandapipes.pf.pipeflow_setup import get_lookup
 from pandapipes.pf.result_extraction import extract_branch_results_without_internals
+from pandapipes.properties.fluids import get_fluid_property_cache
 from pandapipes.properties.properties_toolbox import get_branch_cp
 
 try:
@@ -128,7 +129,7 @@ class HeatConsumer(BranchWZeroLengthComponent):
 
         mask = consumer_array[:, cls.MODE] == cls.QE_DT
         if np.any(mask):
-            cp = get_branch_cp(get_fluid(net), node_pit, hc_pit[mask])
+            cp = get_branch_cp(get_fluid_property_cache(net), node_pit, hc_pit[mask])
             deltat = consumer_array[mask, cls.DELTAT]
             mass = hc_pit[mask, QEXT] / (cp * deltat)
             hc_pit[mask, MDOTINIT] = mass
@@ -164,7 +165,7 @@ class HeatConsumer(BranchWZeroLengthComponent):
 
         mask = consumer_array[:, cls.MODE] == cls.QE_TR
         if np.any(mask):
-            cp = get_branch_cp(get_fluid(net), node_pit, hc_pit)
+            cp = get_branch_cp(get_fluid_property_cache(net), node_pit, hc_pit)
             from_nodes = get_from_nodes_corrected(hc_pit)
             t_in = node_pit[from_nodes, TINIT]
             t_out = hc_pit[:, TOUTINIT]
@@ -184,13 +185,13 @@ class HeatConsumer(BranchWZeroLengthComponent):
         consumer_array = get_component_array(net, cls.table_name(), mode='heat_transfer')
         mask = consumer_array[:, cls.MODE] == cls.MF_DT
         if np.any(mask):
-            cp = get_branch_cp(get_fluid(net), node_pit, hc_pit)
+            cp = get_branch_cp(get_fluid_property_cache(net), node_pit, hc_pit)
             q_ext = cp[mask] * hc_pit[mask, MDOTINIT] * consumer_array[mask, cls.DELTAT]
             hc_pit[mask, QEXT] = q_ext
 
         mask = consumer_array[:, cls.MODE] == cls.MF_TR
         if np.any(mask):
-            cp = get_branch_cp(get_fluid(net), node_pit, hc_pit)
+            cp = get_branch_cp(get_fluid_property_cache(net), node_pit, hc_pit)
             from_nodes = get_from_nodes_corrected(hc_pit[mask])
             t_in = node_pit[from_nodes, TINIT]
             t_out = consumer_array[mask, cls.TRETURN]
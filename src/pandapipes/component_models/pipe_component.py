@@ -2,12 +2,11 @@
 # and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
-import matplotlib.pyplot as plt
 import numpy as np
 from numpy import dtype
 
 from pandapipes.component_models.abstract_models import BranchWInternalsComponent
-from pandapipes.component_models.component_toolbox import set_entry_check_repeat
+from pandapipes.component_models.component_toolbox import set_entry_check_repeat, vrange
 from pandapipes.component_models.junction_component import Junction
 from pandapipes.constants import NORMAL_TEMPERATURE, NORMAL_PRESSURE
 from pandapipes.idx_branch import FROM_NODE, TO_NODE, LENGTH, D, AREA, K, \
@@ -171,10 +170,12 @@ class Pipe(BranchWInternalsComponent):
         :return: pipe_results
         :rtype:
         """
-        internal_sections = cls.get_internal_pipe_number(net)
+        tbl = cls.table_name()
+        positions = net[tbl].index.get_indexer(pipe)
+        internal_sections = cls.get_internal_pipe_number(net)[positions].astype(np.int64)
         internal_p_nodes = internal_sections - 1
-        p_node_idx = np.repeat(pipe, internal_p_nodes[pipe])
-        v_pipe_idx = np.repeat(pipe, internal_sections[pipe])
+        p_node_idx = np.repeat(pipe, internal_p_nodes)
+        v_pipe_idx = np.repeat(pipe, internal_sections)
         pipe_results = dict()
         pipe_results["PINIT"] = np.zeros((len(p_node_idx), 2), dtype=np.float64)
         pipe_results["TINIT"] = np.zeros((len(p_node_idx), 2), dtype=np.float64)
@@ -182,25 +183,18 @@ class Pipe(BranchWInternalsComponent):
         pipe_results["VINIT_TO"] = np.zeros((len(v_pipe_idx), 2), dtype=np.float64)
         pipe_results["VINIT_MEAN"] = np.zeros((len(v_pipe_idx), 2), dtype=np.float64)
 
-        if np.all(internal_sections[pipe] >= 2):
+        if np.all(internal_sections >= 2):
             fluid = get_fluid(net)
-            f, t = get_lookup(net, "branch", "from_to")[cls.table_name()]
+            f, t = get_lookup(net, "branch", "from_to")[tbl]
             pipe_pit = net["_pit"]["branch"][f:t, :]
             node_pit = net["_pit"]["node"]
-            int_p_lookup = net["_lookups"]["internal_nodes_lookup"]["TPINIT"]
-            int_v_lookup = net["_lookups"]["internal_nodes_lookup"]["VINIT"]
-
-            selected_indices_p = []
-            selected_indices_v = []
-            for i in pipe:
-                selected_indices_p.append(np.where(int_p_lookup[:, 0] == i, True, False))
-                selected_indices_v.append(np.where(int_v_lookup[:, 0] == i, True, False))
-
-            selected_indices_p_final = np.logical_or.reduce(selected_indices_p[:])
-            selected_indices_v_final = np.logical_or.reduce(selected_indices_v[:])
+            section_offsets = net["_lookups"]["internal_nodes_lookup"]["section_offsets"][tbl]
+            f_nodes = get_lookup(net, "node", "from_to")[cls.internal_node_name()][0]
 
-            p_nodes = int_p_lookup[:, 1][selected_indices_p_final]
-            m_nodes = int_v_lookup[:, 1][selected_indices_v_final]
+            # the sections of each pipe are consecutive entries of the pipe pit, the internal
+            # nodes are consecutive entries of the node pit (one less per pipe than sections)
+            m_nodes = vrange(section_offsets[positions], internal_sections)
+            p_nodes = vrange(f_nodes + section_offsets[positions] - positions, internal_p_nodes)
 
             v_pipe_data = pipe_pit[m_nodes, MDOTINIT] / fluid.get_density(NORMAL_TEMPERATURE) / pipe_pit[m_nodes, AREA]
             p_node_data = node_pit[p_nodes, PINIT]
@@ -315,6 +309,7 @@ class Pipe(BranchWInternalsComponent):
         :type pipe_results:
         :return: No Output.
         """
+        import matplotlib.pyplot as plt
         pipe_p_data_idx = np.where(pipe_results["PINIT"][:, 0] == pipe)
         pipe_v_data_idx = np.where(pipe_results["VINIT_MEAN"][:, 0] == pipe)
         pipe_p_data = pipe_results["PINIT"][pipe_p_data_idx, 1]
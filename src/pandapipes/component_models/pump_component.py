@@ -17,6 +17,8 @@ from pandapipes.idx_branch import MDOTINIT, D, AREA, LOSS_COEFFICIENT as LC, FRO
 from pandapipes.idx_node import PINIT, PAMB, TINIT as TINIT_NODE
 from pandapipes.pf.pipeflow_setup import get_fluid, get_net_option, get_lookup
 from pandapipes.pf.result_extraction import extract_branch_results_without_internals
+from pandapipes.std_types.std_type_class import PumpStdType, get_pump_curve_coefficients, \
+    calc_pump_pressure
 
 try:
     import pandaplan.core.pplog as logging
@@ -113,10 +115,20 @@ class Pump(BranchWZeroLengthComponent):
             v_from = v_mps
         vol = v_from * area
         if len(std_types):
-            fcts = itemgetter(*std_types)(net['std_types']['pump'])
-            fcts = [fcts] if not isinstance(fcts, tuple) else fcts
-            pl = np.array(list(map(lambda x, y: x.get_pressure(y), fcts, vol)))
-            pump_branch_pit[:, PL] = pl
+            pump_std_types = [net['std_types']['pump'][name]
+                              for name in get_std_type_lookup(net, cls.table_name())]
+            if all(type(st).get_pressure is PumpStdType.get_pressure for st in pump_std_types):
+                # all pump curves are evaluated at once, grouped by their std type
+                if np.any(vol < 0):
+                    logger.debug("Reverse flow observed in %d pumps. Bypassing without pressure "
+                                 "change is assumed" % np.sum(vol < 0))
+                pump_branch_pit[:, PL] = calc_pump_pressure(
+                    get_pump_curve_coefficients(pump_std_types), idx, vol)
+            else:
+                fcts = itemgetter(*std_types)(net['std_types']['pump'])
+                fcts = [fcts] if not isinstance(fcts, tuple) else fcts
+                pl = np.array(list(map(lambda x, y: x.get_pressure(y), fcts, vol)))
+                pump_branch_pit[:, PL] = pl
 
     @classmethod
     def extract_results(cls, net, options, branch_results, mode):
@@ -2,8 +2,33 @@
 # and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
-from pandapipes.multinet.control.controller import *
-from pandapipes.multinet.control.run_control_multinet import run_control
-from pandapipes.multinet.timeseries.run_time_series_multinet import run_timeseries
+from importlib import import_module
+
 from pandapipes.multinet.create_multinet import *
 from pandapipes.multinet.multinet import *
+
+# the control and time series functions are only imported when they are used for the first time
+# (PEP 562), as they import the control and time series modules of pandapipes and pandapower
+_LAZY_SUBMODULES = ("control", "timeseries")
+_LAZY_ATTRIBUTES = {
+    "run_control": "pandapipes.multinet.control.run_control_multinet",
+    "run_timeseries": "pandapipes.multinet.timeseries.run_time_series_multinet",
+    **{name: "pandapipes.multinet.control.controller.multinet_control" for name in [
+        "P2GControlMultiEnergy", "G2PControlMultiEnergy", "GasToGasConversion",
+        "coupled_p2g_const_control", "coupled_g2p_const_control", "ConstControl", "Controller",
+        "InvalidIndexError", "get_fluid"]}
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return import_module("%s.%s" % (__name__, name))
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_SUBMODULES) | set(_LAZY_ATTRIBUTES))
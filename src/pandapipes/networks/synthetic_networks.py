@@ -0,0 +1,275 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import numpy as np
+
+from pandapipes.create import create_empty_network, create_junctions, \
+    create_pipes_from_parameters, create_ext_grid, create_sinks, create_pressure_controls, \
+    create_heat_consumers, create_circ_pump_const_pressure
+from pandapipes.properties.fluids import get_fluid
+
+# minimum pipe diameter of the synthetic networks
+MIN_DIAMETER_M = 0.05
+
+
+def _random_tree(n_junctions, rng):
+    """
+    Returns the parents of a random recursive tree: junction i (i > 0) is connected to a random
+    junction with a smaller index.
+    """
+    return np.floor(rng.random(n_junctions - 1) * np.arange(1, n_junctions)).astype(np.int64)
+
+
+def _subtree_loads(parents, loads):
+    """
+    Sums up the loads of all junctions downstream of each junction of a tree (the parent of a
+    junction always has a smaller index).
+    """
+    subtree = np.array(loads, dtype=np.float64)
+    for child in range(len(parents), 0, -1):
+        subtree[parents[child - 1]] += subtree[child]
+    return subtree
+
+
+def _loop_pipes(parents, loop_ratio, rng):
+    """
+    Returns pairs of junctions which close loops in a tree. The number of pairs is loop_ratio
+    times the number of tree pipes. To keep the loops local (as in real grids, which also keeps
+    the fill-in of the factorized system matrix low), a random junction is connected to another
+    child of its grandparent or of its parent.
+    """
+    n_junctions = len(parents) + 1
+    parent = np.r_[-1, parents]
+    candidates = np.nonzero(parent > 0)[0]
+    n_loops = min(int(round(loop_ratio * (n_junctions - 1))), len(candidates))
+    if n_loops == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    children = np.argsort(parents, kind="stable") + 1
+    first_child = np.r_[0, np.cumsum(np.bincount(parents, minlength=n_junctions))]
+    from_junctions, to_junctions = [], []
+    for junction in rng.choice(candidates, n_loops, replace=False):
+        neighbours = np.concatenate([
+            children[first_child[parent[parent[junction]]]:
+                     first_child[parent[parent[junction]] + 1]],
+            children[first_child[parent[junction]]:first_child[parent[junction] + 1]]])
+        neighbours = neighbours[(neighbours != junction) & (neighbours != parent[junction])]
+        if len(neighbours):
+            from_junctions.append(junction)
+            to_junctions.append(rng.choice(neighbours))
+    return np.array(from_junctions, dtype=np.int64), np.array(to_junctions, dtype=np.int64)
+
+
+def _design_diameters(mdot_kg_per_s, density, velocity_m_per_s):
+    """
+    Returns the pipe diameters for the given design mass flows and velocity.
+    """
+    return np.maximum(np.sqrt(4 * np.abs(mdot_kg_per_s) / (density * velocity_m_per_s * np.pi)),
+                      MIN_DIAMETER_M)
+
+
+def _create_meshed_level(net, n_junctions, pn_bar, t_k, loads, loop_ratio, velocity_m_per_s,
+                         length_range_km, rng, name):
+    """
+    Creates the junctions and pipes of a randomly meshed network level, where the tree pipes are
+    dimensioned for the given loads of the junctions (including infeeds into lower levels).
+    """
+    junctions = create_junctions(net, n_junctions, pn_bar=pn_bar, tfluid_k=t_k,
+                                 name=["%s junction %d" % (name, i) for i in range(n_junctions)])
+    if n_junctions < 2:
+        return junctions
+    parents = _random_tree(n_junctions, rng)
+    density = get_fluid(net).get_density(t_k) * (1. if not get_fluid(net).is_gas
+                                                   else (pn_bar + 1.01325) / 1.01325)
+    subtree = _subtree_loads(parents, loads)
+    diameters = _design_diameters(subtree[1:], density, velocity_m_per_s)
+    loop_from, loop_to = _loop_pipes(parents, loop_ratio, rng)
+    # loop pipes get the diameter of the tree pipe feeding the first junction of the loop
+    loop_diameters = diameters[loop_from - 1]
+    from_junctions = np.concatenate([parents, loop_from])
+    to_junctions = np.concatenate([np.arange(1, n_junctions), loop_to])
+    create_pipes_from_parameters(
+        net, junctions[from_junctions], junctions[to_junctions],
+        length_km=rng.uniform(*length_range_km, len(from_junctions)),
+        diameter_m=np.concatenate([diameters, loop_diameters]), k_mm=0.1,
+        name=["%s pipe %d" % (name, i) for i in range(len(from_junctions))])
+    return junctions
+
+
+def _synthetic_supply_network(fluid, n_junctions, pressure_levels_bar, loop_ratio, mdot_kg_per_s,
+                              velocity_m_per_s, t_k, seed):
+    rng = np.random.default_rng(seed)
+    net = create_empty_network(fluid=fluid)
+    pressure_levels_bar = np.atleast_1d(pressure_levels_bar).astype(np.float64)
+    n_levels = len(pressure_levels_bar)
+    if n_junctions < 2 * n_levels:
+        raise UserWarning("At least two junctions per pressure level are required.")
+    level_sizes = np.full(n_levels, n_junctions // n_levels)
+    level_sizes[:n_junctions % n_levels] += 1
+
+    # sink loads of all levels, the root of each level (index 0) has no sink
+    sink_loads = [np.r_[0., rng.uniform(0.5, 1.5, size - 1) * mdot_kg_per_s]
+                  for size in level_sizes]
+    # each lower level is fed from a random junction of the level above, which has to be
+    # considered in the design loads of the pipes
+    stations = [int(rng.integers(1, size)) for size in level_sizes[:-1]]
+    design_loads = [loads.copy() for loads in sink_loads]
+    for level in range(n_levels - 2, -1, -1):
+        design_loads[level][stations[level]] += np.sum(design_loads[level + 1])
+
+    level_junctions = []
+    for level in range(n_levels):
+        junctions = _create_meshed_level(
+            net, level_sizes[level], pressure_levels_bar[level], t_k, design_loads[level],
+            loop_ratio, velocity_m_per_s, (0.02, 0.2), rng, "level %d" % level)
+        create_sinks(net, junctions[1:], mdot_kg_per_s=sink_loads[level][1:],
+                     name=["level %d sink %d" % (level, i) for i in range(1, len(junctions))])
+        level_junctions.append(junctions)
+
+    create_ext_grid(net, level_junctions[0][0], p_bar=pressure_levels_bar[0], t_k=t_k,
+                    name="infeed")
+    if n_levels > 1:
+        create_pressure_controls(
+            net, [level_junctions[level][stations[level]] for level in range(n_levels - 1)],
+            [level_junctions[level][0] for level in range(1, n_levels)],
+            [level_junctions[level][0] for level in range(1, n_levels)],
+            pressure_levels_bar[1:], name=["station %d" % level for level in range(1, n_levels)])
+    return net
+
+
+def synthetic_gas_network(n_junctions, pressure_levels_bar=(4., 0.1), loop_ratio=0.1,
+                          mdot_kg_per_s=2e-4, fluid="lgas", seed=None):
+    """
+    Creates a synthetic gas grid of arbitrary size. Each pressure level is a random tree of pipes
+    with a sink at each junction, where additional pipes between random junctions close loops
+    (their number is loop_ratio times the number of tree pipes, so loop_ratio=0 yields a radial
+    grid). The loops are local, i.e. they connect junctions with a common parent or grandparent.
+    The first level is fed by an external grid, each further level by a pressure control from a
+    random junction of the level above. The pipe diameters are dimensioned for the downstream
+    load with a design velocity of 5 m/s. All tables are built with the bulk create functions.
+
+    :param n_junctions: Total number of junctions (distributed equally to the pressure levels)
+    :type n_junctions: int
+    :param pressure_levels_bar: Nominal pressures of the pressure levels, starting with the \
+            pressure of the external grid
+    :type pressure_levels_bar: Iterable(float), default (4., 0.1)
+    :param loop_ratio: Number of loop closing pipes per tree pipe
+    :type loop_ratio: float, default 0.1
+    :param mdot_kg_per_s: Mean mass flow of the sinks (uniformly distributed between 0.5 and 1.5 \
+            times this value)
+    :type mdot_kg_per_s: float, default 2e-4
+    :param fluid: Name of the fluid from the fluid library
+    :type fluid: str, default "lgas"
+    :param seed: Seed of the random number generator
+    :type seed: int, default None
+    :return: net - The synthetic gas network
+    :rtype: pandapipesNet
+
+    :Example:
+        >>> net = pandapipes.networks.synthetic_gas_network(10000, loop_ratio=0.05, seed=0)
+    """
+    return _synthetic_supply_network(fluid, n_junctions, pressure_levels_bar, loop_ratio,
+                                     mdot_kg_per_s, 5., 283.15, seed)
+
+
+def synthetic_water_network(n_junctions, pressure_levels_bar=(5.,), loop_ratio=0.2,
+                            mdot_kg_per_s=0.05, seed=None):
+    """
+    Creates a synthetic water distribution grid of arbitrary size. The structure is the same as
+    for :func:`synthetic_gas_network` (random meshed trees per pressure level, fed by an
+    external grid and pressure controls), with a design velocity of 1 m/s.
+
+    :param n_junctions: Total number of junctions (distributed equally to the pressure levels)
+    :type n_junctions: int
+    :param pressure_levels_bar: Nominal pressures of the pressure levels, starting with the \
+            pressure of the external grid
+    :type pressure_levels_bar: Iterable(float), default (5.,)
+    :param loop_ratio: Number of loop closing pipes per tree pipe
+    :type loop_ratio: float, default 0.2
+    :param mdot_kg_per_s: Mean mass flow of the sinks (uniformly distributed between 0.5 and 1.5 \
+            times this value)
+    :type mdot_kg_per_s: float, default 0.05
+    :param seed: Seed of the random number generator
+    :type seed: int, default None
+    :return: net - The synthetic water network
+    :rtype: pandapipesNet
+
+    :Example:
+        >>> net = pandapipes.networks.synthetic_water_network(10000, seed=0)
+    """
+    return _synthetic_supply_network("water", n_junctions, pressure_levels_bar, loop_ratio,
+                                     mdot_kg_per_s, 1., 293.15, seed)
+
+
+def synthetic_heat_network(n_consumers, loop_ratio=0., qext_w=20000., deltat_k=30.,
+                           t_flow_k=353.15, p_flow_bar=6., plift_bar=3., seed=None):
+    """
+    Creates a synthetic district heating grid of arbitrary size with a flow and a return network.
+    The flow network is a random (optionally meshed, see :func:`synthetic_gas_network`) tree
+    of pipes, the return network mirrors it with reversed pipe directions. Each junction of the
+    flow network (except the root) is connected to its return junction by a heat consumer. The
+    grid is fed by a circulation pump with constant pressure between the roots of the return and
+    flow network. The pipes are dimensioned for a design velocity of 1 m/s and exchange heat with
+    the ambient.
+
+    :param n_consumers: Number of heat consumers
+    :type n_consumers: int
+    :param loop_ratio: Number of loop closing pipes per tree pipe (in both networks)
+    :type loop_ratio: float, default 0.
+    :param qext_w: Mean heat demand of the consumers (uniformly distributed between 0.5 and 1.5 \
+            times this value)
+    :type qext_w: float, default 20000.
+    :param deltat_k: Temperature difference between flow and return of the consumers
+    :type deltat_k: float, default 30.
+    :param t_flow_k: Flow temperature of the circulation pump
+    :type t_flow_k: float, default 353.15
+    :param p_flow_bar: Flow pressure of the circulation pump
+    :type p_flow_bar: float, default 6.
+    :param plift_bar: Pressure lift of the circulation pump
+    :type plift_bar: float, default 3.
+    :param seed: Seed of the random number generator
+    :type seed: int, default None
+    :return: net - The synthetic district heating network
+    :rtype: pandapipesNet
+
+    :Example:
+        >>> net = pandapipes.networks.synthetic_heat_network(1000, seed=0)
+        >>> pandapipes.pipeflow(net, mode="sequential")
+    """
+    rng = np.random.default_rng(seed)
+    net = create_empty_network(fluid="water")
+    n_junctions = n_consumers + 1
+    heat = rng.uniform(0.5, 1.5, n_consumers) * qext_w
+    cp = get_fluid(net).get_heat_capacity(t_flow_k)
+    loads = np.r_[0., heat / (cp * deltat_k)]
+
+    parents = _random_tree(n_junctions, rng)
+    density = get_fluid(net).get_density(t_flow_k)
+    diameters = _design_diameters(_subtree_loads(parents, loads)[1:], density, 1.)
+    loop_from, loop_to = _loop_pipes(parents, loop_ratio, rng)
+    loop_diameters = diameters[loop_from - 1]
+    from_junctions = np.concatenate([parents, loop_from])
+    to_junctions = np.concatenate([np.arange(1, n_junctions), loop_to])
+    diameters = np.concatenate([diameters, loop_diameters])
+    lengths = rng.uniform(0.02, 0.2, len(from_junctions))
+
+    flow = create_junctions(net, n_junctions, pn_bar=p_flow_bar, tfluid_k=t_flow_k,
+                            name=["flow junction %d" % i for i in range(n_junctions)])
+    ret = create_junctions(net, n_junctions, pn_bar=p_flow_bar - plift_bar,
+                           tfluid_k=t_flow_k - deltat_k,
+                           name=["return junction %d" % i for i in range(n_junctions)])
+    n_pipes = len(from_junctions)
+    create_pipes_from_parameters(
+        net, flow[from_junctions], flow[to_junctions], length_km=lengths, diameter_m=diameters,
+        k_mm=0.1, u_w_per_m2k=0.5, text_k=283.15,
+        name=["flow pipe %d" % i for i in range(n_pipes)])
+    create_pipes_from_parameters(
+        net, ret[to_junctions], ret[from_junctions], length_km=lengths, diameter_m=diameters,
+        k_mm=0.1, u_w_per_m2k=0.5, text_k=283.15,
+        name=["return pipe %d" % i for i in range(n_pipes)])
+    create_heat_consumers(net, flow[1:], ret[1:], qext_w=heat, deltat_k=deltat_k,
+                          name=["heat consumer %d" % i for i in range(n_consumers)])
+    create_circ_pump_const_pressure(net, ret[0], flow[0], p_flow_bar=p_flow_bar,
+                                    plift_bar=plift_bar, t_flow_k=t_flow_k, type="pt",
+                                    name="heating plant")
+    return net
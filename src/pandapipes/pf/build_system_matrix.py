@@ -3,7 +3,7 @@
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
 import numpy as np
-from scipy.sparse import csr_matrix
+from scipy.sparse import csc_matrix, csr_matrix
 
 from pandapipes.idx_branch import (FROM_NODE, TO_NODE, JAC_DERIV_DM, JAC_DERIV_DP, JAC_DERIV_DP1, \
     JAC_DERIV_DM_NODE, LOAD_VEC_NODES_FROM, LOAD_VEC_NODES_TO, LOAD_VEC_BRANCHES, JAC_DERIV_DT, JAC_DERIV_DTOUT,
@@ -13,11 +13,13 @@ from pandapipes.idx_branch import (FROM_NODE, TO_NODE, JAC_DERIV_DM, JAC_DERIV_D
 from pandapipes.idx_node import (P, PC as PC_NODE, NODE_TYPE, T, NODE_TYPE_T, LOAD, LOAD_T, INFEED,
                                  MDOTSLACKINIT, JAC_DERIV_MSL)
 from pandapipes.pf.internals_toolbox import _sum_by_group_sorted, _sum_by_group, \
-    get_from_nodes_corrected, get_to_nodes_corrected
+    get_from_nodes_corrected, get_to_nodes_corrected, use_parallel_numba
+from pandapipes.pf.linear_solver import get_linear_solver
 from pandapipes.pf.pipeflow_setup import get_net_option
 
 
-def build_system_matrix(net, branch_pit, node_pit, heat_mode):
+def build_system_matrix(net, branch_pit, node_pit, heat_mode, build_matrix=True,
+                        load_vector=None):
     """
     Builds the system matrix.
 
@@ -29,13 +31,22 @@ def build_system_matrix(net, branch_pit, node_pit, heat_mode):
     :type node_pit: numpy.ndarray
     :param heat_mode: Is it a heat network calculation: True or False
     :type heat_mode: bool
+    :param build_matrix: If False, only the load vector is created and the system matrix is None
+    :type build_matrix: bool, default True
+    :param load_vector: The load vector of the same iteration, if it was already built (e.g. for\
+            a rejected chord step). In that case, only the system matrix is built.
+    :type load_vector: numpy.ndarray, default None
     :return: system_matrix, load_vector
-    :rtype: system_matrix - scipy.sparse.csr.csr_matrix, load_vector - numpy.ndarray
+    :rtype: system_matrix - scipy.sparse.csc_matrix or scipy.sparse.csr_matrix (depending on the\
+            native format of the linear solver), load_vector - numpy.ndarray
     """
     update_option = get_net_option(net, "only_update_hydraulic_matrix")
     update_only = update_option and "hydraulic_data_sorting" in net["_internal_data"] \
                   and "hydraulic_matrix" in net["_internal_data"]
     use_numba = get_net_option(net, "use_numba")
+    parallel = use_parallel_numba(net["_options"], len(branch_pit))
+    matrix_format = get_linear_solver(get_net_option(net, "linear_solver")).matrix_format
+    sparse_matrix = csc_matrix if matrix_format == "csc" else csr_matrix
 
     len_b = len(branch_pit)
     len_n = len(node_pit)
@@ -81,6 +92,45 @@ def build_system_matrix(net, branch_pit, node_pit, heat_mode):
         len_tn2 = len_tn1 + len_tn_not_slack
         full_len = len_tn2 + slack_nodes.shape[0]
 
+    # load vector on the right side
+    if load_vector is None and not heat_mode:
+        load_vector = np.empty(len_n + len_b + len_sl)
+        load_vector[len_n:len_b + len_n] = branch_pit[:, LOAD_VEC_BRANCHES]
+        load_vector[:len_n] = node_pit[:, LOAD] * (-1)
+        fn_unique, fn_sums = _sum_by_group(use_numba, fn, branch_pit[:, LOAD_VEC_NODES_FROM],
+                                           parallel=parallel)
+        tn_unique, tn_sums = _sum_by_group(use_numba, tn, branch_pit[:, LOAD_VEC_NODES_TO],
+                                           parallel=parallel)
+        load_vector[fn_unique] -= fn_sums
+        load_vector[tn_unique] += tn_sums
+        load_vector[slack_nodes] = 0
+        load_vector[pc_matrix_indices] = 0
+
+        load_vector[slack_mass_matrix_indices] = node_pit[slack_nodes, LOAD] * (-1)
+        fsb_unique, fsb_sums = _sum_by_group(use_numba, slack_masses_from,
+                                             branch_pit[slack_branches_from, LOAD_VEC_NODES_FROM])
+        tsb_unique, tsb_sums = _sum_by_group(use_numba, slack_masses_to,
+                                             branch_pit[slack_branches_to, LOAD_VEC_NODES_TO])
+        load_vector[slack_mass_matrix_indices[fsb_unique]] -= fsb_sums
+        load_vector[slack_mass_matrix_indices[tsb_unique]] += tsb_sums
+        load_vector[slack_mass_matrix_indices] -= node_pit[slack_nodes, MDOTSLACKINIT]
+    elif load_vector is None:
+        load_vector = np.zeros(len_n + len_b)
+        load_vector[len_n:] = branch_pit[:, LOAD_VEC_BRANCHES_T]
+        load_vector[:len_n] = node_pit[:, LOAD_T] * (-1)
+        # This approach can be used if you consider the effect of sources with given temperature
+        # fn_unique, fn_sums = _sum_by_group(use_numba, fn, branch_pit[:, LOAD_VEC_NODES_FROM_T])
+        fn_unique, fn_sums = _sum_by_group(use_numba, tn, branch_pit[:, LOAD_VEC_NODES_FROM_T],
+                                           parallel=parallel)
+        tn_unique, tn_sums = _sum_by_group(use_numba, tn, branch_pit[:, LOAD_VEC_NODES_TO_T],
+                                           parallel=parallel)
+        load_vector[fn_unique] -= fn_sums
+        load_vector[tn_unique] += tn_sums
+        load_vector[infeed_node] = 0
+
+    if not build_matrix:
+        return None, load_vector
+
     system_data = np.zeros(full_len, dtype=np.float64)
 
     # entries in the matrix
@@ -211,21 +261,24 @@ def build_system_matrix(net, branch_pit, node_pit, heat_mode):
             system_rows[len_tn2:] = infeed_node
 
         if not update_option:
-            system_matrix = csr_matrix((system_data, (system_rows, system_cols)),
-                                       shape=(len_n + len_b + len_sl, len_n + len_b + len_sl))
+            system_matrix = sparse_matrix((system_data, (system_rows, system_cols)),
+                                          shape=(len_n + len_b + len_sl, len_n + len_b + len_sl))
 
         else:
-            data_order = np.lexsort([system_cols, system_rows])
+            # compressed (major) axis are the rows for CSR and the columns for CSC
+            major, minor = (system_cols, system_rows) if matrix_format == "csc" \
+                else (system_rows, system_cols)
+            data_order = np.lexsort([minor, major])
             system_data = system_data[data_order]
-            system_cols = system_cols[data_order]
-            system_rows = system_rows[data_order]
-
-            row_counter = np.zeros(len_b + len_n + len_sl + 1, dtype=np.int32)
-            unique_rows, row_counts = _sum_by_group_sorted(system_rows, np.ones_like(system_rows))
-            row_counter[unique_rows + 1] += row_counts
-            ptr = row_counter.cumsum()
-            system_matrix = csr_matrix((system_data, system_cols, ptr),
-                                       shape=(len_n + len_b + len_sl, len_n + len_b + len_sl))
+            major = major[data_order]
+            minor = minor[data_order]
+
+            major_counter = np.zeros(len_b + len_n + len_sl + 1, dtype=np.int32)
+            unique_major, major_counts = _sum_by_group_sorted(major, np.ones_like(major))
+            major_counter[unique_major + 1] += major_counts
+            ptr = major_counter.cumsum()
+            system_matrix = sparse_matrix((system_data, minor, ptr),
+                                          shape=(len_n + len_b + len_sl, len_n + len_b + len_sl))
             net["_internal_data"]["hydraulic_data_sorting"] = data_order
             net["_internal_data"]["hydraulic_matrix"] = system_matrix
     else:
@@ -234,36 +287,4 @@ def build_system_matrix(net, branch_pit, node_pit, heat_mode):
         system_matrix = net["_internal_data"]["hydraulic_matrix"]
         system_matrix.data = system_data
 
-    # load vector on the right side
-    if not heat_mode:
-        load_vector = np.empty(len_n + len_b + len_sl)
-        load_vector[len_n:len_b + len_n] = branch_pit[:, LOAD_VEC_BRANCHES]
-        load_vector[:len_n] = node_pit[:, LOAD] * (-1)
-        fn_unique, fn_sums = _sum_by_group(use_numba, fn, branch_pit[:, LOAD_VEC_NODES_FROM])
-        tn_unique, tn_sums = _sum_by_group(use_numba, tn, branch_pit[:, LOAD_VEC_NODES_TO])
-        load_vector[fn_unique] -= fn_sums
-        load_vector[tn_unique] += tn_sums
-        load_vector[slack_nodes] = 0
-        load_vector[pc_matrix_indices] = 0
-
-        load_vector[slack_mass_matrix_indices] = node_pit[slack_nodes, LOAD] * (-1)
-        fsb_unique, fsb_sums = _sum_by_group(use_numba, slack_masses_from,
-                                             branch_pit[slack_branches_from, LOAD_VEC_NODES_FROM])
-        tsb_unique, tsb_sums = _sum_by_group(use_numba, slack_masses_to,
-                                             branch_pit[slack_branches_to, LOAD_VEC_NODES_TO])
-        load_vector[slack_mass_matrix_indices[fsb_unique]] -= fsb_sums
-        load_vector[slack_mass_matrix_indices[tsb_unique]] += tsb_sums
-        load_vector[slack_mass_matrix_indices] -= node_pit[slack_nodes, MDOTSLACKINIT]
-    else:
-        load_vector = np.zeros(len_n + len_b)
-        load_vector[len_n:] = branch_pit[:, LOAD_VEC_BRANCHES_T]
-        load_vector[:len_n] = node_pit[:, LOAD_T] * (-1)
-        # This approach can be used if you consider the effect of sources with given temperature
-        # fn_unique, fn_sums = _sum_by_group(use_numba, fn, branch_pit[:, LOAD_VEC_NODES_FROM_T])
-        fn_unique, fn_sums = _sum_by_group(use_numba, tn, branch_pit[:, LOAD_VEC_NODES_FROM_T])
-        tn_unique, tn_sums = _sum_by_group(use_numba, tn, branch_pit[:, LOAD_VEC_NODES_TO_T])
-        load_vector[fn_unique] -= fn_sums
-        load_vector[tn_unique] += tn_sums
-        load_vector[infeed_node] = 0
-
     return system_matrix, load_vector
@@ -0,0 +1,204 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import numpy as np
+from scipy.sparse import bmat, coo_matrix, csr_matrix
+
+from pandapipes.idx_branch import FROM_NODE, TO_NODE, MDOTINIT, TOUTINIT
+from pandapipes.idx_node import TINIT, NODE_TYPE, P
+from pandapipes.pf.build_system_matrix import build_system_matrix
+from pandapipes.pf.instrumentation import timed_phase
+from pandapipes.pf.linear_solver import get_linear_solver
+from pandapipes.pf.pipeflow_setup import get_net_option
+
+try:
+    from numba import jit
+    from numba import int32
+except ImportError:
+    from pandapower.pf.no_numba import jit
+    from numpy import int32
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+COUPLED_MODE = "bidirectional_coupled"
+# relative step width of the finite differences for the coupling derivatives
+FD_STEP = np.sqrt(np.finfo(float).eps)
+
+
+def get_coupling_structure(net, branch_pit, node_pit):
+    """
+    Returns the sparsity patterns of the coupling blocks of the bidirectional system and a
+    coloring of their columns. The hydraulic equation of a branch depends on the temperatures of
+    its from and to node and on its outlet temperature (density, viscosity and the heat
+    consumer controls), the thermal equations of a branch and of its nodes depend on the mass
+    flow of the branch. Columns with the same color do not share any row, so that the
+    derivatives of all columns of one color are obtained from one evaluation of the equations.
+    The structure is cached in net["_internal_data"] together with the from and to nodes it
+    belongs to.
+
+    :param net: The pandapipesNet for which to create the coupling structure
+    :type net: pandapipesNet
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :return: coupling - dict with rows, columns and column colors of both coupling blocks
+    :rtype: dict
+    """
+    structure = branch_pit[:, [FROM_NODE, TO_NODE]].ravel()
+    internal_data = net["_internal_data"] if "_internal_data" in net else dict()
+    coupling = internal_data.get("coupled_bidirectional")
+    if coupling is not None and len(coupling["node_types"]) == len(node_pit) \
+            and np.array_equal(coupling["structure"], structure):
+        return coupling
+
+    len_n, len_b = len(node_pit), len(branch_pit)
+    fn = branch_pit[:, FROM_NODE].astype(np.int32)
+    tn = branch_pit[:, TO_NODE].astype(np.int32)
+    branches = np.arange(len_b, dtype=np.int32)
+
+    # hydraulic rows (branch equations) x temperature columns (node temperatures followed by
+    # the outlet temperatures of the branches)
+    rows_ht = np.concatenate([branches, branches, branches]) + len_n
+    cols_ht = np.concatenate([fn, tn, branches + len_n])
+    # thermal rows (node and branch equations) x mass flow columns (branches)
+    rows_th = np.concatenate([fn, tn, branches + len_n])
+    cols_th = np.concatenate([branches, branches, branches])
+
+    coupling = {"structure": structure, "node_types": node_pit[:, NODE_TYPE].copy(),
+                "rows_ht": rows_ht, "cols_ht": cols_ht, "rows_th": rows_th, "cols_th": cols_th,
+                "colors_ht": color_columns(rows_ht, cols_ht, len_n + len_b, len_n + len_b),
+                "colors_th": color_columns(rows_th, cols_th, len_n + len_b, len_b)}
+    internal_data["coupled_bidirectional"] = coupling
+    return coupling
+
+
+def color_columns(rows, cols, n_rows, n_cols):
+    """
+    Colors the columns of a sparsity pattern, so that columns of the same color have no row in
+    common (greedy coloring of the column intersection graph).
+
+    :param rows: the rows of the pattern entries
+    :type rows: numpy.ndarray
+    :param cols: the columns of the pattern entries
+    :type cols: numpy.ndarray
+    :param n_rows: number of rows of the pattern
+    :type n_rows: int
+    :param n_cols: number of columns of the pattern
+    :type n_cols: int
+    :return: colors - the color of every column
+    :rtype: numpy.ndarray
+    """
+    pattern = csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_rows, n_cols))
+    conflicts = (pattern.T @ pattern).tocsr()
+    return greedy_coloring(conflicts.indptr.astype(np.int32),
+                           conflicts.indices.astype(np.int32))
+
+
+@jit((int32[:], int32[:]), nopython=True, cache=True)
+def greedy_coloring(indptr, indices):
+    n = len(indptr) - 1
+    colors = np.full(n, -1, dtype=np.int32)
+    forbidden = np.full(n + 1, -1, dtype=np.int32)
+    for v in range(n):
+        for k in range(indptr[v], indptr[v + 1]):
+            c = colors[indices[k]]
+            if c >= 0:
+                forbidden[c] = v
+        c = 0
+        while forbidden[c] == v:
+            c += 1
+        colors[v] = c
+    return colors
+
+
+def build_coupled_system(net, branch_pit, node_pit, update_derivatives):
+    """
+    Builds the linearized system of the bidirectional calculation with the hydraulic unknowns
+    (pressures, branch mass flows and slack mass flows) and the thermal unknowns (node
+    temperatures and branch outlet temperatures) together:
+
+    .. math::
+        \\begin{pmatrix} J_{hh} & J_{hT} \\\\ J_{Th} & J_{TT} \\end{pmatrix}
+        \\begin{pmatrix} x_h \\\\ x_T \\end{pmatrix} =
+        \\begin{pmatrix} F_h \\\\ F_T \\end{pmatrix}
+
+    The diagonal blocks are the hydraulic and the thermal system matrix. The coupling blocks
+    (dependency of the hydraulic equations on the temperatures and of the thermal equations on
+    the mass flows) are calculated by colored forward differences of the load vectors (c.f.
+    :func:`get_coupling_structure`), so that all component models are considered without
+    analytic cross derivatives. The derivative columns of the internal tables contain the
+    values of the current state afterwards.
+
+    Both internal tables have to contain the same nodes and branches for the hydraulic and the
+    thermal calculation.
+
+    :param net: The pandapipesNet for which to build the coupled system
+    :type net: pandapipesNet
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :param update_derivatives: function that updates the derivatives of the internal tables \
+            (c.f. :func:`pandapipes.pipeflow.update_derivatives`)
+    :type update_derivatives: callable
+    :return: (system_matrix, load_vector) - the coupled system
+    :rtype: tuple
+    """
+    matrix_format = get_linear_solver(get_net_option(net, "linear_solver")).matrix_format
+    len_n, len_b = len(node_pit), len(branch_pit)
+    len_sl = np.sum(node_pit[:, NODE_TYPE] == P)
+    coupling = get_coupling_structure(net, branch_pit, node_pit)
+
+    with timed_phase(net, "matrix_assembly"):
+        jacobian_hyd, epsilon_hyd = build_system_matrix(net, branch_pit, node_pit, False)
+        jacobian_heat, epsilon_heat = build_system_matrix(net, branch_pit, node_pit, True)
+
+    with timed_phase(net, "coupling_derivatives"):
+        node_state, branch_state = node_pit.copy(), branch_pit.copy()
+
+        # hydraulic equations with perturbed temperatures
+        temperatures = np.concatenate([node_pit[:, TINIT], branch_pit[:, TOUTINIT]])
+        steps = FD_STEP * np.maximum(np.abs(temperatures), 1.)
+        data_ht = np.zeros(len(coupling["rows_ht"]))
+        for color in range(np.max(coupling["colors_ht"], initial=-1) + 1):
+            perturbed = coupling["colors_ht"] == color
+            node_pit[:, TINIT] += np.where(perturbed[:len_n], steps[:len_n], 0.)
+            branch_pit[:, TOUTINIT] += np.where(perturbed[len_n:], steps[len_n:], 0.)
+            update_derivatives(net, branch_pit, node_pit, False)
+            _, epsilon = build_system_matrix(net, branch_pit, node_pit, False, build_matrix=False)
+            entries = perturbed[coupling["cols_ht"]]
+            data_ht[entries] = (epsilon - epsilon_hyd)[coupling["rows_ht"][entries]] \
+                / steps[coupling["cols_ht"][entries]]
+            node_pit[:] = node_state
+            branch_pit[:] = branch_state
+
+        # thermal equations with perturbed mass flows (the flow direction is kept)
+        mass_flows = branch_pit[:, MDOTINIT]
+        steps = FD_STEP * np.maximum(np.abs(mass_flows), 1e-3) * np.where(mass_flows < 0, -1., 1.)
+        data_th = np.zeros(len(coupling["rows_th"]))
+        for color in range(np.max(coupling["colors_th"], initial=-1) + 1):
+            perturbed = coupling["colors_th"] == color
+            branch_pit[:, MDOTINIT] += np.where(perturbed, steps, 0.)
+            update_derivatives(net, branch_pit, node_pit, True)
+            _, epsilon = build_system_matrix(net, branch_pit, node_pit, True, build_matrix=False)
+            entries = perturbed[coupling["cols_th"]]
+            data_th[entries] = (epsilon - epsilon_heat)[coupling["rows_th"][entries]] \
+                / steps[coupling["cols_th"][entries]]
+            node_pit[:] = node_state
+            branch_pit[:] = branch_state
+
+    with timed_phase(net, "matrix_assembly"):
+        coupling_ht = coo_matrix((data_ht, (coupling["rows_ht"], coupling["cols_ht"])),
+                                 shape=(len_n + len_b + len_sl, len_n + len_b))
+        coupling_th = coo_matrix((data_th, (coupling["rows_th"], coupling["cols_th"] + len_n)),
+                                 shape=(len_n + len_b, len_n + len_b + len_sl))
+        system_matrix = bmat([[jacobian_hyd, coupling_ht], [coupling_th, jacobian_heat]],
+                             format=matrix_format)
+    return system_matrix, np.concatenate([epsilon_hyd, epsilon_heat])
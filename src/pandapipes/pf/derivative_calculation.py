@@ -7,8 +7,9 @@ from pandapipes.idx_branch import LENGTH, D, K, RE, LAMBDA, LOAD_VEC_BRANCHES, \
     LOAD_VEC_BRANCHES_T, JAC_DERIV_DT, JAC_DERIV_DTOUT, JAC_DERIV_DTOUT_NODE, \
     JAC_DERIV_DT_NODE, MDOTINIT, BRANCH_TYPE, CIRC
 from pandapipes.idx_node import TINIT as TINIT_NODE, INFEED
-from pandapipes.pf.internals_toolbox import get_from_nodes_corrected, get_to_nodes_corrected
-from pandapipes.properties.fluids import get_fluid
+from pandapipes.pf.internals_toolbox import get_from_nodes_corrected, get_to_nodes_corrected, \
+    use_parallel_numba
+from pandapipes.properties.fluids import get_fluid_property_cache
 from pandapipes.properties.properties_toolbox import get_branch_real_density, get_branch_real_eta, \
     get_branch_cp
 
@@ -27,7 +28,7 @@ def calculate_derivatives_hydraulic(net, branch_pit, node_pit, options):
     :type options:
     :return: No Output.
     """
-    fluid = get_fluid(net)
+    fluid = get_fluid_property_cache(net)
     gas_mode = fluid.is_gas
     friction_model = options["friction_model"]
     rho = get_branch_real_density(fluid, node_pit, branch_pit)
@@ -35,18 +36,23 @@ def calculate_derivatives_hydraulic(net, branch_pit, node_pit, options):
 
     lambda_, re = calc_lambda(
         branch_pit[:, MDOTINIT], eta, branch_pit[:, D],
-        branch_pit[:, K], gas_mode, friction_model, branch_pit[:, LENGTH], options, branch_pit[:, AREA])
+        branch_pit[:, K], gas_mode, friction_model, branch_pit[:, LENGTH], options, branch_pit[:, AREA],
+        lambda_init=branch_pit[:, LAMBDA])
     der_lambda = calc_der_lambda(branch_pit[:, MDOTINIT], eta,
                                  branch_pit[:, D], branch_pit[:, K], friction_model, lambda_, branch_pit[:, AREA])
     branch_pit[:, RE] = re
     branch_pit[:, LAMBDA] = lambda_
     from_nodes = branch_pit[:, FROM_NODE].astype(np.int32)
     to_nodes = branch_pit[:, TO_NODE].astype(np.int32)
+    parallel = use_parallel_numba(options, len(branch_pit))
     tinit_branch, height_difference, p_init_i_abs, p_init_i1_abs = \
-        get_derived_values(node_pit, from_nodes, to_nodes, options["use_numba"])
+        get_derived_values(node_pit, from_nodes, to_nodes, options["use_numba"], parallel)
 
     if not gas_mode:
-        if options["use_numba"]:
+        if parallel:
+            from pandapipes.pf.derivative_toolbox_numba import \
+                derivatives_hydraulic_incomp_numba_parallel as derivatives_hydraulic_incomp
+        elif options["use_numba"]:
             from pandapipes.pf.derivative_toolbox_numba import derivatives_hydraulic_incomp_numba \
                 as derivatives_hydraulic_incomp
         else:
@@ -57,7 +63,12 @@ def calculate_derivatives_hydraulic(net, branch_pit, node_pit, options):
             derivatives_hydraulic_incomp(
             branch_pit, der_lambda, p_init_i_abs, p_init_i1_abs, height_difference, rho))
     else:
-        if options["use_numba"]:
+        if parallel:
+            from pandapipes.pf.derivative_toolbox_numba import \
+                derivatives_hydraulic_comp_numba_parallel as derivatives_hydraulic_comp, \
+                calc_medium_pressure_with_derivative_numba_parallel as \
+                calc_medium_pressure_with_derivative
+        elif options["use_numba"]:
             from pandapipes.pf.derivative_toolbox_numba import derivatives_hydraulic_comp_numba \
                 as derivatives_hydraulic_comp, calc_medium_pressure_with_derivative_numba as \
                 calc_medium_pressure_with_derivative
@@ -86,7 +97,7 @@ def calculate_derivatives_hydraulic(net, branch_pit, node_pit, options):
 
 
 def calculate_derivatives_thermal(net, branch_pit, node_pit, _):
-    fluid = get_fluid(net)
+    fluid = get_fluid_property_cache(net)
     cp = get_branch_cp(fluid, node_pit, branch_pit)
     m_init_i = np.abs(branch_pit[:, MDOTINIT])
     m_init_i1 = np.abs(branch_pit[:, MDOTINIT])
@@ -95,7 +106,7 @@ def calculate_derivatives_thermal(net, branch_pit, node_pit, _):
     t_init_i = node_pit[from_nodes, TINIT_NODE]
     t_init_i1 = branch_pit[:, TOUTINIT]
     t_init_n = node_pit[to_nodes, TINIT_NODE]
-    cp_n = fluid.get_heat_capacity(t_init_n)
+    cp_n = fluid.get_heat_capacity(node_pit[:, TINIT_NODE])[to_nodes]
     cp_i1 = fluid.get_heat_capacity(t_init_i1)
     t_amb = branch_pit[:, TEXT]
     length = branch_pit[:, LENGTH]
@@ -131,7 +142,10 @@ def calculate_derivatives_thermal(net, branch_pit, node_pit, _):
     node_pit[infeed_node, INFEED] = True
 
 
-def get_derived_values(node_pit, from_nodes, to_nodes, use_numba):
+def get_derived_values(node_pit, from_nodes, to_nodes, use_numba, parallel=False):
+    if parallel:
+        from pandapipes.pf.derivative_toolbox_numba import calc_derived_values_numba_parallel
+        return calc_derived_values_numba_parallel(node_pit, from_nodes, to_nodes)
     if use_numba:
         from pandapipes.pf.derivative_toolbox_numba import calc_derived_values_numba
         return calc_derived_values_numba(node_pit, from_nodes, to_nodes)
@@ -139,7 +153,7 @@ def get_derived_values(node_pit, from_nodes, to_nodes, use_numba):
     return calc_derived_values_np(node_pit, from_nodes, to_nodes)
 
 
-def calc_lambda(m, eta, d, k, gas_mode, friction_model, lengths, options, area):
+def calc_lambda(m, eta, d, k, gas_mode, friction_model, lengths, options, area, lambda_init=None):
     """
     Function calculates the friction factor of a pipe. Turbulence is calculated based on
     Nikuradse. If v equals 0, a value of 0.001 is used in order to avoid division by zero.
@@ -163,10 +177,18 @@ def calc_lambda(m, eta, d, k, gas_mode, friction_model, lengths, options, area):
     :type lengths:
     :param options:
     :type options:
+    :param lambda_init: start values for the iterative Colebrook-White solution, e.g. the friction \
+            factors of the last Newton step (if not given or invalid, the Nikuradse values are used)
+    :type lambda_init: numpy.ndarray, default None
     :return:
     :rtype:
     """
-    if options["use_numba"]:
+    if use_parallel_numba(options, len(m)):
+        from pandapipes.pf.derivative_toolbox_numba import \
+            calc_lambda_nikuradse_incomp_numba_parallel as calc_lambda_nikuradse_incomp, \
+            colebrook_numba_parallel as colebrook, \
+            calc_lambda_nikuradse_comp_numba_parallel as calc_lambda_nikuradse_comp
+    elif options["use_numba"]:
         from pandapipes.pf.derivative_toolbox_numba import calc_lambda_nikuradse_incomp_numba as \
             calc_lambda_nikuradse_incomp, colebrook_numba as colebrook, \
             calc_lambda_nikuradse_comp_numba as calc_lambda_nikuradse_comp
@@ -179,12 +201,29 @@ def calc_lambda(m, eta, d, k, gas_mode, friction_model, lengths, options, area):
     else:
         re, lambda_laminar, lambda_nikuradse = calc_lambda_nikuradse_incomp(m, d, k, eta, area)
 
-    if friction_model == "colebrook":
+    if friction_model in ["colebrook", "serghides"]:
         # TODO: move this import to top level if possible
         from pandapipes.pipeflow import PipeflowNotConverged
         max_iter = options.get("max_iter_colebrook", 100)
         dummy = (lengths != 0).astype(np.float64)
-        converged, lambda_colebrook = colebrook(re, d, k, lambda_nikuradse, dummy, max_iter)
+        if lambda_init is None:
+            lambda_init = lambda_nikuradse
+        else:
+            # the Colebrook-White friction factor cannot be smaller than the Nikuradse value
+            lambda_init = np.where(np.isfinite(lambda_init) & (dummy != 0),
+                                   np.maximum(lambda_init, lambda_nikuradse), lambda_nikuradse)
+        if friction_model == "serghides":
+            from pandapipes.pf.derivative_toolbox import lambda_serghides_np
+            with np.errstate(invalid="ignore"):
+                lambda_serghides = lambda_serghides_np(re, d, k, lambda_nikuradse)
+            # the approximation is only accurate for turbulent flow, the Colebrook-White equation
+            # is solved for the (few) branches with low Reynolds numbers instead
+            valid = (re >= 2000) | np.isclose(re, 0)
+            if np.all(valid):
+                return lambda_serghides, re
+            lambda_init = np.where(valid, lambda_serghides, lambda_init)
+            dummy[valid] = 0
+        converged, lambda_colebrook = colebrook(re, d, k, lambda_init, dummy, max_iter)
         if not converged:
             raise PipeflowNotConverged(
                 "The Colebrook-White algorithm did not converge. There might be model "
@@ -230,17 +269,21 @@ def calc_der_lambda(m, eta, d, k, friction_model, lambda_pipe, area):
     lambda_der = np.zeros_like(m)
     pos = m != 0
 
-    if friction_model == "colebrook":
-        b_term[pos] = (2.51 * eta[pos] * area[pos] / (m[pos] * d[pos] * np.sqrt(lambda_pipe[pos])) +
+    if friction_model in ["colebrook", "serghides"]:
+        # the approximation by Serghides is close enough to the Colebrook-White equation to use
+        # its implicit derivative of f(lambda, |m|) = 0:
+        # d lambda / dm = - sign(m) * (df / d|m|) / (df / d lambda)
+        m_abs = np.abs(m[pos])
+        b_term[pos] = (2.51 * eta[pos] * area[pos] / (m_abs * d[pos] * np.sqrt(lambda_pipe[pos])) +
                        k[pos] / (3.71 * d[pos]))
 
         df_dm[pos] = -2 * 2.51 * eta[pos] * area[pos] / (m[pos] ** 2 * np.sqrt(lambda_pipe[pos]) * d[pos]) \
                 / (np.log(10) * b_term[pos])
 
-        df_dlambda[pos] = -0.5 * lambda_pipe[pos] ** (-3 / 2) - (2.51 * eta[pos] * area[pos] / (d[pos] * m[pos])) \
+        df_dlambda[pos] = -0.5 * lambda_pipe[pos] ** (-3 / 2) - (2.51 * eta[pos] * area[pos] / (d[pos] * m_abs)) \
                      * lambda_pipe[pos] ** (-3 / 2) / (np.log(10) * b_term[pos])
 
-        lambda_der[pos] = df_dm[pos] / df_dlambda[pos]
+        lambda_der[pos] = - np.sign(m[pos]) * df_dm[pos] / df_dlambda[pos]
 
         return lambda_der
     elif friction_model == "swamee-jain":
@@ -3,7 +3,6 @@
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
 import numpy as np
-from numpy import linalg
 
 from pandapipes.constants import P_CONVERSION, GRAVITATION_CONSTANT, NORMAL_PRESSURE, \
     NORMAL_TEMPERATURE
@@ -116,57 +115,85 @@ def calc_medium_pressure_with_derivative_np(p_init_i_abs, p_init_i1_abs):
     return p_m, der_p_m, der_p_m1
 
 
-def colebrook_np(re, d, k, lambda_nikuradse, dummy, max_iter):
+def colebrook_np(re, d, k, lambda_init, dummy, max_iter):
     """
-
-    :param re:
-    :type re:
-    :param d:
-    :type d:
-    :param k:
-    :type k:
-    :param lambda_nikuradse:
-    :type lambda_nikuradse:
-    :param dummy:
-    :type dummy:
-    :param max_iter:
-    :type max_iter:
-    :return: lambda_cb
-    :rtype:
+    Solves the Colebrook-White equation for the friction factor with Newton iterations. Every
+    branch is iterated until its own update is small enough, afterwards it is removed from the
+    iterations. Branches without flow or that are not part of the calculation (dummy = 0) keep
+    their start values.
+
+    The iterations are carried out with respect to ln(lambda), for which the equation is convex
+    and decreasing. As the Colebrook-White friction factor is always larger than the value for
+    Re -> inf (Nikuradse), the iterations are limited to this lower bound and converge
+    monotonically from there, so that both the Nikuradse values and any positive start value
+    (e.g. the friction factors of the last Newton step) can be used.
+
+    :param re: Reynolds numbers
+    :type re: numpy.ndarray
+    :param d: inner diameters
+    :type d: numpy.ndarray
+    :param k: roughness
+    :type k: numpy.ndarray
+    :param lambda_init: start values of the friction factors (e.g. Nikuradse or the last result)
+    :type lambda_init: numpy.ndarray
+    :param dummy: branches for which the equation is solved (e.g. lengths != 0)
+    :type dummy: numpy.ndarray
+    :param max_iter: maximum number of iterations
+    :type max_iter: int
+    :return: (converged, lambda_cb) - True if all branches have converged and the friction \
+            factors
+    :rtype: tuple
     """
-    lambda_cb = lambda_nikuradse
-    converged = False
-    error_lambda = []
+    lambda_cb = lambda_init.copy()
+    active = np.flatnonzero((dummy != 0) & ~np.isclose(re, 0))
+    re_div = np.divide(2.51, re[active])
+    add_val = k[active] / (3.71 * d[active])
+    lambda_min = np.power(-2 * np.log10(add_val), -2)
     niter = 0
-    mask = ~np.isclose(re, 0)
-    f = np.zeros_like(lambda_cb)
-    df = np.zeros_like(lambda_cb)
-    x = np.zeros_like(lambda_cb)
-    re_nz = re[mask]
-    k_nz = k[mask]
-    d_nz = d[mask]
     # Inner Newton-loop for calculation of lambda
-    while not converged and niter < max_iter:
-
-        f[mask] = lambda_cb[mask] ** (-1 / 2) + 2 * np.log10(2.51 / (re_nz * np.sqrt(lambda_cb[mask])) + k_nz / (3.71 * d_nz))
-
-        df[mask]= -1 / 2 * lambda_cb[mask] ** (-3 / 2) - (2.51 / re_nz) * lambda_cb[mask] ** (-3 / 2) \
-                        / (np.log(10) * (2.51 / (re_nz * np.sqrt(lambda_cb[mask])) + k_nz / (3.71 * d_nz)))
-
-        x[mask] = - f[mask] / df[mask]
-
-        lambda_cb_old = lambda_cb
-        lambda_cb = lambda_cb + x
-
-        dx = np.abs(lambda_cb - lambda_cb_old) * dummy
-        error_lambda.append(linalg.norm(dx) / (len(dx)))
+    while len(active) and niter < max_iter:
+        sqt_div = np.divide(1, np.sqrt(lambda_cb[active]))
+        b_term = re_div * sqt_div + add_val
+        f = sqt_div + 2 * np.log10(b_term)
+        df_dln_lambda = - 0.5 * sqt_div - re_div * sqt_div / (np.log(10) * b_term)
+        x = - f / df_dln_lambda
+        lambda_cb[active] = np.maximum(lambda_cb[active] * np.exp(x), lambda_min)
+
+        keep = ~(np.abs(x) <= 1e-6)
+        active, re_div, add_val, lambda_min = \
+            active[keep], re_div[keep], add_val[keep], lambda_min[keep]
+        niter += 1
 
-        if error_lambda[niter] <= 1e-4:
-            converged = True
+    return len(active) == 0, lambda_cb
 
-        niter += 1
 
-    return converged, lambda_cb
+def lambda_serghides_np(re, d, k, lambda_default):
+    """
+    Explicit approximation of the Colebrook-White equation by Serghides (three fixed point steps
+    with Steffensen acceleration), which deviates less than 0.01 % from the Colebrook-White
+    friction factor for turbulent flow. For Reynolds numbers close to 0, the default values are
+    returned.
+
+    :param re: Reynolds numbers
+    :type re: numpy.ndarray
+    :param d: inner diameters
+    :type d: numpy.ndarray
+    :param k: roughness
+    :type k: numpy.ndarray
+    :param lambda_default: friction factors for Reynolds numbers close to 0
+    :type lambda_default: numpy.ndarray
+    :return: lambda_serghides
+    :rtype: numpy.ndarray
+    """
+    lambda_serghides = lambda_default.copy()
+    pos = ~np.isclose(re, 0)
+    rel_k = k[pos] / (3.71 * d[pos])
+    re_div = np.divide(1, re[pos])
+    a = -2 * np.log10(rel_k + 12 * re_div)
+    b = -2 * np.log10(rel_k + 2.51 * a * re_div)
+    c = -2 * np.log10(rel_k + 2.51 * b * re_div)
+    lambda_serghides[pos] = (a - (b - a) ** 2 / (c - 2 * b + a)) ** -2
+    return lambda_serghides
 
 
 def calc_derived_values_np(node_pit, from_nodes, to_nodes):
@@ -1,5 +1,4 @@
 import numpy as np
-from numpy import linalg
 
 from pandapipes.constants import P_CONVERSION, GRAVITATION_CONSTANT, NORMAL_PRESSURE, \
     NORMAL_TEMPERATURE
@@ -8,14 +7,25 @@ from pandapipes.idx_branch import LENGTH, LAMBDA, D, LOSS_COEFFICIENT as LC, PL,
 from pandapipes.idx_node import HEIGHT, PAMB, PINIT, TINIT as TINIT_NODE
 
 try:
-    from numba import jit
+    from numba import jit, prange
     from numba import int32, float64, int64
 except ImportError:
     from pandapower.pf.no_numba import jit
     from numpy import int32, float64, int64
+    prange = range
 
 
-@jit((float64[:, :], float64[:], float64[:], float64[:], float64[:], float64[:]), nopython=True, cache=False)
+def _parallel(func):
+    """
+    Creates the parallel variant of a numba kernel, whose loop over the branches uses prange. In
+    the serial kernel, prange behaves like range. The parallel variant is only compiled when it is
+    called for the first time. It is not cached on disk, as it shares the python function (and
+    thus the cache index) with the cached serial kernel.
+    """
+    return jit(nopython=True, cache=False, parallel=True)(getattr(func, "py_func", func))
+
+
+@jit((float64[:, :], float64[:], float64[:], float64[:], float64[:], float64[:]), nopython=True, cache=True)
 def derivatives_hydraulic_incomp_numba(branch_pit, der_lambda, p_init_i_abs, p_init_i1_abs,
                                        height_difference, rho):
     le = der_lambda.shape[0]
@@ -27,7 +37,7 @@ def derivatives_hydraulic_incomp_numba(branch_pit, der_lambda, p_init_i_abs, p_i
     load_vec_nodes_to = np.zeros_like(der_lambda)
     df_dm_nodes = np.ones_like(der_lambda)
 
-    for i in range(le):
+    for i in prange(le):
         m_init_abs = np.abs(branch_pit[i][MDOTINIT])
         m_init2 = m_init_abs * branch_pit[i][MDOTINIT]
         p_diff = p_init_i_abs[i] - p_init_i1_abs[i]
@@ -47,7 +57,7 @@ def derivatives_hydraulic_incomp_numba(branch_pit, der_lambda, p_init_i_abs, p_i
 
 
 @jit((float64[:, :], float64[:, :], float64[:], float64[:], float64[:], float64[:], float64[:], float64[:],
-      float64[:], float64[:], float64[:], float64[:]), nopython=True, cache=False)
+      float64[:], float64[:], float64[:], float64[:]), nopython=True, cache=True)
 def derivatives_hydraulic_comp_numba(node_pit, branch_pit, lambda_, der_lambda, p_init_i_abs, p_init_i1_abs,
                                      height_difference, comp_fact, der_comp, der_comp1, rho, rho_n):
     le = lambda_.shape[0]
@@ -61,7 +71,7 @@ def derivatives_hydraulic_comp_numba(node_pit, branch_pit, lambda_, der_lambda,
     from_nodes = branch_pit[:, FROM_NODE].astype(np.int32)
 
     # Formulas for gas pressure loss according to laminar version
-    for i in range(le):
+    for i in prange(le):
         # compressibility settings
         m_init_abs = np.abs(branch_pit[i][MDOTINIT])
         m_init2 = branch_pit[i][MDOTINIT] * m_init_abs
@@ -92,13 +102,13 @@ def derivatives_hydraulic_comp_numba(node_pit, branch_pit, lambda_, der_lambda,
     return load_vec, load_vec_nodes_from, load_vec_nodes_to, df_dm, df_dm_nodes, df_dp, df_dp1
 
 
-@jit((float64[:], float64[:], float64[:], float64[:], float64[:]), nopython=True)
+@jit((float64[:], float64[:], float64[:], float64[:], float64[:]), nopython=True, cache=True)
 def calc_lambda_nikuradse_incomp_numba(m, d, k, eta, area):
     lambda_nikuradse = np.empty_like(m)
     lambda_laminar = np.zeros_like(m)
     re = np.empty_like(m)
     m_abs = np.abs(m)
-    for i in range(m.shape[0]):
+    for i in prange(m.shape[0]):
         re[i] = np.divide(m_abs[i] * d[i], eta[i] * area[i])
         if re[i] != 0:
             lambda_laminar[i] = 64 / re[i]
@@ -106,13 +116,13 @@ def calc_lambda_nikuradse_incomp_numba(m, d, k, eta, area):
     return re, lambda_laminar, lambda_nikuradse
 
 
-@jit((float64[:], float64[:], float64[:], float64[:], float64[:]), nopython=True)
+@jit((float64[:], float64[:], float64[:], float64[:], float64[:]), nopython=True, cache=True)
 def calc_lambda_nikuradse_comp_numba(m, d, k, eta, area):
     lambda_nikuradse = np.empty_like(m)
     lambda_laminar = np.zeros_like(m)
     re = np.empty_like(m)
-    for i, mi in enumerate(m):
-        m_abs = np.abs(mi)
+    for i in prange(m.shape[0]):
+        m_abs = np.abs(m[i])
         re[i] = np.divide(m_abs * d[i], eta[i] * area[i])
         if re[i] != 0:
             lambda_laminar[i] = np.divide(64, re[i])
@@ -120,13 +130,13 @@ def calc_lambda_nikuradse_comp_numba(m, d, k, eta, area):
     return re, lambda_laminar, lambda_nikuradse
 
 
-@jit((float64[:], float64[:]), nopython=True, cache=False)
+@jit((float64[:], float64[:]), nopython=True, cache=True)
 def calc_medium_pressure_with_derivative_numba(p_init_i_abs, p_init_i1_abs):
     p_m = p_init_i_abs.copy()
     der_p_m = np.ones_like(p_init_i_abs)
     der_p_m1 = der_p_m * (-1)
     val = 2 / 3
-    for i in range(p_init_i_abs.shape[0]):
+    for i in prange(p_init_i_abs.shape[0]):
         if p_init_i_abs[i] != p_init_i1_abs[i]:
             diff_p_sq = p_init_i_abs[i] ** 2 - p_init_i1_abs[i] ** 2
             diff_p_sq_div = np.divide(1, diff_p_sq)
@@ -139,50 +149,44 @@ def calc_medium_pressure_with_derivative_numba(p_init_i_abs, p_init_i1_abs):
     return p_m, der_p_m, der_p_m1
 
 
-@jit((float64[:], float64[:], float64[:], float64[:], float64[:], int64), nopython=True)
-def colebrook_numba(re, d, k, lambda_nikuradse, dummy, max_iter):
-    lambda_cb = lambda_nikuradse.copy()
-    lambda_cb_old = lambda_nikuradse.copy()
-    converged = False
-    niter = 0
-
-    # Inner Newton-loop for calculation of lambda
-    while not converged and niter < max_iter:
-        for i in range(len(lambda_cb)):
-            if np.isclose(re[i],0): continue
-            sqt = np.sqrt(lambda_cb[i])
-            add_val = np.divide(k[i], (3.71 * d[i]))
-            sqt_div = np.divide(1, sqt)
-            re_div = np.divide(1, re[i])
-            sqt_div3 = sqt_div ** 3
-
-            f = sqt_div + 2 * np.log10(2.51 * re_div * sqt_div + add_val)
-            df_dlambda_cb = - 0.5 * sqt_div3 - 2.51 * re_div * sqt_div3 * np.divide(
-                1, np.log(10) * (2.51 * re_div * sqt_div + add_val))
-            x = - f / df_dlambda_cb
-
-            lambda_cb_old[i] = lambda_cb[i]
-            lambda_cb[i] += x
-
-        dx = np.abs(lambda_cb - lambda_cb_old) * dummy
-        error_lambda = linalg.norm(dx) / dx.shape[0]
-
-        if error_lambda <= 1e-4:
-            converged = True
-
-        niter += 1
-
-    return converged, lambda_cb
-
-
-@jit((float64[:, :], int32[:], int32[:]), nopython=True)
+@jit((float64[:], float64[:], float64[:], float64[:], float64[:], int64), nopython=True, cache=True)
+def colebrook_numba(re, d, k, lambda_init, dummy, max_iter):
+    # Newton iterations with respect to ln(lambda) for every branch separately (c.f.
+    # colebrook_np), until its own update is small enough
+    lambda_cb = lambda_init.copy()
+    unconverged = np.zeros(len(lambda_cb), dtype=np.bool_)
+    ln10 = np.log(10)
+    for i in prange(len(lambda_cb)):
+        if dummy[i] == 0 or np.abs(re[i]) <= 1e-8:
+            continue
+        add_val = np.divide(k[i], (3.71 * d[i]))
+        re_div = np.divide(2.51, re[i])
+        unconverged[i] = True
+        for _ in range(max_iter):
+            sqt_div = np.divide(1, np.sqrt(lambda_cb[i]))
+            b_term = re_div * sqt_div + add_val
+            f = sqt_div + 2 / ln10 * np.log(b_term)
+            df_dln_lambda = - 0.5 * sqt_div - re_div * sqt_div / (ln10 * b_term)
+            x = - f / df_dln_lambda
+            lambda_cb[i] *= np.exp(x)
+            if x < 0:
+                # lower bound for Re -> inf (Nikuradse)
+                lambda_cb[i] = max(lambda_cb[i], np.power(-2 * np.log10(add_val), -2))
+            if np.abs(x) <= 1e-6:
+                unconverged[i] = False
+                break
+
+    return not np.any(unconverged), lambda_cb
+
+
+@jit((float64[:, :], int32[:], int32[:]), nopython=True, cache=True)
 def calc_derived_values_numba(node_pit, from_nodes, to_nodes):
     le = len(from_nodes)
     tinit_branch = np.empty(le, dtype=np.float64)
     height_difference = np.empty(le, dtype=np.float64)
     p_init_i_abs = np.empty(le, dtype=np.float64)
     p_init_i1_abs = np.empty(le, dtype=np.float64)
-    for i in range(le):
+    for i in prange(le):
         fn = from_nodes[i]
         tn = to_nodes[i]
         tinit_branch[i] = (node_pit[fn, TINIT_NODE] + node_pit[tn, TINIT_NODE]) / 2
@@ -190,3 +194,13 @@ def calc_derived_values_numba(node_pit, from_nodes, to_nodes):
         p_init_i_abs[i] = node_pit[fn, PINIT] + node_pit[fn, PAMB]
         p_init_i1_abs[i] = node_pit[tn, PINIT] + node_pit[tn, PAMB]
     return tinit_branch, height_difference, p_init_i_abs, p_init_i1_abs
+
+
+derivatives_hydraulic_incomp_numba_parallel = _parallel(derivatives_hydraulic_incomp_numba)
+derivatives_hydraulic_comp_numba_parallel = _parallel(derivatives_hydraulic_comp_numba)
+calc_lambda_nikuradse_incomp_numba_parallel = _parallel(calc_lambda_nikuradse_incomp_numba)
+calc_lambda_nikuradse_comp_numba_parallel = _parallel(calc_lambda_nikuradse_comp_numba)
+calc_medium_pressure_with_derivative_numba_parallel = \
+    _parallel(calc_medium_pressure_with_derivative_numba)
+colebrook_numba_parallel = _parallel(colebrook_numba)
+calc_derived_values_numba_parallel = _parallel(calc_derived_values_numba)
@@ -0,0 +1,96 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+from contextlib import contextmanager
+from time import perf_counter
+
+from pandapipes.pf.pipeflow_setup import get_net_option
+
+
+def init_instrumentation(net, start_time=None):
+    """
+    Creates the instrumentation data of a pipeflow in net["_instrumentation"] if the option
+    **instrumentation** is set, otherwise removes the data of former pipeflows. The data consists
+    of
+
+        - "timings": the accumulated wall time in seconds per phase of the pipeflow (e.g. \
+          "lookups", "derivatives", "linear_solve" or the adaptions of the single components \
+          such as "Pump.adaption_after_derivatives_hydraulic")
+        - "calls": the number of calls per phase
+        - "iterations": one dict per Newton iteration with the mode, the iteration number, the \
+          residual norm, the damping factor alpha, the norms of the steps of all solver \
+          variables and the wall time of the iteration
+
+    :param net: The pandapipes net for which to perform the pipeflow
+    :type net: pandapipesNet
+    :param start_time: If given, the time since start_time (from time.perf_counter) is recorded \
+            as phase "init_options"
+    :type start_time: float, default None
+    :return: No output
+    """
+    if not get_net_option(net, "instrumentation"):
+        net.pop("_instrumentation", None)
+        return
+    net["_instrumentation"] = {"timings": dict(), "calls": dict(), "iterations": list()}
+    if start_time is not None:
+        record_phase(net, "init_options", perf_counter() - start_time)
+
+
+def record_phase(net, phase, duration):
+    """
+    Adds the duration of a phase to the instrumentation data (if instrumentation is active).
+
+    :param net: The pandapipes net for which the pipeflow is performed
+    :type net: pandapipesNet
+    :param phase: Name of the phase
+    :type phase: str
+    :param duration: Wall time of the phase in seconds
+    :type duration: float
+    :return: No output
+    """
+    instrumentation = net.get("_instrumentation")
+    if instrumentation is None:
+        return
+    instrumentation["timings"][phase] = instrumentation["timings"].get(phase, 0.) + duration
+    instrumentation["calls"][phase] = instrumentation["calls"].get(phase, 0) + 1
+
+
+@contextmanager
+def timed_phase(net, phase):
+    """
+    Context manager that records the wall time of the enclosed code as the given phase (if
+    instrumentation is active).
+
+    :param net: The pandapipes net for which the pipeflow is performed
+    :type net: pandapipesNet
+    :param phase: Name of the phase
+    :type phase: str
+
+    :Example:
+        >>> with timed_phase(net, "lookups"):
+        >>>     create_lookups(net)
+    """
+    if "_instrumentation" not in net:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(net, phase, perf_counter() - start)
+
+
+def record_iteration(net, **data):
+    """
+    Appends the data of one Newton iteration to the instrumentation data (if instrumentation is
+    active).
+
+    :param net: The pandapipes net for which the pipeflow is performed
+    :type net: pandapipesNet
+    :param data: The data of the iteration (e.g. mode, iteration, residual_norm)
+    :return: No output
+    """
+    instrumentation = net.get("_instrumentation")
+    if instrumentation is not None:
+        instrumentation["iterations"].append(data)
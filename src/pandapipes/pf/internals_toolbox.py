@@ -8,15 +8,43 @@ import logging
 from pandapipes.idx_branch import FROM_NODE_T_SWITCHED, TO_NODE, FROM_NODE
 
 try:
-    from numba import jit
+    import numba
+    from numba import jit, prange
     numba_installed = True
 except ImportError:
     from pandapower.pf.no_numba import jit
+    prange = range
     numba_installed = False
 
 
 logger = logging.getLogger(__name__)
 
+# minimum number of elements for which the parallel numba kernels are used
+PARALLEL_MIN_LENGTH = 20000
+
+
+def use_parallel_numba(options, length):
+    """
+    Checks whether the parallel numba kernels shall be used for arrays of the given length
+    according to the options **use_numba** and **numba_threads** and sets the number of threads
+    of numba accordingly. For small nets (less than PARALLEL_MIN_LENGTH elements), the serial
+    kernels are always used, as the parallelization overhead would outweigh the gain.
+
+    :param options: the pipeflow options
+    :type options: dict
+    :param length: the number of elements (e.g. branches) the kernel loops over
+    :type length: int
+    :return: parallel - True if the parallel kernels shall be used
+    :rtype: bool
+    """
+    threads = options.get("numba_threads", 1)
+    if not options["use_numba"] or not numba_installed or threads == 1 \
+            or length < PARALLEL_MIN_LENGTH:
+        return False
+    max_threads = numba.config.NUMBA_NUM_THREADS
+    numba.set_num_threads(max_threads if threads <= 0 else min(threads, max_threads))
+    return True
+
 
 def _sum_by_group_sorted(indices, *values):
     """Auxiliary function to sum up values by some given indices (both as numpy arrays). Expects the
@@ -77,7 +105,7 @@ def _sum_by_group_np(indices, *values):
     return _sum_by_group_sorted(indices, *val)
 
 
-def _sum_by_group(use_numba, indices, *values):
+def _sum_by_group(use_numba, indices, *values, parallel=False):
     """
     Auxiliary function to sum up values by some given indices (both as numpy arrays).
 
@@ -87,6 +115,9 @@ def _sum_by_group(use_numba, indices, *values):
     :type indices:
     :param values:
     :type values:
+    :param parallel: If True, the parallel numba kernel is used (c.f. \
+            :func:`use_parallel_numba`)
+    :type parallel: bool, default False
     :return:
     :rtype:
     """
@@ -105,8 +136,8 @@ def _sum_by_group(use_numba, indices, *values):
     if (max_ind < 1e5 or max_ind < 2 * len(indices)) and max_ind < 10 * len(indices):
         dtypes = [v.dtype for v in values]
         val_arr = np.array(list(values), dtype=np.float64).transpose()
-        new_ind, new_arr = _sum_values_by_index(indices, val_arr, max_ind, len(indices),
-                                                len(values))
+        sum_values = _sum_values_by_index_parallel if parallel else _sum_values_by_index
+        new_ind, new_arr = sum_values(indices, val_arr, max_ind, len(indices), len(values))
         return tuple([new_ind.astype(ind_dt)]
                      + [new_arr[:, i].astype(dtypes[i]) for i in range(len(values))])
     return _sum_by_group_np(indices, *values)
@@ -140,7 +171,7 @@ def select_from_pit(table_index_array, input_array, data):
     return data[indices]
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def _sum_values_by_index(indices, value_arr, max_ind, le, n_vals):
     ind1 = indices + 1
     new_indices = np.zeros(max_ind + 2, dtype=np.int32)
@@ -154,7 +185,34 @@ def _sum_values_by_index(indices, value_arr, max_ind, le, n_vals):
     return new_indices, summed_values
 
 
-@jit(nopython=True)
+# not cached on disk, as numba cannot cache parallel kernels that use the thread count
+@jit(nopython=True, cache=False, parallel=True)
+def _sum_values_by_index_parallel(indices, value_arr, max_ind, le, n_vals):
+    # every thread sums up one chunk of the values, the partial sums are added afterwards
+    n_chunks = numba.get_num_threads()
+    chunk_size = (le + n_chunks - 1) // n_chunks
+    partial_sums = np.zeros((n_chunks, max_ind + 2, n_vals), dtype=np.float64)
+    found = np.zeros((n_chunks, max_ind + 2), dtype=np.bool_)
+    for c in prange(n_chunks):
+        for i in range(c * chunk_size, min(le, (c + 1) * chunk_size)):
+            ind1 = int(indices[i]) + 1
+            found[c, ind1] = True
+            for j in range(n_vals):
+                partial_sums[c, ind1, j] += value_arr[i, j]
+    new_indices = np.zeros(max_ind + 2, dtype=np.int32)
+    summed_values = np.zeros((max_ind + 2, n_vals), dtype=np.float64)
+    for k in prange(max_ind + 2):
+        for c in range(n_chunks):
+            if found[c, k]:
+                new_indices[k] = k
+            for j in range(n_vals):
+                summed_values[k, j] += partial_sums[c, k, j]
+    summed_values = summed_values[new_indices > 0]
+    new_indices = new_indices[new_indices > 0] - 1
+    return new_indices, summed_values
+
+
+@jit(nopython=True, cache=True)
 def max_nb(arr):
     return np.max(arr)
 
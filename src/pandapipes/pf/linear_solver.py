@@ -0,0 +1,499 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import spsolve, splu
+
+from pandapipes.pf.pipeflow_setup import get_net_option, write_internal_results
+
+try:
+    from scikits import umfpack
+
+    umfpack_installed = True
+except ImportError:
+    umfpack_installed = False
+
+try:
+    from kvxopt import klu, matrix as kvx_matrix, spmatrix as kvx_spmatrix
+
+    klu_installed = True
+except ImportError:
+    klu_installed = False
+
+try:
+    from sksparse.cholmod import analyze as cholmod_analyze
+
+    cholmod_installed = True
+except ImportError:
+    cholmod_installed = False
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LinearSolver:
+    """
+    Base class of the sparse linear solver backends that solve the linearized system of
+    equations in each Newton-Raphson iteration. :func:`build_system_matrix` directly assembles
+    the system matrix in the native format of the backend (**matrix_format**), so that no
+    conversion copy is necessary.
+
+    Backends that support it split the factorization into a symbolic analysis (fill-reducing
+    ordering and structure), which only depends on the sparsity pattern, and a numeric
+    factorization. The symbolic analysis can then be reused as long as the sparsity pattern of
+    the system matrix does not change (c.f. :func:`solve_linear_system`).
+    """
+    name = ""
+    matrix_format = "csc"
+    reuses_symbolic = True
+
+    @classmethod
+    def is_available(cls):
+        """
+        Checks whether the backend can be used in the current environment.
+
+        :return: True if all required packages are installed
+        :rtype: bool
+        """
+        return True
+
+    def factorize(self, matrix, symbolic=None):
+        """
+        Computes the LU factorization of the given system matrix. If the symbolic analysis of a
+        matrix with the same sparsity pattern is given, only the numeric factorization is
+        performed.
+
+        :param matrix: the system matrix
+        :type matrix: scipy.sparse.csc_matrix | scipy.sparse.csr_matrix
+        :param symbolic: the symbolic analysis of a matrix with the same sparsity pattern
+        :type symbolic: object, default None
+        :return: (factor, symbolic) - the factorization object and the symbolic analysis
+        :rtype: tuple
+        """
+        raise NotImplementedError("The linear solver %s does not provide a factorization."
+                                  % self.name)
+
+    def solve_factorized(self, factor, rhs):
+        """
+        Solves the linear system for a given factorization and right hand side.
+
+        :param factor: the factorization object as returned by :meth:`factorize`
+        :param rhs: the right hand side of the linear system
+        :type rhs: numpy.ndarray
+        :return: x - the solution vector
+        :rtype: numpy.ndarray
+        """
+        raise NotImplementedError("The linear solver %s does not provide a factorization."
+                                  % self.name)
+
+    def solve(self, matrix, rhs, symbolic=None):
+        """
+        Solves the linear system matrix * x = rhs.
+
+        :param matrix: the system matrix
+        :type matrix: scipy.sparse.csc_matrix | scipy.sparse.csr_matrix
+        :param rhs: the right hand side of the linear system
+        :type rhs: numpy.ndarray
+        :param symbolic: the symbolic analysis of a matrix with the same sparsity pattern
+        :type symbolic: object, default None
+        :return: (x, symbolic) - the solution vector and the symbolic analysis
+        :rtype: tuple
+        """
+        factor, symbolic = self.factorize(matrix, symbolic)
+        return self.solve_factorized(factor, rhs), symbolic
+
+
+class ScipySolver(LinearSolver):
+    """
+    Pure SciPy fallback that calls :func:`scipy.sparse.linalg.spsolve` without keeping any
+    factorization. The system matrix is kept in CSR format, which spsolve handles without
+    conversion by solving the transposed system, so that the results are identical to former
+    versions.
+    """
+    name = "scipy"
+    matrix_format = "csr"
+    reuses_symbolic = False
+
+    def factorize(self, matrix, symbolic=None):
+        return splu(matrix.tocsc()), None
+
+    def solve_factorized(self, factor, rhs):
+        return factor.solve(rhs)
+
+    def solve(self, matrix, rhs, symbolic=None):
+        return spsolve(matrix, rhs), None
+
+
+class SuperLUSolver(LinearSolver):
+    """
+    SuperLU (shipped with SciPy) with COLAMD column ordering. As SuperLU has no separate
+    symbolic step, the symbolic analysis consists of the COLAMD column permutation of the first
+    factorization. Later factorizations permute the columns in advance and skip the ordering.
+    """
+    name = "superlu"
+
+    def factorize(self, matrix, symbolic=None):
+        if symbolic is None:
+            factor = splu(matrix, permc_spec="COLAMD")
+            col_order = np.argsort(factor.perm_c)
+            counts = np.diff(matrix.indptr)[col_order]
+            indptr = np.zeros(len(counts) + 1, dtype=matrix.indptr.dtype)
+            np.cumsum(counts, out=indptr[1:])
+            data_order = np.repeat(matrix.indptr[col_order] - indptr[:-1], counts) \
+                + np.arange(indptr[-1])
+            symbolic = (col_order, indptr, matrix.indices[data_order], data_order)
+            return (factor, None), symbolic
+        col_order, indptr, indices, data_order = symbolic
+        permuted = csc_matrix((matrix.data[data_order], indices, indptr), shape=matrix.shape)
+        return (splu(permuted, permc_spec="NATURAL"), col_order), symbolic
+
+    def solve_factorized(self, factor, rhs):
+        lu, col_order = factor
+        if col_order is None:
+            return lu.solve(rhs)
+        x = np.empty_like(rhs, dtype=np.float64)
+        x[col_order] = lu.solve(rhs)
+        return x
+
+
+class UmfpackSolver(LinearSolver):
+    """
+    UMFPACK from SuiteSparse, available if scikit-umfpack is installed. The UMFPACK context
+    holds the symbolic analysis.
+    """
+    name = "umfpack"
+
+    @classmethod
+    def is_available(cls):
+        return umfpack_installed
+
+    def factorize(self, matrix, symbolic=None):
+        if symbolic is None:
+            symbolic = umfpack.UmfpackContext("dl" if matrix.indices.dtype == np.int64 else "di")
+            symbolic.symbolic(matrix)
+        symbolic.numeric(matrix)
+        return (symbolic, matrix), symbolic
+
+    def solve_factorized(self, factor, rhs):
+        context, matrix = factor
+        return context.solve(umfpack.UMFPACK_A, matrix, rhs, autoTranspose=True)
+
+
+class KLUSolver(LinearSolver):
+    """
+    KLU from SuiteSparse, which is tailored to the very sparse matrices of network problems.
+    Available if kvxopt is installed.
+    """
+    name = "klu"
+
+    @classmethod
+    def is_available(cls):
+        return klu_installed
+
+    @staticmethod
+    def to_kvxopt(matrix):
+        """
+        Creates a kvxopt sparse matrix from a canonical CSC matrix. The values are stored in the
+        same order as in matrix.data.
+
+        :param matrix: the system matrix
+        :type matrix: scipy.sparse.csc_matrix
+        :return: the system matrix as kvxopt.spmatrix
+        """
+        matrix.sum_duplicates()
+        cols = np.repeat(np.arange(matrix.shape[1], dtype=np.int64), np.diff(matrix.indptr))
+        return kvx_spmatrix(kvx_matrix(matrix.data), kvx_matrix(matrix.indices.astype(np.int64)),
+                            kvx_matrix(cols), matrix.shape)
+
+    def factorize(self, matrix, symbolic=None):
+        if symbolic is None:
+            kvx_mat = self.to_kvxopt(matrix)
+            symbolic = (kvx_mat, klu.symbolic(kvx_mat))
+        else:
+            kvx_mat = symbolic[0]
+            matrix.sum_duplicates()
+            kvx_mat.V = kvx_matrix(matrix.data)
+        return (kvx_mat, symbolic[1], klu.numeric(kvx_mat, symbolic[1])), symbolic
+
+    def solve_factorized(self, factor, rhs):
+        kvx_mat, symbolic, numeric = factor
+        x = kvx_matrix(np.array(rhs, dtype=np.float64))
+        klu.solve(kvx_mat, symbolic, numeric, x)
+        return np.array(x).ravel()
+
+
+class SymmetricSuperLUSolver(LinearSolver):
+    """
+    SuperLU in symmetric mode for symmetric positive definite systems (e.g. the nodal system of
+    liquid networks). The rows and columns are permuted with the same fill-reducing ordering
+    (minimum degree on A^T + A) and the diagonal entries are used as pivots, which results in
+    less fill-in than the general LU. The symbolic analysis consists of the symmetric permutation
+    of the first factorization, later factorizations permute the matrix in advance.
+    """
+    name = "superlu_symmetric"
+
+    @staticmethod
+    def _splu(matrix, permc_spec):
+        return splu(matrix, permc_spec=permc_spec, diag_pivot_thresh=0.,
+                    options={"SymmetricMode": True})
+
+    def factorize(self, matrix, symbolic=None):
+        if symbolic is None:
+            matrix.sum_duplicates()
+            factor = self._splu(matrix, "MMD_AT_PLUS_A")
+            order = np.argsort(factor.perm_c)
+            # positions of the entries of the permuted matrix within matrix.data
+            positions = csc_matrix((np.arange(1, matrix.nnz + 1), matrix.indices, matrix.indptr),
+                                   shape=matrix.shape)[order][:, order].tocsc()
+            positions.sort_indices()
+            symbolic = (order, positions.indptr, positions.indices,
+                        positions.data.astype(np.int64) - 1)
+            return (factor, None), symbolic
+        order, indptr, indices, data_order = symbolic
+        permuted = csc_matrix((matrix.data[data_order], indices, indptr), shape=matrix.shape)
+        return (self._splu(permuted, "NATURAL"), order), symbolic
+
+    def solve_factorized(self, factor, rhs):
+        lu, order = factor
+        if order is None:
+            return lu.solve(rhs)
+        x = np.empty_like(rhs, dtype=np.float64)
+        x[order] = lu.solve(rhs[order])
+        return x
+
+
+class CholmodSolver(LinearSolver):
+    """
+    Sparse Cholesky factorization by CHOLMOD from SuiteSparse for symmetric positive definite
+    systems, available if scikit-sparse is installed. The analyzed factor holds the symbolic
+    analysis.
+    """
+    name = "cholmod"
+
+    @classmethod
+    def is_available(cls):
+        return cholmod_installed
+
+    def factorize(self, matrix, symbolic=None):
+        if symbolic is None:
+            symbolic = cholmod_analyze(matrix)
+        return symbolic.cholesky(matrix), symbolic
+
+    def solve_factorized(self, factor, rhs):
+        return factor(rhs)
+
+
+LINEAR_SOLVERS = {solver.name: solver for solver in
+                  [ScipySolver, SuperLUSolver, UmfpackSolver, KLUSolver]}
+
+# order of preference if the linear solver is chosen automatically
+AUTO_PREFERENCE = ["klu", "umfpack", "superlu"]
+
+SYMMETRIC_SOLVERS = {solver.name: solver for solver in [SymmetricSuperLUSolver, CholmodSolver]}
+
+
+@lru_cache(maxsize=None)
+def get_linear_solver(solver_name):
+    """
+    Returns the linear solver backend for the given name. If "auto" is passed, the fastest
+    installed backend is chosen (KLU, UMFPACK, SuperLU). If the requested backend is not
+    installed, the SciPy fallback is used instead.
+
+    :param solver_name: name of the backend ("auto", "scipy", "superlu", "umfpack" or "klu")
+    :type solver_name: str
+    :return: solver - the linear solver backend
+    :rtype: LinearSolver
+    """
+    solver_name = solver_name.lower()
+    if solver_name == "auto":
+        solver_name = next(n for n in AUTO_PREFERENCE if LINEAR_SOLVERS[n].is_available())
+    if solver_name not in LINEAR_SOLVERS:
+        raise UserWarning("The linear solver %s is not known. Please choose one of 'auto', '%s'."
+                          % (solver_name, "', '".join(LINEAR_SOLVERS.keys())))
+    solver_class = LINEAR_SOLVERS[solver_name]
+    if not solver_class.is_available():
+        logger.warning("The linear solver %s is not installed. Using the SciPy solver instead."
+                       % solver_name)
+        solver_class = ScipySolver
+    return solver_class()
+
+
+def get_symmetric_solver(solver):
+    """
+    Returns the backend for a symmetric positive definite system, given the backend chosen for
+    general systems. CHOLMOD is used if it is installed. Otherwise, the SuperLU based backends
+    are replaced by SuperLU in symmetric mode, while KLU and UMFPACK are kept, as they are
+    faster than the symmetric SuperLU.
+
+    :param solver: the linear solver backend chosen in the pipeflow options
+    :type solver: LinearSolver
+    :return: solver - the linear solver backend for the symmetric system
+    :rtype: LinearSolver
+    """
+    if CholmodSolver.is_available():
+        return CholmodSolver()
+    if solver.name in ["scipy", "superlu"]:
+        return SymmetricSuperLUSolver()
+    return solver
+
+
+def _get_solver_by_name(solver_name):
+    if solver_name in SYMMETRIC_SOLVERS:
+        return SYMMETRIC_SOLVERS[solver_name]()
+    return get_linear_solver(solver_name)
+
+
+def solve_linear_system(net, matrix, rhs, mode, structure=None, symmetric=False):
+    """
+    Solves the linearized system of equations with the linear solver backend chosen in the
+    pipeflow options. The name of the backend that was actually used is written to the internal
+    results.
+
+    The symbolic analysis of the system matrix is cached in net["_internal_data"] together with
+    the sparsity pattern it belongs to. As long as the pattern does not change, only the numeric
+    factorization is performed. If the option **reuse_internal_data** is set, the cache is kept
+    between pipeflow calls (e.g. the time steps of a time series). The number of factorizations
+    is written to the internal results.
+
+    :param net: The pandapipesNet for which to solve the linear system
+    :type net: pandapipesNet
+    :param matrix: the system matrix
+    :type matrix: scipy.sparse.csc_matrix | scipy.sparse.csr_matrix
+    :param rhs: the right hand side of the linear system
+    :type rhs: numpy.ndarray
+    :param mode: the calculation the system belongs to ("hydraulics" or "heat_transfer")
+    :type mode: str
+    :param structure: array describing the structure of the system matrix, which is stored with\
+            the factorization if the nonlinear method "chord" or "linesearch" is used (c.f. \
+            :func:`solve_chord_step` and :func:`solve_with_last_factorization`)
+    :type structure: numpy.ndarray, default None
+    :param symmetric: If True, the system matrix is symmetric positive definite and is solved \
+            with the backend from :func:`get_symmetric_solver`
+    :type symmetric: bool, default False
+    :return: x - the solution vector
+    :rtype: numpy.ndarray
+    """
+    solver = get_linear_solver(get_net_option(net, "linear_solver"))
+    if symmetric:
+        solver = get_symmetric_solver(solver)
+        if matrix.format != solver.matrix_format:
+            # the transposed matrix is the same matrix in the other compressed format (no copy)
+            matrix = matrix.T
+    write_internal_results(net, linear_solver=solver.name)
+    _count_factorization(net, mode)
+    internal_data = net["_internal_data"] if "_internal_data" in net else None
+    keep_factor = internal_data is not None \
+        and get_net_option(net, "nonlinear_method") in ["chord", "linesearch"]
+    if internal_data is None or not (solver.reuses_symbolic or keep_factor):
+        return solver.solve(matrix, rhs)[0]
+
+    symbolic = None
+    if solver.reuses_symbolic:
+        cache_key = "factorization_%s" % mode
+        cache = internal_data.get(cache_key)
+        matrix.sum_duplicates()
+        if cache is not None and cache["solver"] == solver.name \
+                and cache["shape"] == matrix.shape \
+                and np.array_equal(cache["indptr"], matrix.indptr) \
+                and np.array_equal(cache["indices"], matrix.indices):
+            symbolic = cache["symbolic"]
+            cache["symbolic_reused"] += 1
+    factor, new_symbolic = solver.factorize(matrix, symbolic)
+    if solver.reuses_symbolic and symbolic is None:
+        internal_data[cache_key] = {
+            "solver": solver.name, "shape": matrix.shape, "indptr": matrix.indptr.copy(),
+            "indices": matrix.indices.copy(), "symbolic": new_symbolic, "symbolic_reused": 0}
+    if keep_factor:
+        internal_data["factor_%s" % mode] = {
+            "solver": solver.name, "structure": structure, "factor": factor,
+            "residual_norm": np.linalg.norm(rhs)}
+    return solver.solve_factorized(factor, rhs)
+
+
+def solve_chord_step(net, rhs, mode, structure):
+    """
+    Performs a step of the chord method, i.e. solves the linear system with the factorization of
+    the system matrix from a former iteration (or a former pipeflow call, if the option
+    **reuse_internal_data** is set). Only the load vector has to be updated for such a step.
+
+    No step is performed (and None is returned) if no factorization for the same system
+    structure is available or if the residual norm was not reduced by at least the factor
+    **chord_refactor_ratio** compared to the last iteration. In that case, a full Newton step
+    with a new factorization has to be performed instead (c.f. :func:`solve_linear_system`).
+
+    :param net: The pandapipesNet for which to solve the linear system
+    :type net: pandapipesNet
+    :param rhs: the right hand side of the linear system
+    :type rhs: numpy.ndarray
+    :param mode: the calculation the system belongs to ("hydraulics" or "heat_transfer")
+    :type mode: str
+    :param structure: array describing the structure of the system matrix (e.g. from and to nodes\
+            of the branches) that is compared to the structure of the stored factorization
+    :type structure: numpy.ndarray
+    :return: x - the solution vector or None if a new factorization is required
+    :rtype: numpy.ndarray
+    """
+    if "_internal_data" not in net:
+        return None
+    chord = net["_internal_data"].get("factor_%s" % mode)
+    solver = get_linear_solver(get_net_option(net, "linear_solver"))
+    if chord is None or chord["solver"] != solver.name \
+            or not np.array_equal(chord["structure"], structure):
+        return None
+    residual_norm = np.linalg.norm(rhs)
+    if chord["residual_norm"] is not None \
+            and residual_norm > get_net_option(net, "chord_refactor_ratio") * chord["residual_norm"]:
+        logger.debug("residual reduction of chord step stalled, refactorizing system matrix")
+        return None
+    chord["residual_norm"] = residual_norm
+    write_internal_results(net, linear_solver=solver.name)
+    net["_internal_results"].setdefault("factorizations_%s" % mode, 0)
+    return solver.solve_factorized(chord["factor"], rhs)
+
+
+def solve_with_last_factorization(net, rhs, mode):
+    """
+    Solves the linear system with the factorization of the last system matrix that was
+    factorized by :func:`solve_linear_system`. Requires the nonlinear method "chord" or
+    "linesearch", for which the factorization is kept.
+
+    :param net: The pandapipesNet for which to solve the linear system
+    :type net: pandapipesNet
+    :param rhs: the right hand side of the linear system
+    :type rhs: numpy.ndarray
+    :param mode: the calculation the system belongs to ("hydraulics" or "heat_transfer")
+    :type mode: str
+    :return: x - the solution vector
+    :rtype: numpy.ndarray
+    """
+    factor = net["_internal_data"]["factor_%s" % mode]
+    return _get_solver_by_name(factor["solver"]).solve_factorized(factor["factor"], rhs)
+
+
+def reset_chord_steps(net):
+    """
+    Resets the reference residual norms of the stored chord factorizations at the beginning of a
+    new Newton-Raphson loop. The stored factorizations themselves are kept.
+
+    :param net: The pandapipesNet for which to reset the chord steps
+    :type net: pandapipesNet
+    :return: No output
+    """
+    if "_internal_data" not in net:
+        return
+    for mode in ["hydraulics", "heat_transfer"]:
+        if "factor_%s" % mode in net["_internal_data"]:
+            net["_internal_data"]["factor_%s" % mode]["residual_norm"] = None
+
+
+def _count_factorization(net, mode):
+    key = "factorizations_%s" % mode
+    write_internal_results(net, **{key: net["_internal_results"].get(key, 0) + 1})
@@ -0,0 +1,206 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix
+
+from pandapipes.idx_branch import FROM_NODE, TO_NODE, JAC_DERIV_DM, JAC_DERIV_DP, JAC_DERIV_DP1, \
+    JAC_DERIV_DM_NODE
+from pandapipes.idx_node import NODE_TYPE, P, PC as PC_NODE, JAC_DERIV_MSL
+from pandapipes.pf.internals_toolbox import _sum_by_group
+from pandapipes.pf.linear_solver import get_linear_solver, solve_linear_system, \
+    solve_with_last_factorization
+from pandapipes.pf.pipeflow_setup import get_net_option
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+NODAL_MODE = "hydraulics_nodal"
+
+
+def build_nodal_system(net, branch_pit, node_pit):
+    """
+    Builds the reduced nodal system of the linearized hydraulic equations. As every branch
+    equation only contains the mass flow of the branch itself and the pressures of its from and
+    to node, the branch mass flows can be eliminated (Schur complement of the branch block):
+
+    .. math::
+        \\dot{m}_b = (F_b - \\partial_p F_b \\cdot p_{from} - \\partial_{p1} F_b \\cdot p_{to})
+        / \\partial_m F_b
+
+    Inserting them into the mass balances of the nodes leaves a system that only contains the
+    pressures of the nodes without fixed pressure. Its dimension is the number of these nodes
+    instead of nodes + branches + slack nodes. If all branches fulfill
+    dF/dp_to = -dF/dp_from (e.g. liquid networks), the matrix is a symmetric positive definite
+    weighted graph Laplacian (flag "symmetric"), for which a cheaper symmetric factorization is
+    used (c.f. :func:`pandapipes.pf.linear_solver.get_symmetric_solver`).
+
+    The elimination is not possible if a branch has no mass flow derivative (e.g. pressure
+    controllers). In that case, None is returned.
+
+    :param net: The pandapipesNet for which to build the nodal system
+    :type net: pandapipesNet
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :return: nodal - dict with the reduced system matrix ("matrix") and the coefficients that \
+            are required to reduce load vectors and to expand the solution, or None
+    :rtype: dict
+    """
+    dm = branch_pit[:, JAC_DERIV_DM].copy()
+    node_types = node_pit[:, NODE_TYPE]
+    if np.any(dm == 0) or np.any(node_types == PC_NODE):
+        return None
+    len_n = len(node_pit)
+    free = node_types != P
+    nodal_index = np.full(len_n, -1, dtype=np.int64)
+    nodal_index[free] = np.arange(np.sum(free))
+    fn = branch_pit[:, FROM_NODE].astype(np.int32)
+    tn = branch_pit[:, TO_NODE].astype(np.int32)
+    dp = branch_pit[:, JAC_DERIV_DP].copy()
+    dp1 = branch_pit[:, JAC_DERIV_DP1].copy()
+    dm_node = branch_pit[:, JAC_DERIV_DM_NODE].copy()
+    conductance = -dm_node / dm
+
+    # mass balances of the from nodes (positive) and the to nodes (negative) with inserted
+    # branch mass flows
+    rows = np.concatenate([fn, fn, tn, tn])
+    cols = np.concatenate([fn, tn, fn, tn])
+    data = np.concatenate([conductance * dp, conductance * dp1, -conductance * dp,
+                           -conductance * dp1])
+    in_system = free[rows] & free[cols]
+    fixed_column = free[rows] & ~free[cols]
+
+    use_numba = get_net_option(net, "use_numba")
+    matrix_format = get_linear_solver(get_net_option(net, "linear_solver")).matrix_format
+    sparse_matrix = csc_matrix if matrix_format == "csc" else csr_matrix
+    n_free = np.sum(free)
+    matrix = sparse_matrix((data[in_system], (nodal_index[rows[in_system]],
+                                              nodal_index[cols[in_system]])),
+                           shape=(n_free, n_free))
+    symmetric = np.array_equal(dp1, -dp) and np.all(conductance * dp > 0)
+
+    return {"matrix": matrix, "symmetric": symmetric, "free": free,
+            "nodal_index": nodal_index, "from_nodes": fn, "to_nodes": tn, "dm": dm, "dp": dp,
+            "dp1": dp1, "dm_node": dm_node, "conductance": conductance,
+            "fixed_rows": rows[fixed_column], "fixed_cols": cols[fixed_column],
+            "fixed_data": data[fixed_column], "slack_nodes": np.where(~free)[0],
+            "msl": node_pit[~free, JAC_DERIV_MSL].copy(), "use_numba": use_numba}
+
+
+def nodal_load_vector(nodal, load_vector):
+    """
+    Reduces the load vector of the full hydraulic system to the load vector of the nodal system
+    (c.f. :func:`build_nodal_system`).
+
+    :param nodal: the nodal system from :func:`build_nodal_system`
+    :type nodal: dict
+    :param load_vector: the load vector of the full system
+    :type load_vector: numpy.ndarray
+    :return: nodal_load_vector - the load vector of the nodal system
+    :rtype: numpy.ndarray
+    """
+    free, use_numba = nodal["free"], nodal["use_numba"]
+    len_n, len_b = len(free), len(nodal["dm"])
+    load_branches = load_vector[len_n:len_n + len_b] * nodal["conductance"]
+    rhs = load_vector[:len_n] * (-1)
+    fn_unique, fn_sums = _sum_by_group(use_numba, nodal["from_nodes"], load_branches)
+    tn_unique, tn_sums = _sum_by_group(use_numba, nodal["to_nodes"], load_branches)
+    rhs[fn_unique] += fn_sums
+    rhs[tn_unique] -= tn_sums
+    # the pressure corrections of the slack nodes are known
+    if len(nodal["fixed_rows"]):
+        fixed_unique, fixed_sums = _sum_by_group(
+            use_numba, nodal["fixed_rows"],
+            nodal["fixed_data"] * load_vector[nodal["fixed_cols"]])
+        rhs[fixed_unique] -= fixed_sums
+    return rhs[free]
+
+
+def expand_nodal_solution(nodal, x_nodes, load_vector):
+    """
+    Calculates the solution of the full hydraulic system (pressures, branch mass flows and slack
+    mass flows) from the solution of the nodal system.
+
+    :param nodal: the nodal system from :func:`build_nodal_system`
+    :type nodal: dict
+    :param x_nodes: the solution of the nodal system
+    :type x_nodes: numpy.ndarray
+    :param load_vector: the load vector of the full system
+    :type load_vector: numpy.ndarray
+    :return: x - the solution of the full system
+    :rtype: numpy.ndarray
+    """
+    free, slack_nodes = nodal["free"], nodal["slack_nodes"]
+    fn, tn, dm_node = nodal["from_nodes"], nodal["to_nodes"], nodal["dm_node"]
+    len_n, len_b = len(free), len(nodal["dm"])
+    x = np.empty(len(load_vector))
+    x[:len_n] = load_vector[:len_n]
+    x[:len_n][free] = x_nodes
+    x_branches = (load_vector[len_n:len_n + len_b] - nodal["dp"] * x[fn] - nodal["dp1"] * x[tn]) \
+        / nodal["dm"]
+    x[len_n:len_n + len_b] = x_branches
+
+    slack_index = np.full(len_n, -1, dtype=np.int64)
+    slack_index[slack_nodes] = np.arange(len(slack_nodes))
+    slack_mass = load_vector[len_n + len_b:].copy()
+    from_slack, to_slack = ~free[fn], ~free[tn]
+    np.add.at(slack_mass, slack_index[fn[from_slack]],
+              dm_node[from_slack] * x_branches[from_slack])
+    np.add.at(slack_mass, slack_index[tn[to_slack]], -dm_node[to_slack] * x_branches[to_slack])
+    x[len_n + len_b:] = slack_mass / nodal["msl"]
+    return x
+
+
+def solve_nodal_system(net, branch_pit, node_pit, load_vector):
+    """
+    Solves the linearized hydraulic system of one Newton iteration via the reduced nodal system
+    (c.f. :func:`build_nodal_system`) with the **linear_solver** or, if the nodal system is
+    symmetric, with the symmetric backend derived from it. The nodal system is stored in
+    net["_internal_data"] for further right hand sides (c.f. :func:`solve_nodal_last_system`).
+
+    :param net: The pandapipesNet for which to solve the linear system
+    :type net: pandapipesNet
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :param load_vector: the load vector of the full system
+    :type load_vector: numpy.ndarray
+    :return: x - the solution of the full system or None if the nodal system cannot be built
+    :rtype: numpy.ndarray
+    """
+    nodal = build_nodal_system(net, branch_pit, node_pit)
+    if "_internal_data" in net:
+        net["_internal_data"]["nodal_hydraulics"] = nodal
+    if nodal is None:
+        logger.debug("nodal formulation not possible, solving the full system instead")
+        return None
+    x_nodes = solve_linear_system(net, nodal["matrix"], nodal_load_vector(nodal, load_vector),
+                                  NODAL_MODE, symmetric=nodal["symmetric"])
+    return expand_nodal_solution(nodal, x_nodes, load_vector)
+
+
+def solve_nodal_last_system(net, load_vector):
+    """
+    Solves the linearized hydraulic system for another right hand side with the factorization of
+    the nodal system that was solved by the last call of :func:`solve_nodal_system`. Requires
+    the nonlinear method "linesearch", for which the factorization is kept.
+
+    :param net: The pandapipesNet for which to solve the linear system
+    :type net: pandapipesNet
+    :param load_vector: the load vector of the full system
+    :type load_vector: numpy.ndarray
+    :return: x - the solution of the full system
+    :rtype: numpy.ndarray
+    """
+    nodal = net["_internal_data"]["nodal_hydraulics"]
+    x_nodes = solve_with_last_factorization(net, nodal_load_vector(nodal, load_vector),
+                                            NODAL_MODE)
+    return expand_nodal_solution(nodal, x_nodes, load_vector)
@@ -10,9 +10,10 @@ from pandapower.auxiliary import ppException
 from scipy.sparse import coo_matrix, csgraph
 
 from pandapipes.idx_branch import FROM_NODE, TO_NODE, branch_cols, MDOTINIT, \
-    ACTIVE as ACTIVE_BR, FLOW_RETURN_CONNECT, ACTIVE, BRANCH_TYPE, CIRC
+    ACTIVE as ACTIVE_BR, FLOW_RETURN_CONNECT, ACTIVE, BRANCH_TYPE, CIRC, TOUTINIT, \
+    TABLE_IDX as TABLE_IDX_BR, ELEMENT_IDX as ELEMENT_IDX_BR
 from pandapipes.idx_node import NODE_TYPE, P, NODE_TYPE_T, node_cols, T, ACTIVE as ACTIVE_ND, \
-    TABLE_IDX as TABLE_IDX_ND, ELEMENT_IDX as ELEMENT_IDX_ND, INFEED
+    TABLE_IDX as TABLE_IDX_ND, ELEMENT_IDX as ELEMENT_IDX_ND, INFEED, PINIT, MDOTSLACKINIT, TINIT
 from pandapipes.pf.internals_toolbox import _sum_by_group
 from pandapipes.properties.fluids import get_fluid
 
@@ -33,6 +34,12 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# columns of the pit that contain the start values of the Newton-Raphson iterations
+NODE_START_COLS = [PINIT, MDOTSLACKINIT, TINIT]
+BRANCH_START_COLS = [MDOTINIT, TOUTINIT]
+# columns of the branch pit that have to be equal for a warm start
+STRUCTURE_COLS_BR = [TABLE_IDX_BR, ELEMENT_IDX_BR, FROM_NODE, TO_NODE]
+
 default_options = {"friction_model": "nikuradse", "tol_p": 1e-5, "tol_m": 1e-5,
                    "tol_T": 1e-3, "tol_res": 1e-3, "max_iter_hyd": 10, "max_iter_therm": 10, "max_iter_bidirect": 10,
                    "error_flag": False, "alpha": 1,
@@ -40,7 +47,12 @@ default_options = {"friction_model": "nikuradse", "tol_p": 1e-5, "tol_m": 1e-5,
                    "ambient_temperature": 293.15, "check_connectivity": True,
                    "max_iter_colebrook": 10, "only_update_hydraulic_matrix": False,
                    "reuse_internal_data": False, "use_numba": True,
-                   "quit_on_inconsistency_connectivity": False, "calc_compression_power": True}
+                   "quit_on_inconsistency_connectivity": False, "calc_compression_power": True,
+                   "linear_solver": "scipy", "chord_refactor_ratio": 0.5,
+                   "max_iter_linesearch": 10, "init": "flat", "instrumentation": False,
+                   "solve_islands": False, "island_threads": 1, "radial_solver": False,
+                   "hydraulic_formulation": "extended", "bidirectional_formulation": "alternating",
+                   "numba_threads": 1, "results": None, "results_format": "pandas"}
 
 
 def get_net_option(net, option_name):
@@ -235,7 +247,10 @@ def init_options(net, local_parameters):
                 calculation of the barometric formula
 
         - **friction_model** (str): "nikuradse" - The friction model that shall be used to identify\
-                the value for lambda (can be "nikuradse" or "colebrook")
+                the value for lambda (can be "nikuradse", "colebrook", "swamee-jain" or \
+                "serghides"). "colebrook" solves the Colebrook-White equation iteratively for \
+                every branch (c.f. **max_iter_colebrook**), starting from the friction factors of \
+                the last Newton step, "serghides" is an explicit approximation of it.
 
         - **alpha** (float): 1 - The step width for the Newton iterations. If the Newton steps \
                 shall be damped, **alpha** can be reduced. See also the **nonlinear_method** \
@@ -243,8 +258,20 @@ def init_options(net, local_parameters):
 
         - **nonlinear_method** (str): "constant" - The option of how the damping factor **alpha** \
                 is determined in each iteration. It can be "constant" (i.e. **alpha** is always the\
-                 same in each iteration) or "automatic", in which case **alpha** is adapted \
-                 automatically with respect to the convergence behaviour.
+                 same in each iteration), "automatic", in which case **alpha** is adapted \
+                 automatically with respect to the convergence behaviour, "linesearch", in which \
+                 case the Newton step is shortened by a backtracking line search (natural \
+                 monotonicity test, see **max_iter_linesearch**), or "chord", in which \
+                 case the factorized system matrix of a former iteration is reused (and only the \
+                 load vector is updated) as long as the residual decreases sufficiently (see \
+                 **chord_refactor_ratio**).
+
+        - **max_iter_linesearch** (int): 10 - Only used for the nonlinear method "linesearch". \
+                The maximum number of step width halvings in the backtracking line search.
+
+        - **chord_refactor_ratio** (float): 0.5 - Only used for the nonlinear method "chord". If \
+                the norm of the residual is not reduced below this ratio of the former \
+                iteration's residual norm, the system matrix is built and factorized anew.
 
         - **mode** (str): "hydraulics" - Define the calculation mode: what shall be calculated - \
                 solely hydraulics ('hydraulics'), solely heat transfer('heat') or both combined sequentially \
@@ -255,6 +282,12 @@ def init_options(net, local_parameters):
                 is identified in the first iteration. This speeds up calculation, but has not yet\
                 been tested extensively.
 
+        - **reuse_internal_data** (bool): False - If True, internal data of the calculation (e.g.\
+                the system matrix lookup of **only_update_hydraulic_matrix** or the symbolic\
+                factorization of the linear solver) is kept after the pipeflow and reused in the\
+                next pipeflow call as long as the structure of the system matrix is unchanged.\
+                This speeds up time series calculations with a fixed topology.
+
         - **check_connectivity** (bool): True - If True, a connectivity check is performed at the\
                 beginning of the pipeflow and parts of the net that are not connected to external\
                 grids are set inactive.
@@ -266,6 +299,93 @@ def init_options(net, local_parameters):
 
         - **use_numba** (bool): True - If True, use numba for more efficient internal calculations
 
+        - **numba_threads** (int): 1 - Only used if **use_numba** is True. If not 1, parallel \
+                numba kernels are used for the derivatives and the load vector of nets with at \
+                least 20000 branches (c.f. \
+                :func:`pandapipes.pf.internals_toolbox.use_parallel_numba`) with this number of \
+                threads (at most NUMBA_NUM_THREADS, 0 means all of them). Smaller nets are always \
+                calculated with the serial kernels. The parallel kernels are not used for the \
+                islands of **solve_islands** if **island_threads** is larger than 1.
+
+        - **init** (str): "flat" - The start values of the Newton-Raphson iterations. With \
+                "flat", they are derived from the input tables (e.g. junction pressures and \
+                temperatures). With "results", the solution of the last converged pipeflow is \
+                used (warm start), if the structure of the net did not change. "auto" behaves \
+                like "results", but falls back to "flat" without a warning.
+
+        - **linear_solver** (str): "scipy" - The sparse linear solver backend that solves the\
+                linearized system of equations in each Newton iteration. It can be "scipy" \
+                (scipy.sparse.linalg.spsolve), "superlu", "umfpack" (requires scikit-umfpack), \
+                "klu" (requires kvxopt) or "auto", in which case the fastest installed backend is \
+                chosen. The backend that was used is stored in net._internal_results. Except\
+                for "scipy", the symbolic analysis of the system matrix is only performed once as\
+                long as its sparsity pattern does not change.
+
+        - **radial_solver** (bool or str): False - If the net is radial (every part of the net\
+                is a tree that is fed by exactly one external grid with fixed pressure and \
+                contains no pressure controllers), the linearized hydraulic system of each \
+                iteration can be solved directly by a backward sweep for the mass flows and a \
+                forward sweep for the pressures instead of a sparse factorization (c.f. \
+                :func:`pandapipes.pf.radial_solver.solve_radial_system`). With "auto", the sweep\
+                is used whenever the net is radial, with True, a UserWarning is raised if the net\
+                is not radial, and False always uses the **linear_solver**. If the sweep is \
+                used, it replaces the **linear_solver**, the **hydraulic_formulation** and the \
+                chord steps of the nonlinear method "chord".
+
+        - **hydraulic_formulation** (str): "extended" - The linearized hydraulic system of \
+                each iteration is solved either in the "extended" formulation with the pressures,\
+                branch mass flows and slack mass flows as unknowns or in the "nodal" \
+                formulation, in which the branch mass flows are eliminated beforehand, so that \
+                only a system for the pressures of the nodes without fixed pressure is solved \
+                (c.f. :func:`pandapipes.pf.nodal_formulation.build_nodal_system`). The nodal \
+                formulation is not used for the nonlinear method "chord" and for nets with \
+                pressure controllers. The nodal system is solved with the **linear_solver**, \
+                or, if it is symmetric positive definite (e.g. liquid networks), with a \
+                symmetric factorization (CHOLMOD if scikit-sparse is installed, otherwise \
+                SuperLU in symmetric mode instead of "scipy" and "superlu").
+
+        - **bidirectional_formulation** (str): "alternating" - Only used for the mode \
+                "bidirectional". With "alternating", each iteration solves the hydraulic and \
+                the thermal system one after the other, so that the coupling between both is \
+                only resolved by the iteration. With "coupled", the hydraulic and thermal \
+                unknowns are solved together in one linear system including the derivatives of \
+                the hydraulic equations with respect to the temperatures and of the thermal \
+                equations with respect to the mass flows (c.f. \
+                :func:`pandapipes.pf.coupled_formulation.build_coupled_system`), which reduces \
+                the number of iterations of strongly coupled nets (e.g. heat consumers with \
+                controlled return temperature). The nonlinear methods "linesearch" and "chord" \
+                are treated like "constant" in this case.
+
+        - **instrumentation** (bool): False - If True, the wall time of each phase of the \
+                pipeflow (e.g. lookups, pit initialization, connectivity check, derivatives, \
+                adaptions of the single components, matrix assembly, linear solve and result \
+                extraction) as well as the residual norm and step norms of each iteration are \
+                recorded in net._internal_results["instrumentation"] (see \
+                :func:`pandapipes.pf.instrumentation.init_instrumentation`).
+
+        - **solve_islands** (bool): False - If True, the hydraulic calculation is performed \
+                separately for each island (part of the net that is not hydraulically connected \
+                to other parts, e.g. supply areas with their own external grids). Each island \
+                iterates only until it has converged itself. The iterations per island are \
+                stored in net._internal_results["iterations_hydraulics_islands"].
+
+        - **island_threads** (int): 1 - Only used if **solve_islands** is True. If larger than \
+                1, the islands are solved in a thread pool with this number of threads.
+
+        - **results** (list, dict): None - The result tables that shall be produced. None \
+                produces all result tables. A list contains the names of the requested tables \
+                (e.g. ["junction", "pipe"], the prefix "res\\_" is optional), a dictionary maps \
+                the table names to the list of requested columns (or None for all columns, e.g. \
+                {"junction": ["p_bar"], "pipe": None}). The results of the other tables are not \
+                extracted, which saves time for large nets if only a few results are of interest.
+
+        - **results_format** (str): "pandas" - With "pandas", the results are written into the \
+                result tables (net.res_xy) of the net. For result tables that are not requested \
+                by **results**, net.res_xy only contains the index. With "numpy", no pandas \
+                result tables are created or modified and the pipeflow returns a dictionary \
+                {table_name: {column: numpy.ndarray}} with the requested results instead, the \
+                arrays being ordered like the rows of the component tables.
+
     :param net: The pandapipesNet for which the options are initialized
     :type net: pandapipesNet
     :param local_parameters: Dictionary with local parameters that were passed to the pipeflow call.
@@ -310,8 +430,6 @@ def init_options(net, local_parameters):
     params.update(opts)
     net["_options"].update(params)
     net["_options"]["fluid"] = get_fluid(net).name
-    if not net["_options"]["only_update_hydraulic_matrix"]:
-        net["_options"]["reuse_internal_data"] = False
 
     if not numba_installed:
         if net["_options"]["use_numba"]:
@@ -405,6 +523,54 @@ def initialize_pit(net):
                        "Without any nodes, you are not able to conduct a pipeflow!")
         return
 
+
+def warm_start_pit(net, last_pit):
+    """
+    Sets the start values of the Newton-Raphson iterations (pressure, mass flow and temperature
+    columns of the pit) according to the option **init**. With "flat", the start values are
+    derived from the input tables as done in :func:`initialize_pit`. With "results" or "auto",
+    the solution of the last converged pipeflow (stored in its internal tables) is used as start
+    values, if the internal structure of the net did not change.
+
+    Some components fix a variable to its start value (e.g. the mass flow of flow controllers or
+    the pressure of external grids). Therefore, the flat start values are stored with the pit and
+    a start value is only taken from the last solution if its flat start value did not change.
+
+    :param net: The pandapipes net for which the pit was initialized
+    :type net: pandapipesNet
+    :param last_pit: The internal tables of the last converged pipeflow (or None)
+    :type last_pit: dict
+    :return: No output
+    """
+    pit = net["_pit"]
+    pit["flat_init"] = {"node": pit["node"][:, NODE_START_COLS].copy(),
+                        "branch": pit["branch"][:, BRANCH_START_COLS].copy()}
+    init = get_net_option(net, "init")
+    if init == "flat":
+        return
+    if init not in ["results", "auto"]:
+        raise UserWarning("The init option %s is not known. Please choose one of 'flat', "
+                          "'results' or 'auto'." % init)
+    if last_pit is None or "flat_init" not in last_pit \
+            or last_pit["node"].shape != pit["node"].shape \
+            or last_pit["branch"].shape != pit["branch"].shape \
+            or not np.array_equal(last_pit["node"][:, [TABLE_IDX_ND, ELEMENT_IDX_ND]],
+                                  pit["node"][:, [TABLE_IDX_ND, ELEMENT_IDX_ND]]) \
+            or not np.array_equal(last_pit["branch"][:, STRUCTURE_COLS_BR],
+                                  pit["branch"][:, STRUCTURE_COLS_BR]):
+        if init == "results":
+            logger.warning("No results of a converged pipeflow with the same net structure are "
+                           "available. The pipeflow is initialized with flat start values.")
+        return
+    for pit_type, cols in [("node", NODE_START_COLS), ("branch", BRANCH_START_COLS)]:
+        start_values = pit[pit_type][:, cols]
+        last_values = last_pit[pit_type][:, cols]
+        use_last = (pit["flat_init"][pit_type] == last_pit["flat_init"][pit_type]) \
+            & ~np.isnan(last_values)
+        start_values[use_last] = last_values[use_last]
+        pit[pit_type][:, cols] = start_values
+
+
 def create_empty_pit(net):
     """
     Creates an empty internal structure which is called pit (pandapipes internal tables). The\
@@ -433,15 +599,82 @@ def create_empty_pit(net):
 
 def init_all_result_tables(net):
     """
-    Initialize the result tables of all components in the net.
+    Initialize the result tables of all components in the net. Only the tables and columns
+    requested by the option "results" are filled with NaN, the other result tables only contain
+    the index. With the results format "numpy", the result tables of the net are not touched.
 
     :param net: pandapipes net for which to extract results into net.res_xy
     :type net: pandapipesNet
     :return: No output
 
     """
+    from pandapipes.component_models.component_toolbox import init_results_element
+    selection = get_result_selection(net)
+    if get_net_option(net, "results_format") == "numpy":
+        return
     for comp in net['component_list']:
-        comp.init_results(net)
+        table_name = comp.table_name()
+        if table_name not in selection:
+            init_results_element(net, table_name, [], True)
+            continue
+        res_table = comp.init_results(net)
+        if selection[table_name] is not None:
+            net["res_" + table_name] = res_table.loc[:, selection[table_name]]
+
+
+def get_result_selection(net):
+    """
+    Determines the result tables and columns that are requested by the option "results" (c.f.
+    :func:`init_options`).
+
+    :param net: pandapipes net for which to determine the requested results
+    :type net: pandapipesNet
+    :return: selection - dictionary with the requested table names (without "res\\_") as keys and
+             the list of requested columns (or None for all columns) as values
+    :rtype: dict
+    """
+    results, results_format = get_net_options(net, "results", "results_format")
+    if results_format not in ["pandas", "numpy"]:
+        raise UserWarning("The results format %s is not available. Please choose 'pandas' or "
+                          "'numpy'." % results_format)
+    components = {comp.table_name(): comp for comp in net['component_list']}
+    if results is None:
+        return dict.fromkeys(components)
+    if isinstance(results, str):
+        results = [results]
+    if not isinstance(results, dict):
+        results = dict.fromkeys(results)
+    selection = dict()
+    for table, columns in results.items():
+        table_name = table[4:] if table.startswith("res_") else table
+        if table_name not in components:
+            raise UserWarning("The result table %s cannot be created as there is no component "
+                              "%s in the net." % (table, table_name))
+        if columns is not None:
+            columns = [columns] if isinstance(columns, str) else list(columns)
+            available = get_result_columns(components[table_name], net)
+            unknown = [col for col in columns if col not in available]
+            if unknown:
+                raise UserWarning("The result table %s has no columns %s." % (table, unknown))
+        selection[table_name] = columns
+    return selection
+
+
+def get_result_columns(comp, net):
+    """
+    Returns the names of all columns of the result table of the given component.
+
+    :param comp: component class
+    :type comp: type
+    :param net: pandapipes net
+    :type net: pandapipesNet
+    :return: column names
+    :rtype: list
+    """
+    output, all_float = comp.get_result_table(net)
+    if all_float:
+        return list(output)
+    return [col[0] for col in output]
 
 
 def create_lookups(net):
@@ -460,7 +693,10 @@ def create_lookups(net):
       - node_index: Lookup from component index (e.g. junction 2) to pit index (e.g. 0) for nodes.
       - branch_index: Lookup from component index (e.g. pipe 1) to pit index (e.g. 5) for branches.
       - internal_nodes_lookup: Lookup for internal nodes of branch components that makes result\
-                               extraction a lot easier.
+                               extraction a lot easier. Its entry "section_offsets" contains \
+                               the offsets of the sections of each branch within the branch \
+                               pit entries of the respective component (e.g. {"pipe": \
+                               [0, 3, 4]}), which are used to aggregate section results.
 
     :param net: The pandapipes network for which to create the lookups
     :type net: pandapipesNet
@@ -689,6 +925,36 @@ def _connectivity(net, branch_pit, node_pit, active_branch_lookup, active_node_l
     return nodes_connected, branches_connected
 
 
+def identify_islands(net, mode="hydraulics"):
+    """
+    Identifies the islands of the active part of the net, i.e. the connected components of the
+    graph of active nodes and branches (based on the lookups created in
+    :func:`identify_active_nodes_branches`).
+
+    :param net: The pandapipesNet for which to identify the islands
+    :type net: pandapipesNet
+    :param mode: the mode of the calculation (either "hydraulics" or "heat_transfer") for \
+        retrieving the correct lookups
+    :type mode: str, default "hydraulics"
+    :return: islands - list with one tuple (nodes, branches) of masks of the pit nodes and \
+        branches for each island
+    :rtype: list
+    """
+    nodes_connected = get_lookup(net, "node", "active_" + mode)
+    branches_connected = get_lookup(net, "branch", "active_" + mode)
+    branch_pit = net["_pit"]["branch"]
+    from_nodes = branch_pit[:, FROM_NODE].astype(np.int32)
+    to_nodes = branch_pit[:, TO_NODE].astype(np.int32)
+    len_nodes = len(nodes_connected)
+    adj_matrix = coo_matrix((np.ones(np.sum(branches_connected)),
+                             (from_nodes[branches_connected], to_nodes[branches_connected])),
+                            shape=(len_nodes, len_nodes))
+    _, labels = csgraph.connected_components(adj_matrix, directed=False)
+    labels[~nodes_connected] = -1
+    return [(labels == label, branches_connected & (labels[from_nodes] == label))
+            for label in np.unique(labels[nodes_connected])]
+
+
 def get_table_index_list(net, pit_array, pit_indices, pit_type="node"):
     """
     Auxiliary function to get a list of tables and the table indices that belong to a number of pit
@@ -719,74 +985,115 @@ def reduce_pit(net, mode="hydraulics"):
     lookup). A specialty that needs to be considered is that from_nodes and to_nodes change to new
     indices.
 
+    The index maps and lookups of the active pit only depend on the active nodes and branches, so
+    they are created once and reused as long as these do not change (c.f.
+    :func:`get_active_pit_maps`). If all nodes and branches are active, the active pit is the pit
+    itself and no copy is made. Otherwise, the active rows are gathered into buffers that are
+    kept with the index maps.
+
     :param net: The pandapipesNet for which the pit shall be reduced
     :type net: pandapipesNet
-    :param node_pit: The internal structure node array
-    :type node_pit: np.array
-    :param branch_pit: The internal structure branch array
-    :type branch_pit: np.array
     :param mode: the mode of the calculation (either "hydraulics" or "heat_transfer") for storing /\
         retrieving correct lookups
     :type mode: str, default "hydraulics"
     :return: No output
     """
-
     node_pit = net["_pit"]["node"]
     branch_pit = net["_pit"]["branch"]
+    maps = get_active_pit_maps(net, mode)
+    net["_lookups"].update(maps["lookups"])
 
     active_pit = dict()
-    els = dict()
-    reduced_node_lookup = None
+    if maps["node_rows"] is None:
+        active_pit["node"] = node_pit
+    else:
+        active_pit["node"] = np.take(node_pit, maps["node_rows"], axis=0, out=maps["node_buffer"])
+    if maps["branch_rows"] is None:
+        active_pit["branch"] = branch_pit
+    else:
+        active_pit["branch"] = np.take(branch_pit, maps["branch_rows"], axis=0,
+                                       out=maps["branch_buffer"])
+        active_pit["branch"][:, FROM_NODE] = maps["from_nodes"]
+        active_pit["branch"][:, TO_NODE] = maps["to_nodes"]
+    net["_active_pit"] = active_pit
+
+
+def get_active_pit_maps(net, mode="hydraulics"):
+    """
+    Returns the index maps of the active pit for the given mode. They are stored in net["_lookups"]
+    together with the active nodes and branches they were created for and are only recreated if
+    these have changed. Apart from the buffers, the stored maps are never changed afterwards, as
+    nets that are solved in parallel (e.g. the islands of a net) may share them.
+
+    :param net: The pandapipesNet for which the pit shall be reduced
+    :type net: pandapipesNet
+    :param mode: the mode of the calculation (either "hydraulics" or "heat_transfer")
+    :type mode: str, default "hydraulics"
+    :return: maps - dict with the active rows of the node and branch pit ("node_rows", \
+            "branch_rows", None if the whole pit is active), the renumbered from and to nodes of \
+            the active branches, buffers for the active pit and the active lookups
+    :rtype: dict
+    """
     nodes_connected = get_lookup(net, "node", "active_" + mode)
     branches_connected = get_lookup(net, "branch", "active_" + mode)
-    if np.all(nodes_connected):
-        net["_lookups"]["node_from_to_active_" + mode] = copy.deepcopy(
-            get_lookup(net, "node", "from_to"))
-        net["_lookups"]["node_index_active_" + mode] = copy.deepcopy(
-            get_lookup(net, "node", "index"))
-        active_pit["node"] = np.copy(node_pit)
+    maps = net["_lookups"].get("active_pit_maps_" + mode)
+    if maps is not None and np.array_equal(maps["nodes_connected"], nodes_connected) \
+            and np.array_equal(maps["branches_connected"], branches_connected):
+        return maps
+
+    node_pit = net["_pit"]["node"]
+    branch_pit = net["_pit"]["branch"]
+    all_nodes, all_branches = np.all(nodes_connected), np.all(branches_connected)
+    maps = {"nodes_connected": nodes_connected.copy(),
+            "branches_connected": branches_connected.copy(),
+            "node_rows": None, "branch_rows": None, "lookups": dict()}
+    lookups = maps["lookups"]
+    if all_nodes:
+        lookups["node_from_to_active_" + mode] = get_lookup(net, "node", "from_to")
+        lookups["node_index_active_" + mode] = get_lookup(net, "node", "index")
     else:
-        active_pit["node"] = np.copy(node_pit[nodes_connected, :])
+        maps["node_rows"] = np.flatnonzero(nodes_connected)
+        maps["node_buffer"] = np.empty((len(maps["node_rows"]), node_pit.shape[1]))
         reduced_node_lookup = np.cumsum(nodes_connected) - 1
-        node_idx_lookup = get_lookup(net, "node", "index")
-        net["_lookups"]["node_index_active_" + mode] = {
+        lookups["node_index_active_" + mode] = {
             tbl: reduced_node_lookup[idx_lookup[idx_lookup != -1]]
-            for tbl, idx_lookup in node_idx_lookup.items()}
-        els["node"] = nodes_connected
-    if np.all(branches_connected):
-        net["_lookups"]["branch_from_to_active_" + mode] = copy.deepcopy(
-            get_lookup(net, "branch", "from_to"))
-        active_pit["branch"] = np.copy(branch_pit)
-        net["_lookups"]["branch_index_active_" + mode] = copy.deepcopy(
-            get_lookup(net, "branch", "index"))
+            for tbl, idx_lookup in get_lookup(net, "node", "index").items()}
+        lookups["node_from_to_active_" + mode] = _active_from_to_lookup(
+            get_lookup(net, "node", "from_to"), nodes_connected)
+    if all_branches:
+        lookups["branch_from_to_active_" + mode] = get_lookup(net, "branch", "from_to")
+        lookups["branch_index_active_" + mode] = get_lookup(net, "branch", "index")
     else:
-        active_pit["branch"] = np.copy(branch_pit[branches_connected, :])
         branch_idx_lookup = get_lookup(net, "branch", "index")
-        if len(branch_idx_lookup):
-            reduced_branch_lookup = np.cumsum(branches_connected) - 1
-            net["_lookups"]["branch_index_active_" + mode] = {
-                tbl: reduced_branch_lookup[idx_lookup[idx_lookup != -1]]
-                for tbl, idx_lookup in branch_idx_lookup.items()}
-        else:
-            net["_lookups"]["branch_index_active_" + mode] = dict()
-        els["branch"] = branches_connected
-    if reduced_node_lookup is not None:
-        active_pit["branch"][:, FROM_NODE] = reduced_node_lookup[
-            branch_pit[branches_connected, FROM_NODE].astype(np.int32)]
-        active_pit["branch"][:, TO_NODE] = reduced_node_lookup[
-            branch_pit[branches_connected, TO_NODE].astype(np.int32)]
-    net["_active_pit"] = active_pit
-
-    for el, connected_els in els.items():
-        ft_lookup = get_lookup(net, el, "from_to")
-        aux_lookup = {table: (ft[0], ft[1], np.sum(connected_els[ft[0]: ft[1]]))
-                      for table, ft in ft_lookup.items() if ft is not None}
-        from_to_active_lookup = copy.deepcopy(ft_lookup)
-        count = 0
-        for table, (_, _, len_new) in sorted(aux_lookup.items(), key=lambda x: x[1][0]):
-            from_to_active_lookup[table] = (count, count + len_new)
-            count += len_new
-        net["_lookups"]["%s_from_to_active_%s" % (el, mode)] = from_to_active_lookup
+        reduced_branch_lookup = np.cumsum(branches_connected) - 1
+        lookups["branch_index_active_" + mode] = {
+            tbl: reduced_branch_lookup[idx_lookup[idx_lookup != -1]]
+            for tbl, idx_lookup in branch_idx_lookup.items()}
+        lookups["branch_from_to_active_" + mode] = _active_from_to_lookup(
+            get_lookup(net, "branch", "from_to"), branches_connected)
+    if not (all_nodes and all_branches):
+        # the branch pit is copied if its rows are reduced or if the from and to nodes change
+        maps["branch_rows"] = np.flatnonzero(branches_connected)
+        maps["branch_buffer"] = np.empty((len(maps["branch_rows"]), branch_pit.shape[1]))
+        from_nodes = branch_pit[maps["branch_rows"], FROM_NODE]
+        to_nodes = branch_pit[maps["branch_rows"], TO_NODE]
+        if not all_nodes:
+            from_nodes = reduced_node_lookup[from_nodes.astype(np.int32)]
+            to_nodes = reduced_node_lookup[to_nodes.astype(np.int32)]
+        maps["from_nodes"], maps["to_nodes"] = from_nodes, to_nodes
+    net["_lookups"]["active_pit_maps_" + mode] = maps
+    return maps
+
+
+def _active_from_to_lookup(ft_lookup, connected_els):
+    aux_lookup = {table: (ft[0], ft[1], np.sum(connected_els[ft[0]: ft[1]]))
+                  for table, ft in ft_lookup.items() if ft is not None}
+    from_to_active_lookup = copy.deepcopy(ft_lookup)
+    count = 0
+    for table, (_, _, len_new) in sorted(aux_lookup.items(), key=lambda x: x[1][0]):
+        from_to_active_lookup[table] = (count, count + len_new)
+        count += len_new
+    return from_to_active_lookup
 
 
 def check_infeed_number(node_pit):
@@ -0,0 +1,251 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import numpy as np
+from scipy.sparse import coo_matrix, csgraph
+
+from pandapipes.idx_branch import FROM_NODE, TO_NODE, BRANCH_TYPE, JAC_DERIV_DM, JAC_DERIV_DP, \
+    JAC_DERIV_DP1, JAC_DERIV_DM_NODE, PC as PC_BRANCH
+from pandapipes.idx_node import NODE_TYPE, P, L, JAC_DERIV_MSL
+from pandapipes.pf.pipeflow_setup import get_net_option, write_internal_results
+
+try:
+    from numba import jit
+    from numba import int32, int64, float64, boolean
+except ImportError:
+    from pandapower.pf.no_numba import jit
+    from numpy import int32, int64, float64, bool_ as boolean
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_radial_structure(net, branch_pit, node_pit):
+    """
+    Returns the tree structure of the active hydraulic system if the option **radial_solver**
+    allows the radial sweep and the net is radial, i.e. every part of the net is a tree that is
+    fed by exactly one slack node and contains no pressure controllers. Otherwise, None is
+    returned. The structure is cached in net["_internal_data"] together with the from and to
+    nodes and types of the branches and nodes it belongs to.
+
+    :param net: The pandapipesNet for which to identify the radial structure
+    :type net: pandapipesNet
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :return: radial - the tree structure (c.f. :func:`identify_radial_structure`) or None
+    :rtype: dict
+    """
+    radial_option = get_net_option(net, "radial_solver")
+    if radial_option is False:
+        return None
+    structure = np.concatenate([branch_pit[:, [FROM_NODE, TO_NODE, BRANCH_TYPE]].ravel(),
+                                node_pit[:, NODE_TYPE]])
+    internal_data = net["_internal_data"] if "_internal_data" in net else dict()
+    cache = internal_data.get("radial_hydraulics")
+    if cache is None or not np.array_equal(cache["structure"], structure):
+        cache = {"structure": structure,
+                 "radial": identify_radial_structure(branch_pit, node_pit)}
+        internal_data["radial_hydraulics"] = cache
+    if cache["radial"] is None and radial_option is True:
+        raise UserWarning("The radial solver was requested, but the net is not radial (meshed "
+                          "parts, several slack nodes in one part of the net or pressure "
+                          "controllers).")
+    return cache["radial"]
+
+
+def identify_radial_structure(branch_pit, node_pit):
+    """
+    Identifies the tree structure of the hydraulic system. Each non-slack node is assigned the
+    branch that connects it to its parent node, i.e. the neighbour on the path to the slack
+    node of its tree. The non-slack nodes are sorted by their distance to the slack node, so
+    that every node appears after its parent node.
+
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :return: radial - dict with the sorted non-slack nodes ("order"), the start of each level \
+            in the order ("level_ptr"), the parent branch and parent node of each node \
+            ("parent_branch", "parent_node"), whether a node is the to node of its parent \
+            branch ("child_is_to") and the slack nodes ("slack_nodes"), or None if the system \
+            is not radial
+    :rtype: dict
+    """
+    len_n, len_b = len(node_pit), len(branch_pit)
+    node_types = node_pit[:, NODE_TYPE]
+    slack_nodes = np.where(node_types == P)[0]
+    if len_b != len_n - len(slack_nodes) or not len(slack_nodes) \
+            or np.any((node_types != P) & (node_types != L)) \
+            or np.any(branch_pit[:, BRANCH_TYPE] == PC_BRANCH):
+        return None
+
+    # a virtual root node (index len_n) is connected to all slack nodes, so that the net is a
+    # tree if all nodes are reached from the root with len_n edges
+    fn = branch_pit[:, FROM_NODE].astype(np.int32)
+    tn = branch_pit[:, TO_NODE].astype(np.int32)
+    adj_matrix = coo_matrix((np.ones(len_b + len(slack_nodes)),
+                             (np.concatenate([fn, np.full(len(slack_nodes), len_n)]),
+                              np.concatenate([tn, slack_nodes]))),
+                            shape=(len_n + 1, len_n + 1))
+    bfs_order, predecessors = csgraph.breadth_first_order(
+        adj_matrix, len_n, directed=False, return_predecessors=True)
+    if len(bfs_order) != len_n + 1:
+        return None
+
+    child_is_to = predecessors[tn] == fn
+    children = np.where(child_is_to, tn, fn)
+    parent_branch = np.full(len_n, -1, dtype=np.int32)
+    parent_branch[children] = np.arange(len_b, dtype=np.int32)
+    parent_node = predecessors[:len_n].astype(np.int32)
+    parent_node[slack_nodes] = slack_nodes
+    child_is_to_node = np.zeros(len_n, dtype=np.bool_)
+    child_is_to_node[children] = child_is_to
+
+    # distance to the slack node by pointer jumping
+    depth = (parent_node != np.arange(len_n)).astype(np.int64)
+    ancestor = parent_node.copy()
+    while np.any(ancestor[ancestor] != ancestor):
+        depth += depth[ancestor]
+        ancestor = ancestor[ancestor]
+    order = np.argsort(depth, kind="stable")[len(slack_nodes):].astype(np.int32)
+    level_ptr = np.concatenate([[0], np.cumsum(np.bincount(depth[order])[1:])])
+
+    return {"order": order, "level_ptr": level_ptr, "parent_branch": parent_branch,
+            "parent_node": parent_node, "child_is_to": child_is_to_node,
+            "slack_nodes": slack_nodes}
+
+
+def solve_radial_system(net, radial, branch_pit, node_pit, rhs):
+    """
+    Solves the linearized hydraulic system of equations of one Newton iteration on a radial net
+    without factorizing the system matrix. The mass flow corrections follow from a backward
+    sweep that accumulates the node balances from the leaves to the slack nodes, the pressure
+    corrections from a forward sweep along the branch equations starting at the slack nodes.
+    The result is the same as the solution of the sparse system, but the effort is linear in
+    the size of the net.
+
+    The coefficients are stored in the radial structure, so that further right hand sides can be
+    solved with the same system (c.f. :func:`solve_radial_last_system`). If a coefficient that
+    the sweeps divide by is zero (e.g. a branch with fixed mass flow), None is returned and the
+    system has to be solved with the sparse linear solver instead.
+
+    :param net: The pandapipesNet for which to solve the linear system
+    :type net: pandapipesNet
+    :param radial: the tree structure from :func:`get_radial_structure`
+    :type radial: dict
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :param rhs: the load vector of the linearized system
+    :type rhs: numpy.ndarray
+    :return: x - the solution vector or None
+    :rtype: numpy.ndarray
+    """
+    order, parent_branch = radial["order"], radial["parent_branch"]
+    dm_node = branch_pit[parent_branch[order], JAC_DERIV_DM_NODE]
+    node_sign = np.zeros(len(node_pit))
+    node_sign[order] = np.where(radial["child_is_to"][order], dm_node, -dm_node)
+    coefficients = {"dm": branch_pit[:, JAC_DERIV_DM].copy(),
+                    "dp": branch_pit[:, JAC_DERIV_DP].copy(),
+                    "dp1": branch_pit[:, JAC_DERIV_DP1].copy(),
+                    "node_sign": node_sign,
+                    "msl": node_pit[radial["slack_nodes"], JAC_DERIV_MSL].copy()}
+    divisors = np.where(radial["child_is_to"][order], coefficients["dp1"][parent_branch[order]],
+                        coefficients["dp"][parent_branch[order]])
+    if np.any(node_sign[order] == 0) or np.any(divisors == 0) \
+            or np.any(coefficients["msl"] == 0):
+        logger.debug("radial sweep not possible, solving the sparse system instead")
+        radial["coefficients"] = None
+        return None
+    radial["coefficients"] = coefficients
+    write_internal_results(net, linear_solver="radial_sweep")
+    return solve_radial_last_system(net, radial, rhs)
+
+
+def solve_radial_last_system(net, radial, rhs):
+    """
+    Solves the linearized system with the coefficients of the last system that was solved by
+    :func:`solve_radial_system` for another right hand side.
+
+    :param net: The pandapipesNet for which to solve the linear system
+    :type net: pandapipesNet
+    :param radial: the tree structure from :func:`get_radial_structure`
+    :type radial: dict
+    :param rhs: the load vector of the linearized system
+    :type rhs: numpy.ndarray
+    :return: x - the solution vector
+    :rtype: numpy.ndarray
+    """
+    coeff = radial["coefficients"]
+    args = (radial["order"], radial["parent_branch"], radial["parent_node"],
+            radial["child_is_to"], radial["slack_nodes"], coeff["dm"], coeff["dp"],
+            coeff["dp1"], coeff["node_sign"], coeff["msl"], rhs.astype(np.float64))
+    if get_net_option(net, "use_numba"):
+        return radial_sweep_numba(*args)
+    return radial_sweep_np(radial["level_ptr"], *args)
+
+
+def radial_sweep_np(level_ptr, order, parent_branch, parent_node, child_is_to, slack_nodes, dm,
+                    dp, dp1, node_sign, msl, rhs):
+    len_n, len_b = len(parent_branch), len(dm)
+    x = np.zeros(len(rhs))
+    acc = rhs[:len_n].copy()
+    acc[slack_nodes] = rhs[len_n + len_b:]
+
+    # backward sweep: mass flow corrections from the leaves towards the slack nodes
+    for lev in range(len(level_ptr) - 2, -1, -1):
+        nodes = order[level_ptr[lev]:level_ptr[lev + 1]]
+        dm_branch = acc[nodes] / node_sign[nodes]
+        x[len_n + parent_branch[nodes]] = dm_branch
+        np.add.at(acc, parent_node[nodes], node_sign[nodes] * dm_branch)
+    x[len_n + len_b:] = acc[slack_nodes] / msl
+
+    # forward sweep: pressure corrections from the slack nodes towards the leaves
+    x[slack_nodes] = rhs[slack_nodes]
+    for lev in range(len(level_ptr) - 1):
+        nodes = order[level_ptr[lev]:level_ptr[lev + 1]]
+        branches = parent_branch[nodes]
+        to_child = child_is_to[nodes]
+        residual = rhs[len_n + branches] - dm[branches] * x[len_n + branches]
+        x_parent = x[parent_node[nodes]]
+        x[nodes] = np.where(to_child, (residual - dp[branches] * x_parent) / dp1[branches],
+                            (residual - dp1[branches] * x_parent) / dp[branches])
+    return x
+
+
+@jit((int32[:], int32[:], int32[:], boolean[:], int64[:], float64[:], float64[:], float64[:],
+      float64[:], float64[:], float64[:]), nopython=True, cache=True)
+def radial_sweep_numba(order, parent_branch, parent_node, child_is_to, slack_nodes, dm, dp, dp1,
+                       node_sign, msl, rhs):
+    len_n, len_b = len(parent_branch), len(dm)
+    x = np.zeros(len(rhs))
+    acc = rhs[:len_n].copy()
+    for k in range(len(slack_nodes)):
+        acc[slack_nodes[k]] = rhs[len_n + len_b + k]
+
+    for j in range(len(order) - 1, -1, -1):
+        node = order[j]
+        dm_branch = acc[node] / node_sign[node]
+        x[len_n + parent_branch[node]] = dm_branch
+        acc[parent_node[node]] += node_sign[node] * dm_branch
+    for k in range(len(slack_nodes)):
+        x[len_n + len_b + k] = acc[slack_nodes[k]] / msl[k]
+        x[slack_nodes[k]] = rhs[slack_nodes[k]]
+
+    for j in range(len(order)):
+        node = order[j]
+        br = parent_branch[node]
+        residual = rhs[len_n + br] - dm[br] * x[len_n + br]
+        if child_is_to[node]:
+            x[node] = (residual - dp[br] * x[parent_node[node]]) / dp1[br]
+        else:
+            x[node] = (residual - dp1[br] * x[parent_node[node]]) / dp[br]
+    return x
@@ -1,11 +1,13 @@
+from collections import namedtuple
+
 import numpy as np
 
 from pandapipes.constants import NORMAL_PRESSURE, NORMAL_TEMPERATURE
-from pandapipes.idx_branch import ELEMENT_IDX, FROM_NODE, TO_NODE, MDOTINIT, RE, \
+from pandapipes.idx_branch import FROM_NODE, TO_NODE, MDOTINIT, RE, \
     LAMBDA, PL, TOUTINIT, AREA, TEXT
 from pandapipes.idx_node import TABLE_IDX as TABLE_IDX_NODE, PINIT, PAMB, TINIT as TINIT_NODE
-from pandapipes.pf.internals_toolbox import _sum_by_group
-from pandapipes.pf.pipeflow_setup import get_table_number, get_lookup, get_net_option
+from pandapipes.pf.pipeflow_setup import get_table_number, get_lookup, get_net_option, \
+    get_active_pit_maps, get_result_selection, get_result_columns
 from pandapipes.properties.fluids import get_fluid
 from pandapipes.properties.properties_toolbox import get_branch_real_density
 
@@ -15,22 +17,68 @@ except ImportError:
     from pandapower.pf.no_numba import jit
 
 
+_ResultColumn = namedtuple("_ResultColumn", ["values"])
+
+
+class NumpyResultTable:
+    """
+    Lightweight replacement of a result DataFrame that is used during the result extraction if
+    only selected columns or results in numpy format are requested. Like a DataFrame, it returns an
+    object with the attribute values for every column, so that the components can write their
+    results with res_table[column].values[...] = ... Writes to columns that are not selected go to
+    a scratch array and are discarded.
+    """
+
+    def __init__(self, data, length):
+        self.data = data
+        self.length = length
+        self._discarded = dict()
+
+    @classmethod
+    def from_columns(cls, columns, length):
+        return cls({col: np.full(length, np.nan) for col in columns}, length)
+
+    @classmethod
+    def from_frame(cls, frame):
+        return cls({col: frame[col].values for col in frame.columns}, len(frame))
+
+    def __contains__(self, column):
+        return column in self.data
+
+    def __getitem__(self, column):
+        if column in self.data:
+            return _ResultColumn(self.data[column])
+        if column not in self._discarded:
+            self._discarded[column] = np.full(self.length, np.nan)
+        return _ResultColumn(self._discarded[column])
+
+    def __len__(self):
+        return self.length
+
+
 def extract_all_results(net, calculation_mode):
     """
     Extract results from branch pit and node pit and write them to the different tables of the net,\
-    as defined by the component models.
+    as defined by the component models. Only the tables and columns requested by the option\
+    "results" are extracted.
 
     :param net: pandapipes net for which to extract results into net.res_xy
     :type net: pandapipesNet
     :param net: mode of the simulation (e.g. "hydraulics" or "heat" or "sequential" or "bidirectional")
     :type net: str
-    :return: No output
+    :return: results - with the results format "numpy", a dictionary {table_name: {column: array}}\
+             with the requested results, otherwise None
+    :rtype: dict
 
     """
+    selection = get_result_selection(net)
+    numpy_format = get_net_option(net, "results_format") == "numpy"
+    components = [comp for comp in net['component_list'] if comp.table_name() in selection]
+    branch_tables = get_lookup(net, "branch", "from_to")
     branch_pit = net["_pit"]["branch"]
     node_pit = net["_pit"]["node"]
     branch_results = get_basic_branch_results(net, branch_pit, node_pit)
-    if get_fluid(net).is_gas:
+    if get_fluid(net).is_gas and any(comp.table_name() in branch_tables for comp in components):
         if get_net_option(net, "use_numba"):
             v_gas_from, v_gas_to, v_gas_mean, p_abs_from, p_abs_to, p_abs_mean, normfactor_from, \
                 normfactor_to, normfactor_mean = get_branch_results_gas_numba(
@@ -48,8 +96,31 @@ def extract_all_results(net, calculation_mode):
             "normfactor_to": normfactor_to, "normfactor_mean": normfactor_mean
         }
         branch_results.update(gas_branch_results)
-    for comp in net['component_list']:
-        comp.extract_results(net, net["_options"], branch_results, calculation_mode)
+    results = dict()
+    for comp in components:
+        table_name = comp.table_name()
+        columns = selection[table_name]
+        if not numpy_format and columns is None:
+            comp.extract_results(net, net["_options"], branch_results, calculation_mode)
+            continue
+        res_name = "res_" + table_name
+        if numpy_format:
+            if columns is None:
+                columns = get_result_columns(comp, net)
+            res_table = NumpyResultTable.from_columns(columns, len(net[table_name]))
+        else:
+            res_table = NumpyResultTable.from_frame(net[res_name])
+        former_table = net[res_name] if res_name in net else None
+        net[res_name] = res_table
+        try:
+            comp.extract_results(net, net["_options"], branch_results, calculation_mode)
+        finally:
+            if former_table is None:
+                del net[res_name]
+            else:
+                net[res_name] = former_table
+        results[table_name] = res_table.data
+    return results if numpy_format else None
 
 
 def get_basic_branch_results(net, branch_pit, node_pit):
@@ -119,7 +190,7 @@ def get_branch_results_gas_numba(net, branch_pit, node_pit, from_nodes, to_nodes
         normfactor_to, normfactor_mean
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def get_pressures_numba(node_pit, from_nodes, to_nodes, v_mps, p_from, p_to):
     p_abs_from, p_abs_to, p_abs_mean = [np.empty_like(v_mps) for _ in range(3)]
 
@@ -135,7 +206,7 @@ def get_pressures_numba(node_pit, from_nodes, to_nodes, v_mps, p_from, p_to):
     return p_abs_from, p_abs_to, p_abs_mean
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def get_gas_vel_numba(node_pit, branch_pit, comp_from, comp_to, comp_mean, p_abs_from, p_abs_to, p_abs_mean, v_mps):
     v_gas_from, v_gas_to, v_gas_mean, normfactor_from, normfactor_to, normfactor_mean = \
         [np.empty_like(v_mps) for _ in range(6)]
@@ -164,16 +235,23 @@ def extract_branch_results_with_internals(net, branch_results, table_name,
                                           simulation_mode):
     # the result table to write results to
     res_table = net["res_" + table_name]
+    if isinstance(res_table, NumpyResultTable):
+        res_nodes_from_hydraulics, res_nodes_from_heat, res_nodes_to_hydraulics, \
+            res_nodes_to_heat, res_mean_hydraulics, res_branch_ht, res_mean_heat = [
+                _selected_results(res_table, res) for res in [
+                    res_nodes_from_hydraulics, res_nodes_from_heat, res_nodes_to_hydraulics,
+                    res_nodes_to_heat, res_mean_hydraulics, res_branch_ht, res_mean_heat]]
 
     # lookup for the component calling this function (where in branch_pit are entries for this
     # table?)
     f, t = get_lookup(net, "branch", "from_to")[table_name]
 
-    branch_pit = net["_pit"]["branch"]
-    # since the function _sum_by_group sorts the entries by an index (in this case the index of the
-    # respective table), the placement of the indices mus be known to allocate the values correctly
-    placement_table = np.argsort(net[table_name].index.values)
-    idx_pit = branch_pit[f:t, ELEMENT_IDX]
+    # the sections of the i-th branch of the table are the entries offsets[i]:offsets[i + 1] of
+    # the branch pit entries of this table (c.f. create_lookups)
+    section_offsets = net["_lookups"]["internal_nodes_lookup"]["section_offsets"][table_name]
+    section_starts = section_offsets[:-1]
+    sections = np.diff(section_offsets)
+    last_sections = f + section_offsets[1:] - 1
 
     node_pit = net["_pit"]["node"]
 
@@ -202,32 +280,22 @@ def extract_branch_results_with_internals(net, branch_results, table_name,
             external_active = comp_connected[end_nodes_external]
             for res_name, entry in res_ext:
                 res_table[res_name].values[external_active] = branch_results[entry][f:t][considered]
+        if len(res_mean) == 0 and len(res_branch) == 0:
+            continue
+        # a branch is connected if at least one of its sections is connected
+        connected_ind = np.add.reduceat(comp_connected.astype(np.int32), section_starts) > 0
         if len(res_mean) > 0:
             # results that relate to the whole branch and shall be averaged (by summing up all
             # values and dividing by number of internal sections)
-            use_numba = get_net_option(net, "use_numba")
-            res = _sum_by_group(use_numba, idx_pit, np.ones_like(idx_pit),
-                                comp_connected.astype(np.int32),
-                                *[branch_results[rn[1]][f:t] for rn in res_mean])
-            connected_ind = res[2] > 0.99
-            num_internals = res[1][connected_ind]
-
-            # hint: idx_pit[placement_table] should result in the indices as ordered in the table
-            pt = placement_table[connected_ind]
-
-            for i, (res_name, entry) in enumerate(res_mean_hydraulics):
-                res_table[res_name].values[pt] = res[i + 3][connected_ind] / num_internals
+            num_internals = sections[connected_ind]
+            for res_name, entry in res_mean:
+                res_table[res_name].values[connected_ind] = np.add.reduceat(
+                    branch_results[entry][f:t], section_starts)[connected_ind] / num_internals
         if len(res_branch) > 0:
-            use_numba = get_net_option(net, "use_numba")
-            _, sections, connected_sum = _sum_by_group(use_numba, idx_pit, np.ones_like(idx_pit),
-                                comp_connected.astype(np.int32))
-            connected_ind = connected_sum > 0.99
-            indices_last_section = (np.cumsum(sections) - 1).astype(int)[connected_ind]
-            # hint: idx_pit[placement_table] should result in the indices as ordered in the table
-            pt = placement_table[connected_ind]
-
-            for i, (res_name, entry) in enumerate(res_branch):
-                res_table[res_name].values[pt] = branch_results[entry][indices_last_section]
+            # results that relate to the outlet of the branch are taken from its last section
+            for res_name, entry in res_branch:
+                res_table[res_name].values[connected_ind] = \
+                    branch_results[entry][last_sections[connected_ind]]
 
 
 def extract_branch_results_without_internals(net, branch_results, required_results_hydraulic,
@@ -256,6 +324,9 @@ def extract_branch_results_without_internals(net, branch_results, required_resul
     :rtype: None
     """
     res_table = net["res_" + table_name]
+    if isinstance(res_table, NumpyResultTable):
+        required_results_hydraulic = _selected_results(res_table, required_results_hydraulic)
+        required_results_heat = _selected_results(res_table, required_results_heat)
     f, t = get_lookup(net, "branch", "from_to")[table_name]
 
     # extract hydraulic results
@@ -279,6 +350,14 @@ def extract_branch_results_without_internals(net, branch_results, required_resul
                 branch_results[entry][f:t][comp_connected_ht]
 
 
+def _selected_results(res_table, required_results):
+    """
+    Reduces the list of (result column, branch result entry) tuples to the columns that are
+    selected in the given result table.
+    """
+    return [res for res in required_results if res[0] in res_table]
+
+
 def extract_results_active_pit(net, mode="hydraulics"):
     """
     Extract the pipeflow results from the internal pit structure ("_active_pit") to the general pit
@@ -291,30 +370,35 @@ def extract_results_active_pit(net, mode="hydraulics"):
     :return: No output
 
     """
-    nodes_connected = get_lookup(net, "node", "active_" + mode)
-    branches_connected = get_lookup(net, "branch", "active_" + mode)
+    maps = get_active_pit_maps(net, mode)
+    nodes_connected, branches_connected = maps["nodes_connected"], maps["branches_connected"]
+    node_pit, branch_pit = net["_pit"]["node"], net["_pit"]["branch"]
     result_node_col = PINIT if mode == "hydraulics" else TINIT_NODE
     not_affected_node_col = TINIT_NODE if mode == "hydraulics" else PINIT
-    copied_node_cols = np.array([i for i in range(net["_pit"]["node"].shape[1])
-                                 if i not in [not_affected_node_col]])
-    rows_nodes = np.arange(net["_pit"]["node"].shape[0])[nodes_connected]
-
     result_branch_col = MDOTINIT if mode == "hydraulics" else TOUTINIT
     not_affected_branch_col = TOUTINIT if mode == "hydraulics" else MDOTINIT
-    copied_branch_cols = np.array([i for i in range(net["_pit"]["branch"].shape[1])
-                                   if i not in [FROM_NODE, TO_NODE,
-                                                not_affected_branch_col]])
-    rows_branches = np.arange(net["_pit"]["branch"].shape[0])[branches_connected]
 
     amb = get_net_option(net, 'ambient_temperature')
 
-    net["_pit"]["node"][~nodes_connected, result_node_col] = np.nan if mode == "hydraulics" else amb
-    net["_pit"]["node"][rows_nodes[:, np.newaxis], copied_node_cols[np.newaxis, :]] = \
-        net["_active_pit"]["node"][:, copied_node_cols]
-    net["_pit"]["branch"][~branches_connected, result_branch_col] = np.nan if mode == "hydraulics" else \
-        net["_pit"]["branch"][~branches_connected, TEXT]
-    net["_pit"]["branch"][rows_branches[:, np.newaxis], copied_branch_cols[np.newaxis, :]] = \
-        net["_active_pit"]["branch"][:, copied_branch_cols]
+    node_pit[~nodes_connected, result_node_col] = np.nan if mode == "hydraulics" else amb
+    if net["_active_pit"]["node"] is not node_pit:
+        _write_back_rows(node_pit, net["_active_pit"]["node"], maps["node_rows"],
+                         [not_affected_node_col])
+    branch_pit[~branches_connected, result_branch_col] = np.nan if mode == "hydraulics" else \
+        branch_pit[~branches_connected, TEXT]
+    if net["_active_pit"]["branch"] is not branch_pit:
+        _write_back_rows(branch_pit, net["_active_pit"]["branch"], maps["branch_rows"],
+                         [FROM_NODE, TO_NODE, not_affected_branch_col])
+
+
+def _write_back_rows(pit, active_pit, rows, kept_cols):
+    """
+    Writes the active pit back into the given rows of the pit in place, except for the columns
+    kept_cols, which keep their values in the pit.
+    """
+    kept_values = pit[np.ix_(rows, kept_cols)]
+    pit[rows] = active_pit
+    pit[np.ix_(rows, kept_cols)] = kept_values
 
 
 def consider_heat(mode, results=None):
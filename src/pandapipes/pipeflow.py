@@ -2,21 +2,32 @@
 # and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
 import numpy as np
 from numpy import linalg
-from scipy.sparse.linalg import spsolve
 
-from pandapipes.idx_branch import MDOTINIT, TOUTINIT, FROM_NODE_T_SWITCHED
-from pandapipes.idx_node import PINIT, TINIT, MDOTSLACKINIT, NODE_TYPE, P
+from pandapipes.idx_branch import MDOTINIT, TOUTINIT, FROM_NODE_T_SWITCHED, FROM_NODE, TO_NODE, \
+    BRANCH_TYPE
+from pandapipes.idx_node import PINIT, TINIT, MDOTSLACKINIT, NODE_TYPE, P, NODE_TYPE_T, INFEED
 from pandapipes.pf.build_system_matrix import build_system_matrix
+from pandapipes.pf.coupled_formulation import build_coupled_system, COUPLED_MODE
 from pandapipes.pf.derivative_calculation import (calculate_derivatives_hydraulic,
                                                   calculate_derivatives_thermal)
+from pandapipes.pf.instrumentation import init_instrumentation, timed_phase, record_iteration
+from pandapipes.pf.linear_solver import solve_linear_system, solve_chord_step, \
+    reset_chord_steps, solve_with_last_factorization
 from pandapipes.pf.pipeflow_setup import (
     get_net_option, get_net_options, set_net_option, init_options, create_internal_results,
-    write_internal_results, get_lookup, create_lookups, initialize_pit, reduce_pit,
-    set_user_pf_options, init_all_result_tables, identify_active_nodes_branches, check_infeed_number,
-    PipeflowNotConverged
+    write_internal_results, get_lookup, create_lookups, initialize_pit, warm_start_pit, reduce_pit,
+    set_user_pf_options, init_all_result_tables, identify_active_nodes_branches,
+    check_infeed_number, identify_islands, get_active_pit_maps, PipeflowNotConverged
 )
+from pandapipes.pf.nodal_formulation import solve_nodal_system, solve_nodal_last_system
+from pandapipes.pf.radial_solver import get_radial_structure, solve_radial_system, \
+    solve_radial_last_system
 from pandapipes.pf.result_extraction import extract_all_results, extract_results_active_pit
 
 try:
@@ -26,6 +37,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# sufficient decrease factor of the restricted natural monotonicity test in the line search
+MONOTONICITY_FACTOR = 0.25
+
 
 def set_logger_level_pipeflow(level):
     """
@@ -52,7 +66,9 @@ def pipeflow(net, sol_vec=None, **kwargs):
     :param sol_vec: Initializes the start values for the heating network calculation
     :type sol_vec: numpy.ndarray, default None
     :param kwargs: A list of options controlling the solver behaviour
-    :return: No output
+    :return: results - with the option results_format="numpy" a dictionary \
+             {table_name: {column: numpy.ndarray}} with the requested results, otherwise None
+    :rtype: dict
 
     :Example:
         >>> pipeflow(net, mode="hydraulics")
@@ -64,15 +80,41 @@ def pipeflow(net, sol_vec=None, **kwargs):
     # ------------------------------------------------------------------------------------------
 
     # Init physical constants and options
+    start_time = perf_counter()
     init_options(net, local_params)
+    init_instrumentation(net, start_time)
+
+    # the internal tables of the last pipeflow can serve as start values if it converged
+    last_pit = net["_pit"] if net.converged and "_pit" in net else None
 
     # init result tables
     net.converged = False
-    init_all_result_tables(net)
+    with timed_phase(net, "result_tables"):
+        init_all_result_tables(net)
+
+    with timed_phase(net, "lookups"):
+        create_lookups(net)
+    with timed_phase(net, "pit_init"):
+        initialize_pit(net)
+        warm_start_pit(net, last_pit)
+
+    return calculate_pipeflow(net, sol_vec)
+
 
-    create_lookups(net)
-    initialize_pit(net)
+def calculate_pipeflow(net, sol_vec=None):
+    """
+    Runs the calculation for a net whose options, lookups and internal tables (pit) are already
+    initialized and writes the results into the result tables of the net. This is the part of
+    :func:`pipeflow` that has to be repeated if only the values in the pit change.
 
+    :param net: The pandapipes net for which to perform the calculation
+    :type net: pandapipesNet
+    :param sol_vec: Initializes the start values for the heating network calculation
+    :type sol_vec: numpy.ndarray, default None
+    :return: results - with the option results_format="numpy" a dictionary \
+             {table_name: {column: numpy.ndarray}} with the requested results, otherwise None
+    :rtype: dict
+    """
     calculation_mode = get_net_option(net, "mode")
     calculate_hydraulics = calculation_mode in ["hydraulics", 'sequential']
     calculate_heat = calculation_mode in ["heat", 'sequential']
@@ -80,7 +122,8 @@ def pipeflow(net, sol_vec=None, **kwargs):
 
     # cannot be moved to calculate_hydraulics as the active node/branch hydraulics lookup is also
     # required to determine the active node/branch heat transfer lookup
-    identify_active_nodes_branches(net)
+    with timed_phase(net, "connectivity"):
+        identify_active_nodes_branches(net)
 
     if calculation_mode == 'heat':
         use_given_hydraulic_results(net, sol_vec)
@@ -95,7 +138,11 @@ def pipeflow(net, sol_vec=None, **kwargs):
         if calculate_heat:
             heat_transfer(net)
 
-    extract_all_results(net, calculation_mode)
+    with timed_phase(net, "result_extraction"):
+        results = extract_all_results(net, calculation_mode)
+    if "_instrumentation" in net:
+        write_internal_results(net, instrumentation=net["_instrumentation"])
+    return results
 
 
 def use_given_hydraulic_results(net, sol_vec):
@@ -118,10 +165,13 @@ def newton_raphson(net, funct, mode, solver_vars, tols, pit_names, iter_name):
     # This branch is used to stop the solver after a specified error tolerance is reached
     errors = {var: [] for var in solver_vars}
     create_internal_results(net)
+    if nonlinear_method == "chord":
+        reset_chord_steps(net)
     residual_norm = None
     # This loop is left as soon as the solver converged
     while not net.converged and niter < max_iter:
         logger.debug("niter %d" % niter)
+        iteration_start = perf_counter()
 
         # solve_hydraulics is where the calculation takes place
         results, residual = funct(net)
@@ -134,6 +184,10 @@ def newton_raphson(net, funct, mode, solver_vars, tols, pit_names, iter_name):
         for var, val_new, val_old in zip(solver_vars, vals_new, vals_old):
             dval = val_new - val_old
             errors[var].append(linalg.norm(dval) / len(dval) if len(dval) else 0)
+        record_iteration(net, mode=mode, iteration=niter, residual_norm=residual_norm,
+                         alpha=get_net_option(net, "alpha"),
+                         step_norms={var: errors[var][-1] for var in solver_vars},
+                         time=perf_counter() - iteration_start)
         finalize_iteration(
             net, niter, residual_norm, nonlinear_method, errors=errors, tols=tols, tol_res=tol_res,
             vals_old=vals_old, solver_vars=solver_vars, pit_names=pit_names
@@ -153,8 +207,13 @@ def bidirectional(net):
         net["_internal_data"] = dict()
     solver_vars = ['mdot', 'p', 'TOUT', 'T']
     tol_m, tol_p, tol_T = get_net_options(net, 'tol_m', 'tol_p', 'tol_T')
+    formulation = get_net_option(net, "bidirectional_formulation")
+    if formulation not in ["alternating", "coupled"]:
+        raise UserWarning("The bidirectional formulation %s is not known. Please choose one of "
+                          "'alternating' and 'coupled'." % formulation)
+    funct = solve_bidirectional_coupled if formulation == "coupled" else solve_bidirectional
     newton_raphson(
-        net, solve_bidirectional, 'bidirectional', solver_vars, [tol_m, tol_p, tol_T, tol_T],
+        net, funct, 'bidirectional', solver_vars, [tol_m, tol_p, tol_T, tol_T],
         ['branch', 'node', 'branch', 'node'], 'max_iter_bidirect'
     )
     if net.converged:
@@ -169,30 +228,134 @@ def hydraulics(net):
     # Start of nonlinear loop
     # ---------------------------------------------------------------------------------------------
     net.converged = False
-    reduce_pit(net, mode="hydraulics")
+    if get_net_option(net, "solve_islands"):
+        islands = identify_islands(net)
+        if len(islands) > 1:
+            hydraulics_islands(net, islands)
+            return
+    with timed_phase(net, "reduce_pit"):
+        reduce_pit(net, mode="hydraulics")
+    hydraulics_active_pit(net)
+
+
+def hydraulics_active_pit(net):
+    """
+    Performs the hydraulic calculation for the active pit of the net, which has to be created
+    beforehand (c.f. :func:`pandapipes.pf.pipeflow_setup.reduce_pit`), and writes the results
+    back into the pit.
+
+    :param net: The pandapipesNet for which to perform the hydraulic calculation
+    :type net: pandapipesNet
+    :return: No output
+    """
+    net.converged = False
     if not get_net_option(net, "reuse_internal_data") or "_internal_data" not in net:
         net["_internal_data"] = dict()
+    newton_raphson_hydraulics(net)
+    if net.converged:
+        set_user_pf_options(net, hyd_flag=True)
+
+    if not get_net_option(net, "reuse_internal_data"):
+        net.pop("_internal_data", None)
+
+    if not net.converged:
+        raise PipeflowNotConverged("The hydraulic calculation did not converge to a solution.")
+    with timed_phase(net, "result_extraction"):
+        extract_results_active_pit(net, mode="hydraulics")
+
+
+def newton_raphson_hydraulics(net):
     solver_vars = ['mdot', 'p', 'mdotslack']
     tol_p, tol_m, tol_msl = get_net_options(net, 'tol_m', 'tol_p', 'tol_m')
     newton_raphson(net, solve_hydraulics, 'hydraulics', solver_vars, [tol_m, tol_p, tol_msl],
                    ['branch', 'node', 'node'], 'max_iter_hyd')
+
+
+def hydraulics_islands(net, islands):
+    """
+    Performs the hydraulic calculation separately for each island of the net. Every island is
+    solved on a shallow copy of the net with its own options, lookups, active pit and internal
+    data, so that the Newton-Raphson iterations of an island stop as soon as the island itself
+    has converged. Afterwards, the results of all islands are combined in the active pit of the
+    net.
+
+    :param net: The pandapipesNet for which to perform the hydraulic calculation
+    :type net: pandapipesNet
+    :param islands: list with one tuple (nodes, branches) of pit masks per island (see \
+        :func:`pandapipes.pf.pipeflow_setup.identify_islands`)
+    :type islands: list
+    :return: No output
+    """
+    threads = get_net_option(net, "island_threads")
+    island_nets = []
+    for nodes, branches in islands:
+        island_net = copy.copy(net)
+        island_net["_options"] = dict(net["_options"])
+        if threads > 1:
+            # no nested parallelism of the island threads and the numba kernels
+            island_net["_options"]["numba_threads"] = 1
+        island_net["_lookups"] = dict(net["_lookups"])
+        island_net["_lookups"]["node_active_hydraulics"] = nodes
+        island_net["_lookups"]["branch_active_hydraulics"] = branches
+        island_net["_internal_data"] = dict()
+        island_nets.append(island_net)
+
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(_solve_island_hydraulics, island_nets))
+    else:
+        for island_net in island_nets:
+            _solve_island_hydraulics(island_net)
+
+    with timed_phase(net, "reduce_pit"):
+        reduce_pit(net, mode="hydraulics")
+    active_pit = net["_active_pit"]
+    active_node_rows = np.cumsum(get_lookup(net, "node", "active_hydraulics")) - 1
+    active_branch_rows = np.cumsum(get_lookup(net, "branch", "active_hydraulics")) - 1
+    branch_cols = np.array([col for col in range(active_pit["branch"].shape[1])
+                            if col not in [FROM_NODE, TO_NODE]])
+    for island_net, (nodes, branches) in zip(island_nets, islands):
+        active_pit["node"][active_node_rows[nodes]] = island_net["_active_pit"]["node"]
+        active_pit["branch"][np.ix_(active_branch_rows[branches], branch_cols)] = \
+            island_net["_active_pit"]["branch"][:, branch_cols]
+
+    island_results = [island_net["_internal_results"] for island_net in island_nets]
+    converged = [bool(island_net.converged) for island_net in island_nets]
+    create_internal_results(net)
+    write_internal_results(
+        net, iterations_hydraulics=max(res["iterations_hydraulics"] for res in island_results),
+        residual_norm_hydraulics=max(res["residual_norm_hydraulics"] for res in island_results),
+        iterations_hydraulics_islands=[res["iterations_hydraulics"] for res in island_results],
+        converged_hydraulics_islands=converged)
+    net.converged = all(converged)
     if net.converged:
         set_user_pf_options(net, hyd_flag=True)
-
     if not get_net_option(net, "reuse_internal_data"):
         net.pop("_internal_data", None)
-
     if not net.converged:
-        raise PipeflowNotConverged("The hydraulic calculation did not converge to a solution.")
-    extract_results_active_pit(net, mode="hydraulics")
+        failed = [i for i, c in enumerate(converged) if not c]
+        raise PipeflowNotConverged("The hydraulic calculation did not converge to a solution in "
+                                   "the islands %s." % failed)
+    with timed_phase(net, "result_extraction"):
+        extract_results_active_pit(net, mode="hydraulics")
+
+
+def _solve_island_hydraulics(island_net):
+    island_net.converged = False
+    reduce_pit(island_net, mode="hydraulics")
+    newton_raphson_hydraulics(island_net)
 
 
 def heat_transfer(net):
     # Start of nonlinear loop
     # ---------------------------------------------------------------------------------------------
     net.converged = False
-    identify_active_nodes_branches(net, False)
-    reduce_pit(net, mode="heat_transfer")
+    with timed_phase(net, "connectivity"):
+        identify_active_nodes_branches(net, False)
+    with timed_phase(net, "reduce_pit"):
+        reduce_pit(net, mode="heat_transfer")
+    if not get_net_option(net, "reuse_internal_data") or "_internal_data" not in net:
+        net["_internal_data"] = dict()
     if net.fluid.is_gas:
         logger.info("Caution! Temperature calculation does currently not affect hydraulic "
                     "properties!")
@@ -200,25 +363,96 @@ def heat_transfer(net):
     tol_T = next(get_net_options(net, 'tol_T'))
     newton_raphson(net, solve_temperature, 'heat', solver_vars, [tol_T, tol_T], ['branch', 'node'],
                    'max_iter_therm')
+    if not get_net_option(net, "reuse_internal_data"):
+        net.pop("_internal_data", None)
     if not net.converged:
         raise PipeflowNotConverged("The heat transfer calculation did not converge to a "
                                    "solution.")
-    extract_results_active_pit(net, mode="heat_transfer")
+    with timed_phase(net, "result_extraction"):
+        extract_results_active_pit(net, mode="heat_transfer")
 
 
 def solve_bidirectional(net):
-    reduce_pit(net, mode="hydraulics")
+    with timed_phase(net, "reduce_pit"):
+        reduce_pit(net, mode="hydraulics")
     res_hyd, residual_hyd = solve_hydraulics(net)
-    extract_results_active_pit(net, mode="hydraulics")
-    identify_active_nodes_branches(net, False)
-    reduce_pit(net, mode="heat_transfer")
+    with timed_phase(net, "result_extraction"):
+        extract_results_active_pit(net, mode="hydraulics")
+    with timed_phase(net, "connectivity"):
+        identify_active_nodes_branches(net, False)
+    with timed_phase(net, "reduce_pit"):
+        reduce_pit(net, mode="heat_transfer")
     res_heat, residual_heat = solve_temperature(net)
-    extract_results_active_pit(net, mode="heat_transfer")
+    with timed_phase(net, "result_extraction"):
+        extract_results_active_pit(net, mode="heat_transfer")
     residual = np.concatenate([residual_hyd, residual_heat])
     res = res_hyd + res_heat
     return res, residual
 
 
+def solve_bidirectional_coupled(net):
+    """
+    Performs one Newton iteration of the bidirectional calculation with the hydraulic and thermal
+    unknowns solved together in one linear system, including the dependency of the hydraulic
+    equations on the temperatures and of the thermal equations on the mass flows (c.f.
+    :func:`pandapipes.pf.coupled_formulation.build_coupled_system`). If the nodes and branches
+    of the thermal calculation differ from those of the hydraulic calculation (e.g. branches
+    without flow) or the temperature system has no infeed, the iteration alternates between
+    hydraulics and heat transfer as in :func:`solve_bidirectional`.
+
+    :param net: The pandapipesNet for which to perform the iteration
+    :type net: pandapipesNet
+    :return: (res, residual) - the new and old values of the unknowns and the residual
+    :rtype: tuple
+    """
+    with timed_phase(net, "reduce_pit"):
+        reduce_pit(net, mode="hydraulics")
+    with timed_phase(net, "connectivity"):
+        identify_active_nodes_branches(net, False)
+    lookups = net["_lookups"]
+    if not np.array_equal(lookups["node_active_hydraulics"], lookups["node_active_heat_transfer"]) \
+            or not np.array_equal(lookups["branch_active_hydraulics"],
+                                  lookups["branch_active_heat_transfer"]):
+        return solve_bidirectional(net)
+    net["_lookups"].update(get_active_pit_maps(net, "heat_transfer")["lookups"])
+
+    options = net["_options"]
+    branch_pit = net["_active_pit"]["branch"]
+    node_pit = net["_active_pit"]["node"]
+    branch_pit[:, FROM_NODE_T_SWITCHED] = branch_pit[:, MDOTINIT] < 0
+    update_derivatives(net, branch_pit, node_pit, False)
+    update_derivatives(net, branch_pit, node_pit, True)
+    if not check_infeed_number(node_pit):
+        return solve_bidirectional(net)
+
+    len_n, len_b = len(node_pit), len(branch_pit)
+    slack_nodes = np.where(node_pit[:, NODE_TYPE] == P)[0]
+    len_h = len_n + len_b + len(slack_nodes)
+    m_init_old = branch_pit[:, MDOTINIT].copy()
+    p_init_old = node_pit[:, PINIT].copy()
+    msl_init_old = node_pit[slack_nodes, MDOTSLACKINIT].copy()
+    t_init_old = node_pit[:, TINIT].copy()
+    t_out_old = branch_pit[:, TOUTINIT].copy()
+
+    jacobian, epsilon = build_coupled_system(net, branch_pit, node_pit, update_derivatives)
+    with timed_phase(net, "linear_solve"):
+        x = solve_linear_system(net, jacobian, epsilon, COUPLED_MODE)
+
+    node_pit[:, PINIT] -= x[:len_n] * options["alpha"]
+    branch_pit[:, MDOTINIT] -= x[len_n:len_n + len_b] * options["alpha"]
+    node_pit[slack_nodes, MDOTSLACKINIT] -= x[len_n + len_b:len_h]
+    node_pit[:, TINIT] -= x[len_h:len_h + len_n] * options["alpha"]
+    branch_pit[:, TOUTINIT] -= x[len_h + len_n:]
+
+    with timed_phase(net, "result_extraction"):
+        extract_results_active_pit(net, mode="hydraulics")
+        extract_results_active_pit(net, mode="heat_transfer")
+    res = [branch_pit[:, MDOTINIT], m_init_old, node_pit[:, PINIT], p_init_old, msl_init_old,
+           node_pit[slack_nodes, MDOTSLACKINIT], branch_pit[:, TOUTINIT], t_out_old,
+           node_pit[:, TINIT], t_init_old]
+    return res, epsilon
+
+
 def solve_hydraulics(net):
     """
     Create and solve the linearized system of equations (based on a jacobian in form of a scipy
@@ -234,26 +468,21 @@ def solve_hydraulics(net):
     branch_pit = net["_active_pit"]["branch"]
     node_pit = net["_active_pit"]["node"]
 
-    branch_lookups = get_lookup(net, "branch", "from_to_active_hydraulics")
-    for comp in net['component_list']:
-        comp.adaption_before_derivatives_hydraulic(net, branch_pit, node_pit, branch_lookups,
-                                                   options)
-    calculate_derivatives_hydraulic(net, branch_pit, node_pit, options)
-    for comp in net['component_list']:
-        comp.adaption_after_derivatives_hydraulic(net, branch_pit, node_pit, branch_lookups,
-                                                  options)
-    jacobian, epsilon = build_system_matrix(net, branch_pit, node_pit, False)
-
+    update_derivatives(net, branch_pit, node_pit, False)
     m_init_old = branch_pit[:, MDOTINIT].copy()
     p_init_old = node_pit[:, PINIT].copy()
     slack_nodes = np.where(node_pit[:, NODE_TYPE] == P)[0]
     msl_init_old = node_pit[slack_nodes, MDOTSLACKINIT].copy()
 
-    x = spsolve(jacobian, epsilon)
+    x, epsilon = solve_system(net, branch_pit, node_pit, False)
 
-    branch_pit[:, MDOTINIT] -= x[len(node_pit):len(node_pit) + len(branch_pit)] * options["alpha"]
-    node_pit[:, PINIT] -= x[:len(node_pit)] * options["alpha"]
-    node_pit[slack_nodes, MDOTSLACKINIT] -= x[len(node_pit) + len(branch_pit):]
+    if options["nonlinear_method"] == "linesearch":
+        line_search(net, branch_pit, node_pit, x, epsilon, False)
+    else:
+        branch_pit[:, MDOTINIT] -= x[len(node_pit):len(node_pit) + len(branch_pit)] \
+            * options["alpha"]
+        node_pit[:, PINIT] -= x[:len(node_pit)] * options["alpha"]
+        node_pit[slack_nodes, MDOTSLACKINIT] -= x[len(node_pit) + len(branch_pit):]
 
     return [branch_pit[:, MDOTINIT], m_init_old, node_pit[:, PINIT], p_init_old, msl_init_old,
             node_pit[slack_nodes, MDOTSLACKINIT]], epsilon
@@ -275,17 +504,12 @@ def solve_temperature(net):
     options = net["_options"]
     branch_pit = net["_active_pit"]["branch"]
     node_pit = net["_active_pit"]["node"]
-    branch_lookups = get_lookup(net, "branch", "from_to_active_heat_transfer")
 
     # Negative velocity values are turned to positive ones (including exchange of from_node and
     # to_node for temperature calculation
     branch_pit[:, FROM_NODE_T_SWITCHED] = branch_pit[:, MDOTINIT] < 0
 
-    for comp in net['component_list']:
-        comp.adaption_before_derivatives_thermal(net, branch_pit, node_pit, branch_lookups, options)
-    calculate_derivatives_thermal(net, branch_pit, node_pit, options)
-    for comp in net['component_list']:
-        comp.adaption_after_derivatives_thermal(net, branch_pit, node_pit, branch_lookups, options)
+    update_derivatives(net, branch_pit, node_pit, True)
 
     t_init_old = node_pit[:, TINIT].copy()
     t_out_old = branch_pit[:, TOUTINIT].copy()
@@ -294,16 +518,203 @@ def solve_temperature(net):
         return [branch_pit[:, TOUTINIT], t_out_old, node_pit[:, TINIT], t_init_old], np.array([
             np.nan])
 
-    jacobian, epsilon = build_system_matrix(net, branch_pit, node_pit, True)
+    x, epsilon = solve_system(net, branch_pit, node_pit, True)
 
-    x = spsolve(jacobian, epsilon)
-
-    node_pit[:, TINIT] -= x[:len(node_pit)] * options["alpha"]
-    branch_pit[:, TOUTINIT] -= x[len(node_pit):]
+    if options["nonlinear_method"] == "linesearch":
+        line_search(net, branch_pit, node_pit, x, epsilon, True)
+    else:
+        node_pit[:, TINIT] -= x[:len(node_pit)] * options["alpha"]
+        branch_pit[:, TOUTINIT] -= x[len(node_pit):]
 
     return [branch_pit[:, TOUTINIT], t_out_old, node_pit[:, TINIT], t_init_old], epsilon
 
 
+def update_derivatives(net, branch_pit, node_pit, heat_mode):
+    """
+    Calculates the derivatives and load vector entries of all branches for the current state of
+    the internal tables, including the adaptions of the individual components.
+
+    :param net: The pandapipesNet for which to calculate the derivatives
+    :type net: pandapipesNet
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :param heat_mode: Is it a heat network calculation: True or False
+    :type heat_mode: bool
+    :return: No output
+    """
+    options = net["_options"]
+    instrumented = "_instrumentation" in net
+    if not heat_mode:
+        branch_lookups = get_lookup(net, "branch", "from_to_active_hydraulics")
+        _run_adaptions(net, "adaption_before_derivatives_hydraulic", branch_pit, node_pit,
+                       branch_lookups, options, instrumented)
+        with timed_phase(net, "derivatives_hydraulic"):
+            calculate_derivatives_hydraulic(net, branch_pit, node_pit, options)
+        _run_adaptions(net, "adaption_after_derivatives_hydraulic", branch_pit, node_pit,
+                       branch_lookups, options, instrumented)
+    else:
+        branch_lookups = get_lookup(net, "branch", "from_to_active_heat_transfer")
+        _run_adaptions(net, "adaption_before_derivatives_thermal", branch_pit, node_pit,
+                       branch_lookups, options, instrumented)
+        with timed_phase(net, "derivatives_thermal"):
+            calculate_derivatives_thermal(net, branch_pit, node_pit, options)
+        _run_adaptions(net, "adaption_after_derivatives_thermal", branch_pit, node_pit,
+                       branch_lookups, options, instrumented)
+
+
+def _run_adaptions(net, adaption_name, branch_pit, node_pit, branch_lookups, options,
+                   instrumented):
+    """
+    Calls the given adaption method of all components. Only if the pipeflow is instrumented, each
+    call is timed as phase "<component>.<adaption_name>", so that the phase names are not built
+    in every iteration otherwise.
+    """
+    for comp in net['component_list']:
+        adaption = getattr(comp, adaption_name)
+        if instrumented:
+            with timed_phase(net, "%s.%s" % (comp.__name__, adaption_name)):
+                adaption(net, branch_pit, node_pit, branch_lookups, options)
+        else:
+            adaption(net, branch_pit, node_pit, branch_lookups, options)
+
+
+def line_search(net, branch_pit, node_pit, x, epsilon, heat_mode):
+    """
+    Backtracking line search along the Newton direction x. Starting with the full Newton step,
+    the step width t is halved until the (restricted) natural monotonicity test is fulfilled:
+    the simplified Newton correction at the trial point, J_k^-1 * F(x_k - t * dx), which is
+    calculated with the already factorized system matrix J_k, has to be smaller than
+    (1 - t / 4) * ||dx||. In contrast to a test on the residual norm, this test is invariant to
+    the scaling of the equations (pressure and mass flow balances). Only the residual has to be
+    evaluated for the trial steps. If no step width fulfills the condition within
+    **max_iter_linesearch** trials (e.g. because the residual is not differentiable at the
+    current state), the full Newton step is taken. The internal tables are updated in place.
+
+    :param net: The pandapipesNet for which to perform the line search
+    :type net: pandapipesNet
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :param x: the Newton step as solution of the linearized system
+    :type x: numpy.ndarray
+    :param epsilon: the load vector (residual) at the current state
+    :type epsilon: numpy.ndarray
+    :param heat_mode: Is it a heat network calculation: True or False
+    :type heat_mode: bool
+    :return: No output
+    """
+    len_n, len_b = len(node_pit), len(branch_pit)
+    if not heat_mode:
+        slack_nodes = np.where(node_pit[:, NODE_TYPE] == P)[0]
+        variables = [(node_pit, np.arange(len_n), PINIT, x[:len_n]),
+                     (branch_pit, np.arange(len_b), MDOTINIT, x[len_n:len_n + len_b]),
+                     (node_pit, slack_nodes, MDOTSLACKINIT, x[len_n + len_b:])]
+    else:
+        variables = [(node_pit, np.arange(len_n), TINIT, x[:len_n]),
+                     (branch_pit, np.arange(len_b), TOUTINIT, x[len_n:])]
+    start_values = [pit[rows, col] for pit, rows, col, _ in variables]
+
+    mode = "heat_transfer" if heat_mode else "hydraulics"
+    radial = None if heat_mode else get_radial_structure(net, branch_pit, node_pit)
+    step_norm = linalg.norm(x)
+    step_width = 1.
+    for _ in range(get_net_option(net, "max_iter_linesearch")):
+        for (pit, rows, col, dx), start in zip(variables, start_values):
+            pit[rows, col] = start - step_width * dx
+        update_derivatives(net, branch_pit, node_pit, heat_mode)
+        with timed_phase(net, "matrix_assembly"):
+            _, trial_residual = build_system_matrix(net, branch_pit, node_pit, heat_mode,
+                                                    build_matrix=False)
+        with timed_phase(net, "linear_solve"):
+            if radial is not None and radial["coefficients"] is not None:
+                trial_step = solve_radial_last_system(net, radial, trial_residual)
+            elif not heat_mode and get_net_option(net, "hydraulic_formulation") == "nodal" \
+                    and net["_internal_data"].get("nodal_hydraulics") is not None:
+                trial_step = solve_nodal_last_system(net, trial_residual)
+            else:
+                trial_step = solve_with_last_factorization(net, trial_residual, mode)
+        if linalg.norm(trial_step) <= (1 - MONOTONICITY_FACTOR * step_width) * step_norm:
+            break
+        step_width /= 2
+    else:
+        step_width = 1.
+        for (pit, rows, col, dx), start in zip(variables, start_values):
+            pit[rows, col] = start - dx
+    logger.debug("line search step width: %s" % step_width)
+
+
+def solve_system(net, branch_pit, node_pit, heat_mode):
+    """
+    Builds and solves the linearized system of equations of one Newton iteration. For radial
+    nets, the hydraulic system is solved by the sweeps of the radial solver without building the
+    system matrix (c.f. option **radial_solver**). With the option **hydraulic_formulation**
+    "nodal", the branch mass flows are eliminated and only the reduced nodal system is solved.
+    If the nonlinear method "chord" is chosen, the
+    factorization of a former system matrix is reused as long as the residual is reduced
+    sufficiently, so that only the load vector has to be built.
+
+    :param net: The pandapipesNet for which to solve the linearized system
+    :type net: pandapipesNet
+    :param branch_pit: the (active) internal branch table
+    :type branch_pit: numpy.ndarray
+    :param node_pit: the (active) internal node table
+    :type node_pit: numpy.ndarray
+    :param heat_mode: Is it a heat network calculation: True or False
+    :type heat_mode: bool
+    :return: (x, epsilon) - the Newton step and the load vector
+    :rtype: tuple(numpy.ndarray)
+    """
+    mode = "heat_transfer" if heat_mode else "hydraulics"
+    # the load vector is only built once, even if one of the special solution paths below is not
+    # possible (e.g. a rejected chord step) and the full system has to be solved instead
+    epsilon = None
+    if not heat_mode:
+        radial = get_radial_structure(net, branch_pit, node_pit)
+        if radial is not None:
+            with timed_phase(net, "matrix_assembly"):
+                _, epsilon = build_system_matrix(net, branch_pit, node_pit, heat_mode,
+                                                 build_matrix=False)
+            with timed_phase(net, "linear_solve"):
+                x = solve_radial_system(net, radial, branch_pit, node_pit, epsilon)
+            if x is not None:
+                return x, epsilon
+    nonlinear_method = get_net_option(net, "nonlinear_method")
+    if not heat_mode and nonlinear_method != "chord" \
+            and get_net_option(net, "hydraulic_formulation") == "nodal":
+        if epsilon is None:
+            with timed_phase(net, "matrix_assembly"):
+                _, epsilon = build_system_matrix(net, branch_pit, node_pit, heat_mode,
+                                                 build_matrix=False)
+        with timed_phase(net, "linear_solve"):
+            x = solve_nodal_system(net, branch_pit, node_pit, epsilon)
+        if x is not None:
+            return x, epsilon
+    structure = None
+    if nonlinear_method == "chord":
+        branch_cols, node_cols = ([FROM_NODE, TO_NODE, FROM_NODE_T_SWITCHED, BRANCH_TYPE],
+                                  [NODE_TYPE_T, INFEED]) if heat_mode \
+            else ([FROM_NODE, TO_NODE, BRANCH_TYPE], [NODE_TYPE])
+        structure = np.concatenate([branch_pit[:, branch_cols].ravel(),
+                                    node_pit[:, node_cols].ravel()])
+        if epsilon is None:
+            with timed_phase(net, "matrix_assembly"):
+                _, epsilon = build_system_matrix(net, branch_pit, node_pit, heat_mode,
+                                                 build_matrix=False)
+        with timed_phase(net, "linear_solve"):
+            x = solve_chord_step(net, epsilon, mode, structure)
+        if x is not None:
+            return x, epsilon
+    with timed_phase(net, "matrix_assembly"):
+        jacobian, epsilon = build_system_matrix(net, branch_pit, node_pit, heat_mode,
+                                                load_vector=epsilon)
+    with timed_phase(net, "linear_solve"):
+        x = solve_linear_system(net, jacobian, epsilon, mode, structure)
+    return x, epsilon
+
+
 def set_damping_factor(net, niter, errors):
     """
     Set the value of the damping factor (factor for the newton step width) from current results.
@@ -344,7 +755,7 @@ def finalize_iteration(net, niter, residual_norm, nonlinear_method, errors, tols
         if get_net_option(net, "alpha") != 1:
             net.converged = False
             return
-    elif nonlinear_method != "constant":
+    elif nonlinear_method not in ["constant", "chord", "linesearch"]:
         logger.warning("No proper nonlinear method chosen. Using constant settings.")
     for error, var, tol in zip(errors.values(), solver_vars, tols):
         converged = error[niter] <= tol
@@ -0,0 +1,460 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import copy
+
+import numpy as np
+
+from pandapipes.idx_branch import ACTIVE as ACTIVE_BR, FROM_NODE, TO_NODE
+from pandapipes.idx_node import LOAD, PINIT
+from pandapipes.pf.instrumentation import init_instrumentation, timed_phase
+from pandapipes.pf.internals_toolbox import _sum_by_group
+from pandapipes.pf.pipeflow_setup import get_net_option, init_options, create_lookups, \
+    initialize_pit, init_all_result_tables, write_internal_results, get_lookup, \
+    identify_active_nodes_branches, identify_islands, reduce_pit, get_active_pit_maps, \
+    set_user_pf_options, NODE_START_COLS, BRANCH_START_COLS, PipeflowNotConverged
+from pandapipes.pf.result_extraction import extract_all_results, extract_results_active_pit
+from pandapipes.pipeflow import calculate_pipeflow, hydraulics_active_pit, hydraulics_islands, \
+    newton_raphson_hydraulics
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PipeflowSession(object):
+    """
+    A pipeflow session compiles a net once (options, lookups and internal tables) and can then
+    solve it repeatedly. Setpoints are changed with the setters of the session, which update the
+    input tables of the net and patch only the affected entries of the internal tables, so that
+    the setup of :func:`pandapipes.pipeflow` is not repeated for every calculation.
+
+    In the mode "hydraulics", the session also keeps the active pit and the connectivity of the
+    net. They are only identified again after valves have been opened or closed, otherwise the
+    internal tables are solved in place, with the last solution as start values if the option
+    **init** is "results" or "auto".
+
+    Changes of the net that are not made via the setters (e.g. new elements or changed pipe
+    parameters) are not considered. In that case, a new session has to be created.
+
+    :param net: The pandapipes net for which to create the session
+    :type net: pandapipesNet
+    :param kwargs: Options controlling the solver behaviour (see function \
+            :func:`pandapipes.pf.pipeflow_setup.init_options`), used for all calls of \
+            :meth:`solve`
+
+    :Example:
+        >>> session = PipeflowSession(net, init="results")
+        >>> for mdot in profile:
+        >>>     session.set_sink_mdot(mdot)
+        >>>     session.solve()
+    """
+
+    def __init__(self, net, **kwargs):
+        self.net = net
+        init_options(net, {"net": net, "sol_vec": None, "kwargs": kwargs})
+        self._options = dict(net["_options"])
+        net.converged = False
+        init_all_result_tables(net)
+        create_lookups(net)
+        self._lookups = net["_lookups"]
+        initialize_pit(net)
+        self._pit = net["_pit"]
+        self._pit["flat_init"] = {"node": self._pit["node"][:, NODE_START_COLS].copy(),
+                                  "branch": self._pit["branch"][:, BRANCH_START_COLS].copy()}
+        # the active pit and islands of the hydraulic calculation, None if the connectivity has
+        # to be identified in the next call of solve
+        self._active_pit = None
+        self._islands = None
+        self._converged = False
+
+    def _element_positions(self, table_name, index):
+        table = self.net[table_name]
+        if index is None:
+            return np.arange(len(table))
+        positions = table.index.get_indexer(np.atleast_1d(index))
+        if np.any(positions < 0):
+            raise UserWarning("The %s table does not contain all of the given indices."
+                              % table_name)
+        return positions
+
+    def _set_load_mdot(self, table_name, sign, mdot_kg_per_s, index):
+        table = self.net[table_name]
+        positions = self._element_positions(table_name, index)
+        old_mdot = table.mdot_kg_per_s.values[positions]
+        table.loc[table.index[positions], "mdot_kg_per_s"] = mdot_kg_per_s
+        new_mdot = table.mdot_kg_per_s.values[positions]
+        helper = table.in_service.values[positions] * table.scaling.values[positions] * sign
+        delta = (np.nan_to_num(new_mdot) - np.nan_to_num(old_mdot)) * helper
+        juncts, delta_sum = _sum_by_group(get_net_option(self.net, "use_numba"),
+                                          table.junction.values[positions], delta)
+        index_nodes = self._lookups["node_index"]["junction"][juncts]
+        self._pit["node"][index_nodes, LOAD] += delta_sum
+        self._update_active_nodes(index_nodes, LOAD)
+
+    def _update_active_nodes(self, nodes, col):
+        """
+        Copies the given column of the given pit nodes into the active pit, if it is not the pit
+        itself.
+        """
+        if self._active_pit is None or self._active_pit["node"] is self._pit["node"]:
+            return
+        maps = self._lookups["active_pit_maps_hydraulics"]
+        active = nodes[maps["nodes_connected"][nodes]]
+        active_rows = np.searchsorted(maps["node_rows"], active)
+        self._active_pit["node"][active_rows, col] = self._pit["node"][active, col]
+
+    def set_sink_mdot(self, mdot_kg_per_s, index=None):
+        """
+        Sets the mass flow of sinks.
+
+        :param mdot_kg_per_s: The new mass flow(s) of the sinks
+        :type mdot_kg_per_s: float or array_like
+        :param index: The indices of the sinks to change (all sinks if None)
+        :type index: int or array_like, default None
+        :return: No output
+        """
+        self._set_load_mdot("sink", 1, mdot_kg_per_s, index)
+
+    def set_source_mdot(self, mdot_kg_per_s, index=None):
+        """
+        Sets the mass flow of sources.
+
+        :param mdot_kg_per_s: The new mass flow(s) of the sources
+        :type mdot_kg_per_s: float or array_like
+        :param index: The indices of the sources to change (all sources if None)
+        :type index: int or array_like, default None
+        :return: No output
+        """
+        self._set_load_mdot("source", -1, mdot_kg_per_s, index)
+
+    def set_ext_grid_p(self, p_bar, index=None):
+        """
+        Sets the pressure of external grids. If several external grids are connected to the same
+        junction, the mean of their pressures is used, as in :func:`pandapipes.pipeflow`.
+
+        :param p_bar: The new pressure(s) of the external grids
+        :type p_bar: float or array_like
+        :param index: The indices of the external grids to change (all external grids if None)
+        :type index: int or array_like, default None
+        :return: No output
+        """
+        ext_grids = self.net["ext_grid"]
+        positions = self._element_positions("ext_grid", index)
+        fixes_p = ext_grids.in_service.values & np.isin(ext_grids.type.values, ["p", "pt"])
+        if not np.all(fixes_p[positions]):
+            raise UserWarning("Only the pressure of external grids in service with type 'p' or "
+                              "'pt' can be set in a pipeflow session.")
+        ext_grids.loc[ext_grids.index[positions], "p_bar"] = p_bar
+        junctions = ext_grids.junction.values
+        affected = fixes_p & np.isin(junctions, junctions[positions])
+        juncts, p_sum, number = _sum_by_group(
+            get_net_option(self.net, "use_numba"), junctions[affected],
+            ext_grids.p_bar.values[affected].astype(np.float64),
+            np.ones(np.sum(affected), dtype=np.int32))
+        index_nodes = self._lookups["node_index"]["junction"][juncts]
+        self._pit["node"][index_nodes, PINIT] = p_sum / number
+        self._pit["flat_init"]["node"][index_nodes, NODE_START_COLS.index(PINIT)] = p_sum / number
+        self._update_active_nodes(index_nodes, PINIT)
+
+    def set_valve_opened(self, opened, index=None):
+        """
+        Opens or closes valves. The connectivity of the net and the active pit are identified
+        again in the next call of :meth:`solve`.
+
+        :param opened: The new status(es) of the valves
+        :type opened: bool or array_like
+        :param index: The indices of the valves to change (all valves if None)
+        :type index: int or array_like, default None
+        :return: No output
+        """
+        valves = self.net["valve"]
+        positions = self._element_positions("valve", index)
+        valves.loc[valves.index[positions], "opened"] = opened
+        f, _ = self._lookups["branch_from_to"]["valve"]
+        self._pit["branch"][f + positions, ACTIVE_BR] = valves.opened.values[positions]
+        self._active_pit = None
+
+    def _set_start_values(self, pit, maps=None):
+        """
+        Sets the start values of the Newton-Raphson iterations in the given (active) pit in place.
+        With the option **init** "results" or "auto", the last solution of the session is kept,
+        otherwise (and for rows without a solution) the flat start values are used. Setpoints
+        that are start values at the same time (e.g. the pressure of external grids) are written
+        into the pit by the setters.
+        """
+        init = get_net_option(self.net, "init")
+        if init not in ["flat", "results", "auto"]:
+            raise UserWarning("The init option %s is not known. Please choose one of 'flat', "
+                              "'results' or 'auto'." % init)
+        warm = init != "flat" and self._converged
+        if init == "results" and not self._converged:
+            logger.warning("No results of a converged pipeflow with the same net structure are "
+                           "available. The pipeflow is initialized with flat start values.")
+        for pit_type, cols in [("node", NODE_START_COLS), ("branch", BRANCH_START_COLS)]:
+            flat = self._pit["flat_init"][pit_type]
+            if maps is not None and maps[pit_type + "_rows"] is not None:
+                flat = flat[maps[pit_type + "_rows"]]
+            if warm:
+                start = pit[pit_type][:, cols]
+                pit[pit_type][:, cols] = np.where(np.isnan(start), flat, start)
+            else:
+                pit[pit_type][:, cols] = flat
+
+    def _restore(self):
+        """
+        Restores the compiled options, lookups and internal tables of the session in the net.
+        """
+        net = self.net
+        net["_options"] = dict(self._options)
+        net["_lookups"] = self._lookups
+        net["_pit"] = self._pit
+        init_instrumentation(net)
+        net.converged = False
+        with timed_phase(net, "result_tables"):
+            init_all_result_tables(net)
+
+    def _update_active_pit(self):
+        """
+        Identifies the connectivity and islands of the net and creates the active pit of the
+        hydraulic calculation, if the topology changed since the last call.
+        """
+        net = self.net
+        if self._active_pit is None:
+            with timed_phase(net, "connectivity"):
+                identify_active_nodes_branches(net)
+                islands = identify_islands(net) if get_net_option(net, "solve_islands") else []
+            with timed_phase(net, "reduce_pit"):
+                reduce_pit(net, mode="hydraulics")
+            self._active_pit = net["_active_pit"]
+            self._islands = islands if len(islands) > 1 else None
+        net["_active_pit"] = self._active_pit
+
+    def _solve_hydraulics(self):
+        net = self.net
+        self._update_active_pit()
+        with timed_phase(net, "pit_init"):
+            if self._islands is None:
+                self._set_start_values(self._active_pit, get_active_pit_maps(net))
+            else:
+                # the islands are reduced from the pit itself
+                self._set_start_values(self._pit)
+        if self._islands is None:
+            hydraulics_active_pit(net)
+        else:
+            hydraulics_islands(net, self._islands)
+            self._active_pit = net["_active_pit"]
+        with timed_phase(net, "result_extraction"):
+            extract_all_results(net, "hydraulics")
+        if "_instrumentation" in net:
+            write_internal_results(net, instrumentation=net["_instrumentation"])
+
+    def solve(self, sol_vec=None):
+        """
+        Solves the net with the current setpoints and writes the results into the result tables
+        of the net. The compiled options, lookups and internal tables are restored before the
+        calculation, so the net may be calculated with :func:`pandapipes.pipeflow` in between.
+
+        :param sol_vec: Initializes the start values for the heating network calculation
+        :type sol_vec: numpy.ndarray, default None
+        :return: No output
+        """
+        net = self.net
+        self._restore()
+        try:
+            if get_net_option(net, "mode") == "hydraulics":
+                self._solve_hydraulics()
+            else:
+                # the connectivity of the heat transfer calculation depends on the hydraulic
+                # results, so the whole calculation is repeated
+                with timed_phase(net, "pit_init"):
+                    self._set_start_values(self._pit)
+                calculate_pipeflow(net, sol_vec)
+        finally:
+            self._converged = bool(net.converged)
+
+
+def pipeflow_scenarios(net, sink_mdot=None, source_mdot=None, ext_grid_p=None, **kwargs):
+    """
+    Calculates several load scenarios for the same net in one call. Each scenario input is a 2D
+    array with one row per scenario and one column per element of the respective table (in the
+    order of the table). The net is compiled only once in a :class:`PipeflowSession`.
+
+    In the mode "hydraulics", the scenarios are calculated as one batch: the active internal
+    tables of all scenarios are stacked (scenarios x rows) and solved in a single Newton-Raphson
+    loop, i.e. with one derivative calculation and one linear solve of the (block diagonal)
+    system per iteration. The tolerances are divided by the number of scenarios, so that every
+    scenario meets the tolerances on its own. Memory and solving time of the batch grow with the
+    number of scenarios, so very large numbers of scenarios should be split into several calls.
+
+    If the batch does not converge (or in the other modes), the scenarios are calculated one
+    after another, every scenario starting from the solution of the previous one (if the option
+    "init" is not given, it is set to "auto"). In this loop, the symbolic factorization of the
+    system matrix is shared by all scenarios, as the options "reuse_internal_data" and
+    "linear_solver" are set to True and "auto" (i.e. a backend with a separate symbolic analysis)
+    if they are not given. Scenarios that do not converge are skipped; their results are NaN.
+
+    The input tables of the net are reset after the calculation, the result tables contain the
+    results of the last scenario.
+
+    :param net: The pandapipes net for which to calculate the scenarios
+    :type net: pandapipesNet
+    :param sink_mdot: Mass flows of all sinks per scenario
+    :type sink_mdot: numpy.ndarray, default None
+    :param source_mdot: Mass flows of all sources per scenario
+    :type source_mdot: numpy.ndarray, default None
+    :param ext_grid_p: Pressures of all external grids per scenario
+    :type ext_grid_p: numpy.ndarray, default None
+    :param kwargs: Options controlling the solver behaviour (see function \
+            :func:`pandapipes.pf.pipeflow_setup.init_options`)
+    :return: results - dict with one entry per result table (e.g. "res_junction"), each being a \
+            dict of 2D arrays (scenarios x elements) per result column, and the entry \
+            "converged" with one flag per scenario
+    :rtype: dict
+
+    :Example:
+        >>> results = pipeflow_scenarios(net, sink_mdot=np.outer(factors, net.sink.mdot_kg_per_s))
+        >>> results["res_junction"]["p_bar"]
+    """
+    inputs = [(table, column, np.atleast_2d(values))
+              for table, column, values in [("sink", "mdot_kg_per_s", sink_mdot),
+                                            ("source", "mdot_kg_per_s", source_mdot),
+                                            ("ext_grid", "p_bar", ext_grid_p)]
+              if values is not None]
+    if not inputs:
+        raise UserWarning("No scenario inputs are given.")
+    n_scenarios = inputs[0][2].shape[0]
+    for table, column, values in inputs:
+        if values.shape != (n_scenarios, len(net[table])):
+            raise UserWarning("The %s inputs need the shape (%d, %d) (scenarios x elements), but "
+                              "have the shape %s." % (table, n_scenarios, len(net[table]),
+                                                      values.shape))
+    original_inputs = {(table, column): net[table][column].values.copy()
+                       for table, column, _ in inputs}
+
+    # the internal data is only kept in the net after the calculation if requested explicitly
+    keep_internal_data = kwargs.get("reuse_internal_data", False)
+    kwargs.setdefault("init", "auto")
+    kwargs.setdefault("reuse_internal_data", True)
+    kwargs.setdefault("linear_solver", "auto")
+    session = PipeflowSession(net, **kwargs)
+    setters = {"sink": session.set_sink_mdot, "source": session.set_source_mdot,
+               "ext_grid": session.set_ext_grid_p}
+    res_tables = ["res_" + comp.table_name() for comp in net["component_list"]]
+    results = {res_table: {column: np.full((n_scenarios, len(net[res_table])), np.nan)
+                           for column in net[res_table].columns}
+               for res_table in res_tables}
+    results["converged"] = np.zeros(n_scenarios, dtype=bool)
+
+    def set_scenario(scenario):
+        for table, _, values in inputs:
+            setters[table](values[scenario])
+
+    def store_results(scenario):
+        results["converged"][scenario] = True
+        for res_table in res_tables:
+            for column, values in results[res_table].items():
+                values[scenario] = net[res_table][column].values
+
+    try:
+        if get_net_option(net, "mode") == "hydraulics" \
+                and _solve_scenarios_batched(session, n_scenarios, set_scenario, store_results):
+            return results
+        for scenario in range(n_scenarios):
+            set_scenario(scenario)
+            try:
+                session.solve()
+            except PipeflowNotConverged:
+                logger.warning("The pipeflow of scenario %d did not converge." % scenario)
+                continue
+            store_results(scenario)
+    finally:
+        for (table, column), values in original_inputs.items():
+            net[table][column] = values
+        if not keep_internal_data:
+            net.pop("_internal_data", None)
+    return results
+
+
+def _solve_scenarios_batched(session, n_scenarios, set_scenario, store_results):
+    """
+    Solves the hydraulics of all scenarios of :func:`pipeflow_scenarios` in one Newton-Raphson
+    loop on a stacked copy of the active pit. The rows of the scenarios are interleaved (row r of
+    scenario s is the stacked row r * n_scenarios + s), so that the rows of each component stay
+    consecutive and the component lookups only have to be scaled.
+
+    :param session: The session of the net
+    :type session: PipeflowSession
+    :param n_scenarios: The number of scenarios
+    :type n_scenarios: int
+    :param set_scenario: Function that sets the inputs of a scenario with the session setters
+    :type set_scenario: callable
+    :param store_results: Function that stores the results of a scenario from the result tables
+    :type store_results: callable
+    :return: converged - False if the batch did not converge (no results are stored then)
+    :rtype: bool
+    """
+    net = session.net
+    session._restore()
+    session._update_active_pit()
+    active_pit = session._active_pit
+    maps = get_active_pit_maps(net)
+
+    # stacked node pit with the inputs and flat start values of every scenario
+    node_pit = np.empty((len(active_pit["node"]) * n_scenarios, active_pit["node"].shape[1]))
+    for scenario in range(n_scenarios):
+        set_scenario(scenario)
+        session._set_start_values(active_pit, maps)
+        node_pit[scenario::n_scenarios] = active_pit["node"]
+    branch_pit = np.repeat(active_pit["branch"], n_scenarios, axis=0)
+    offsets = np.tile(np.arange(n_scenarios), len(active_pit["branch"]))
+    branch_pit[:, FROM_NODE] = branch_pit[:, FROM_NODE] * n_scenarios + offsets
+    branch_pit[:, TO_NODE] = branch_pit[:, TO_NODE] * n_scenarios + offsets
+
+    lookups = dict(net["_lookups"])
+    components = dict()
+    for pit_type, stacked in [("node", node_pit), ("branch", branch_pit)]:
+        from_to = {table: None if ft is None else (ft[0] * n_scenarios, ft[1] * n_scenarios)
+                   for table, ft in get_lookup(net, pit_type, "from_to_active_hydraulics").items()}
+        lookups["%s_from_to_active_hydraulics" % pit_type] = from_to
+        lookups["%s_from_to" % pit_type] = from_to
+        lookups["%s_active_hydraulics" % pit_type] = np.ones(len(stacked), dtype=bool)
+        connected = get_lookup(net, pit_type, "active_hydraulics")
+        for table, ft in get_lookup(net, pit_type, "from_to").items():
+            if ft is not None and table in net["_pit"]["components"]:
+                components[table] = np.repeat(net["_pit"]["components"][table][
+                    connected[ft[0]:ft[1]]], n_scenarios, axis=0)
+
+    batch_net = copy.copy(net)
+    batch_net["_options"] = dict(net["_options"])
+    for tol in ["tol_m", "tol_p", "tol_res"]:
+        batch_net["_options"][tol] = net["_options"][tol] / n_scenarios
+    batch_net["_lookups"] = lookups
+    batch_net["_pit"] = {"node": node_pit, "branch": branch_pit, "components": components}
+    batch_net["_active_pit"] = {"node": node_pit, "branch": branch_pit}
+    batch_net["_internal_data"] = dict()
+    newton_raphson_hydraulics(batch_net)
+    net["_internal_results"] = batch_net["_internal_results"]
+    if not batch_net.converged:
+        logger.info("The batch of %d scenarios did not converge. The scenarios are calculated "
+                    "one after another." % n_scenarios)
+        return False
+
+    set_user_pf_options(net, hyd_flag=True)
+    branch_cols = [col for col in range(branch_pit.shape[1]) if col not in [FROM_NODE, TO_NODE]]
+    for scenario in range(n_scenarios):
+        # some results are taken from the input tables (e.g. the mass flows of sinks)
+        set_scenario(scenario)
+        active_pit["node"][:] = node_pit[scenario::n_scenarios]
+        active_pit["branch"][:, branch_cols] = branch_pit[scenario::n_scenarios, branch_cols]
+        net.converged = True
+        with timed_phase(net, "result_extraction"):
+            extract_results_active_pit(net, mode="hydraulics")
+            extract_all_results(net, "hydraulics")
+        store_results(scenario)
+    session._converged = True
+    return True
@@ -6,11 +6,19 @@ import os
 
 import numpy as np
 import pandas as pd
-from scipy.interpolate import interp1d
 
 from pandapipes import pp_dir
 from pandapower.io_utils import JSONSerializableClass
 
+try:
+    from numba import jit
+    from numba import float64
+    numba_installed = True
+except ImportError:
+    from pandapower.pf.no_numba import jit
+    from numpy import float64
+    numba_installed = False
+
 try:
     import pandaplan.core.pplog as logging
 except ImportError:
@@ -177,6 +185,73 @@ class Fluid(JSONSerializableClass):
         return self.get_property("der_compressibility")
 
 
+class FluidPropertyCache(object):
+    """
+    Wrapper of a fluid that evaluates each property only once for the same array of values. For
+    every property, the results of the last few evaluations are kept together with the values
+    they were evaluated at and the property object, so that the cache is invalidated
+    automatically if the values (e.g. the node temperatures) change or if the property is
+    replaced. Scalar values and properties without arguments are not cached. The cached results
+    are returned for every call with the same values and must not be modified in place. All other
+    attributes are those of the wrapped fluid.
+
+    The cache is created for one pipeflow calculation (c.f. :func:`get_fluid_property_cache`).
+    """
+    get_density = Fluid.get_density
+    get_viscosity = Fluid.get_viscosity
+    get_heat_capacity = Fluid.get_heat_capacity
+    get_molar_mass = Fluid.get_molar_mass
+    get_compressibility = Fluid.get_compressibility
+    get_der_compressibility = Fluid.get_der_compressibility
+
+    # number of evaluations kept per property
+    size = 8
+
+    def __init__(self, fluid):
+        """
+
+        :param fluid: the fluid whose properties are cached
+        :type fluid: Fluid
+        """
+        self.fluid = fluid
+        self._entries = dict()
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in ["fluid", "_entries"]:
+            # avoid a recursion if the cache is copied or unpickled
+            raise AttributeError(name)
+        return getattr(self.fluid, name)
+
+    def get_property(self, property_name, *at_values):
+        """
+        This function returns the value of the requested property, which is only evaluated if it
+        has not been evaluated for the same values before.
+
+        :param property_name: Name of the searched property
+        :type property_name: str
+        :param at_values: Value for which the property should be returned
+        :type at_values:
+        :return: Returns property at the certain value
+        :rtype: pandapipes.FluidProperty
+        """
+        if len(at_values) != 1 or not isinstance(at_values[0], np.ndarray) \
+                or at_values[0].ndim == 0:
+            return self.fluid.get_property(property_name, *at_values)
+        values = at_values[0]
+        prop = self.fluid.all_properties.get(property_name)
+        entries = self._entries.get(property_name, [])
+        for i, (entry_prop, entry_values, result) in enumerate(entries):
+            if entry_prop is prop and entry_values.shape == values.shape \
+                    and np.array_equal(entry_values, values):
+                if i > 0:
+                    entries.insert(0, entries.pop(i))
+                return result
+        result = self.fluid.get_property(property_name, values)
+        entries.insert(0, (prop, values.copy(), result))
+        self._entries[property_name] = entries[:self.size]
+        return result
+
+
 class FluidProperty(JSONSerializableClass):
     """
     Property Base Class
@@ -213,8 +288,7 @@ class FluidPropertyInterExtra(FluidProperty):
     """
     Creates Property with interpolated or extrapolated values.
     """
-    json_excludes = JSONSerializableClass.json_excludes + ["prop_getter"]
-    prop_getter_entries = {"x": "x", "y": "y", "_fill_value_orig": "fill_value"}
+    json_excludes = JSONSerializableClass.json_excludes + ["x", "y", "extrapolate", "slopes"]
 
     def __init__(self, x_values, y_values, method="interpolate_extrapolate"):
         """
@@ -227,10 +301,18 @@ class FluidPropertyInterExtra(FluidProperty):
         :type method:
         """
         super(FluidPropertyInterExtra, self).__init__()
-        if method.lower() == "interpolate_extrapolate":
-            self.prop_getter = interp1d(x_values, y_values, fill_value="extrapolate")
-        else:
-            self.prop_getter = interp1d(x_values, y_values)
+        x_values = np.array(x_values, dtype=np.float64)
+        y_values = np.array(y_values, dtype=np.float64)
+        if x_values.ndim != 1 or x_values.shape != y_values.shape:
+            raise ValueError("x and y arrays must be one-dimensional and of equal length")
+        if len(x_values) < 2:
+            raise ValueError("x and y arrays must have at least 2 entries")
+        order = np.argsort(x_values, kind="mergesort")
+        self.x = x_values[order]
+        self.y = y_values[order]
+        self.extrapolate = method.lower() == "interpolate_extrapolate"
+        # slopes of the linear segments between the sampling points
+        self.slopes = np.diff(self.y) / np.diff(self.x)
 
     def get_at_value(self, arg):
         """
@@ -241,7 +323,7 @@ class FluidPropertyInterExtra(FluidProperty):
         :return: y-value/s
         :rtype: float, array
         """
-        return self.prop_getter(arg)
+        return interpolate_piecewise_linear(arg, self.x, self.y, self.slopes, self.extrapolate)
 
     def get_at_integral_value(self, upper_limit_arg, lower_limit_arg):
         """
@@ -260,7 +342,7 @@ class FluidPropertyInterExtra(FluidProperty):
                     t_upper_k, t_lower_k)
 
         """
-        mean = (self.prop_getter(upper_limit_arg) + self.prop_getter(upper_limit_arg)) / 2
+        mean = (self.get_at_value(upper_limit_arg) + self.get_at_value(upper_limit_arg)) / 2
         return mean * (upper_limit_arg-lower_limit_arg)
 
     @classmethod
@@ -280,24 +362,70 @@ class FluidPropertyInterExtra(FluidProperty):
         return cls(values[:, 0], values[:, 1], method=method)
 
     def to_dict(self):
+        # the entries are the same as those of the formerly used scipy interp1d object
         d = super(FluidPropertyInterExtra, self).to_dict()
-        d.update({k: self.prop_getter.__dict__[k] for k in self.prop_getter_entries.keys()})
-        # d.update({"x_values": self.prop_getter.x, "y_values": self.prop_getter.y,
-        #           "method": "interpolate_extrapolate"
-        #           if self.prop_getter.fill_value == "extrapolate" else None})
+        d.update({"x": self.x, "y": self.y,
+                  "_fill_value_orig": "extrapolate" if self.extrapolate else np.nan})
         return d
 
     @classmethod
     def from_dict(cls, d):
-        obj = JSONSerializableClass.__new__(cls)
-        d2 = {cls.prop_getter_entries[k]: v for k, v in d.items()
-              if k in cls.prop_getter_entries.keys()}
-        d3 = {k: v for k, v in d.items() if k not in cls.prop_getter_entries.keys()}
-        d3["prop_getter"] = interp1d(**d2)
-        obj.__dict__.update(d3)
+        d = dict(d)
+        method = "interpolate_extrapolate" if str(d.pop("_fill_value_orig", None)) \
+            == "extrapolate" else "interpolate"
+        obj = cls(d.pop("x"), d.pop("y"), method=method)
+        obj.__dict__.update(d)
         return obj
 
 
+def interpolate_piecewise_linear(arg, x_values, y_values, slopes, extrapolate=True):
+    """
+    Evaluates a piecewise linear function given by sorted sampling points. Outside the range of
+    the sampling points, the first or last segment is extrapolated linearly or a ValueError is
+    raised (same behaviour as scipy.interpolate.interp1d with and without
+    fill_value="extrapolate").
+
+    :param arg: one or more values at which to evaluate the function
+    :type arg: float or array
+    :param x_values: the sorted x-values of the sampling points
+    :type x_values: numpy.ndarray
+    :param y_values: the y-values of the sampling points
+    :type y_values: numpy.ndarray
+    :param slopes: the slopes of the segments between the sampling points
+    :type slopes: numpy.ndarray
+    :param extrapolate: if False, a ValueError is raised for values out of the range
+    :type extrapolate: bool, default True
+    :return: y-value/s - array with the shape of arg
+    :rtype: numpy.ndarray
+    """
+    arg = np.asarray(arg, dtype=np.float64)
+    flat_arg = arg.ravel()
+    if not extrapolate:
+        if np.any(flat_arg < x_values[0]):
+            raise ValueError("A value (%s) in x_new is below the interpolation range's minimum "
+                             "value (%s)." % (flat_arg[flat_arg < x_values[0]][0], x_values[0]))
+        if np.any(flat_arg > x_values[-1]):
+            raise ValueError("A value (%s) in x_new is above the interpolation range's maximum "
+                             "value (%s)." % (flat_arg[flat_arg > x_values[-1]][0], x_values[-1]))
+    if numba_installed:
+        values = interpolate_piecewise_linear_numba(flat_arg, x_values, y_values, slopes)
+    else:
+        segments = np.clip(np.searchsorted(x_values, flat_arg), 1, len(x_values) - 1) - 1
+        values = slopes[segments] * (flat_arg - x_values[segments]) + y_values[segments]
+    return values.reshape(arg.shape)
+
+
+@jit((float64[:], float64[:], float64[:], float64[:]), nopython=True, cache=True)
+def interpolate_piecewise_linear_numba(arg, x_values, y_values, slopes):
+    values = np.empty_like(arg)
+    segments = np.searchsorted(x_values, arg)
+    last = len(x_values) - 1
+    for i in range(len(arg)):
+        seg = min(max(segments[i], 1), last) - 1
+        values[i] = slopes[seg] * (arg[i] - x_values[seg]) + y_values[seg]
+    return values
+
+
 class FluidPropertyConstant(FluidProperty):
     """
     Creates Property with a constant value.
@@ -723,6 +851,28 @@ def get_fluid(net):
     return fluid
 
 
+def get_fluid_property_cache(net):
+    """
+    Returns the fluid of the net wrapped in a :class:`FluidPropertyCache`, which is kept in the
+    internal data of the net during a pipeflow calculation, so that the fluid properties are
+    evaluated only once for the same node and branch values. Outside of a pipeflow calculation,
+    the fluid itself is returned.
+
+    :param net: Current network
+    :type net: pandapipesNet
+    :return: fluid - the cached fluid (or the fluid itself)
+    :rtype: FluidPropertyCache or Fluid
+    """
+    fluid = get_fluid(net)
+    if "_internal_data" not in net or net["_internal_data"] is None:
+        return fluid
+    cache = net["_internal_data"].get("fluid_property_cache")
+    if cache is None or cache.fluid is not fluid:
+        cache = FluidPropertyCache(fluid)
+        net["_internal_data"]["fluid_property_cache"] = cache
+    return cache
+
+
 def _add_fluid_to_net(net, fluid, overwrite=True):
     """
     Adds a fluid to a net. If overwrite is False, a warning is printed and the fluid is not set.
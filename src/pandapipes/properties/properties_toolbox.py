@@ -150,20 +150,24 @@ def calculate_mass_fraction_from_molar_fraction(component_molar_proportions, com
 
 
 def get_branch_real_density(fluid, node_pit, branch_pit):
+    # the properties at the from nodes are evaluated for all nodes at once and gathered to the
+    # branches, so that they are only evaluated once if the fluid is a FluidPropertyCache
     from_nodes = get_from_nodes_corrected(branch_pit)
     t_from = node_pit[from_nodes, TINIT]
     t_to = branch_pit[:, TOUTINIT]
     if fluid.is_gas:
-        from_p = node_pit[from_nodes, PINIT] + node_pit[from_nodes, PAMB]
+        p_nodes = node_pit[:, PINIT] + node_pit[:, PAMB]
+        comp_nodes = fluid.get_compressibility(p_nodes)
+        from_p = p_nodes[from_nodes]
         to_nodes = branch_pit[:, TO_NODE].astype(np.int32)
-        to_p = node_pit[to_nodes, PINIT] + node_pit[to_nodes, PAMB]
+        to_p = p_nodes[to_nodes]
         normal_rho = fluid.get_density(NORMAL_TEMPERATURE)
         from_rho = np.divide(normal_rho * NORMAL_TEMPERATURE * from_p,
-                             t_from * NORMAL_PRESSURE * fluid.get_compressibility(from_p))
+                             t_from * NORMAL_PRESSURE * comp_nodes[from_nodes])
         to_rho = np.divide(normal_rho * NORMAL_TEMPERATURE * to_p,
-                           t_to * NORMAL_PRESSURE * fluid.get_compressibility(to_p))
+                           t_to * NORMAL_PRESSURE * comp_nodes[to_nodes])
     else:
-        from_rho = fluid.get_density(t_from)
+        from_rho = fluid.get_density(node_pit[:, TINIT])[from_nodes]
         to_rho = fluid.get_density(t_to)
     rho = (from_rho + to_rho) / 2
     return rho
@@ -188,22 +188,21 @@ class PumpStdType(RegressionStdType):
         :rtype: float
         """
         # no reverse flow - for vdot < 0, assume bypassing
-        n = np.arange(len(self.reg_par), 0, -1)
         if np.iterable(vdot_m3_per_s):
-            results = np.zeros(len(vdot_m3_per_s), dtype=float)
-            if any(vdot_m3_per_s < 0):
+            vdot_m3_per_s = np.asarray(vdot_m3_per_s, dtype=np.float64)
+            if np.any(vdot_m3_per_s < 0):
                 logger.debug("Reverse flow observed in a %s pump. "
                              "Bypassing without pressure change is assumed" % str(self.name))
-            mask = vdot_m3_per_s >= 0
-            # no negative pressure lift - bypassing always allowed:
-            results[mask] = \
-                np.where(mask, np.sum(self.reg_par * (vdot_m3_per_s[mask][:, None] * 3600) ** (n - 1), axis=1), 0)
+            results = calc_pump_pressure(get_pump_curve_coefficients([self]),
+                                         np.zeros(len(vdot_m3_per_s), dtype=np.int32),
+                                         vdot_m3_per_s)
         else:
             if vdot_m3_per_s < 0:
                 logger.debug("Reverse flow observed in a %s pump. "
                              "Bypassing without pressure change is assumed" % str(self.name))
                 results = 0
             else:
+                n = np.arange(len(self.reg_par), 0, -1)
                 results = max(0, sum(self.reg_par * (vdot_m3_per_s * 3600) ** (n - 1)))
         return results
 
@@ -236,6 +235,48 @@ class PumpStdType(RegressionStdType):
         return data
 
 
+def get_pump_curve_coefficients(pump_std_types):
+    """
+    Collects the regression parameters of several pump std types in one coefficient matrix (one
+    row per std type, highest degree first as in numpy.polyval). Polynomials of a lower degree
+    are padded with leading zeros.
+
+    :param pump_std_types: the pump std types
+    :type pump_std_types: list of PumpStdType
+    :return: coefficients - the coefficient matrix with shape (number of std types, max. degree + 1)
+    :rtype: numpy.ndarray
+    """
+    reg_pars = [np.asarray(std_type.reg_par, dtype=np.float64).ravel()
+                for std_type in pump_std_types]
+    coefficients = np.zeros((len(reg_pars), max([len(rp) for rp in reg_pars], default=0)))
+    for i, reg_par in enumerate(reg_pars):
+        coefficients[i, coefficients.shape[1] - len(reg_par):] = reg_par
+    return coefficients
+
+
+def calc_pump_pressure(coefficients, std_type_idx, vdot_m3_per_s):
+    """
+    Evaluates the pump curves of many pumps at once with the Horner scheme. The pressure lift is
+    always >= 0, for reverse flows bypassing without pressure change is assumed (c.f.
+    PumpStdType.get_pressure).
+
+    :param coefficients: coefficient matrix of the pump std types (c.f. \
+            :func:`get_pump_curve_coefficients`)
+    :type coefficients: numpy.ndarray
+    :param std_type_idx: row of the coefficient matrix for every pump
+    :type std_type_idx: numpy.ndarray
+    :param vdot_m3_per_s: volume flow rate of every pump in [m^3/s]
+    :type vdot_m3_per_s: numpy.ndarray
+    :return: pressure lift of every pump in [bar]
+    :rtype: numpy.ndarray
+    """
+    vdot_m3_per_h = vdot_m3_per_s * 3600
+    pressure = np.zeros(len(vdot_m3_per_h), dtype=np.float64)
+    for coefficient in coefficients[std_type_idx].T:
+        pressure = pressure * vdot_m3_per_h + coefficient
+    return np.where(vdot_m3_per_s < 0, 0., np.maximum(pressure, 0.))
+
+
 def regression_function(x_values, y_values, degree):
     """
     Regression function: performs a regression based on the given x-, y-values and the polynominal degree.
@@ -78,6 +78,40 @@ def test_pipe_velocity_results(use_numba):
     assert np.all(np.abs(diff_to) < 1e-9)
 
 
+def _create_net_sections(pipe_index):
+    net = pandapipes.create_empty_network(fluid="water")
+    j = pandapipes.create_junctions(net, 4, 5, 353.15)
+    pandapipes.create_ext_grid(net, j[0], 5, 353.15)
+    pandapipes.create_valve(net, j[0], j[1], 0.1)
+    pandapipes.create_pipe_from_parameters(net, j[1], j[2], 1, 0.1, u_w_per_m2k=5, sections=3,
+                                           index=pipe_index[0])
+    pandapipes.create_pipe_from_parameters(net, j[2], j[3], 2, 0.1, u_w_per_m2k=5, sections=2,
+                                           index=pipe_index[1])
+    pandapipes.create_sink(net, j[3], 2)
+    return net
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_pipe_section_results(use_numba):
+    """
+        The results of pipes with several sections must not depend on the order of the pipe index.
+        """
+    net_ref = _create_net_sections([0, 1])
+    pandapipes.pipeflow(net_ref, mode="sequential", use_numba=use_numba)
+    net = _create_net_sections([5, 2])
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba)
+
+    assert np.allclose(net.res_pipe.values, net_ref.res_pipe.values)
+    assert np.allclose(net.res_pipe.t_outlet_k.values, net.res_pipe.t_to_k.values)
+    assert np.all(np.diff(net.res_pipe.t_outlet_k.values) < 0)
+
+    res_ref = pandapipes.Pipe.get_internal_results(net_ref, [1, 0])
+    res = pandapipes.Pipe.get_internal_results(net, [2, 5])
+    for key in ["PINIT", "TINIT", "VINIT_MEAN"]:
+        assert np.allclose(res[key][:, 1], res_ref[key][:, 1])
+    assert np.array_equal(res["PINIT"][:, 0], [2, 5, 5])
+
+
 @pytest.fixture
 def create_net_3_juncs():
     net = pandapipes.create_empty_network()
@@ -241,5 +241,59 @@ def test_compression_power(use_numba):
     assert np.isclose(pow_pump_MW[0], net.res_pump.compr_power_mw[0])
 
 
+def test_pump_curves_vectorized():
+    """
+    All pump curves are evaluated at once, with the same results as the scalar evaluation of
+    every pump std type (including bypassing on reverse flow and no negative pressure lift).
+        :return:
+        :rtype:
+        """
+    from pandapipes.std_types.std_type_class import PumpStdType, get_pump_curve_coefficients, \
+        calc_pump_pressure
+    net = pandapipes.create_empty_network("net", add_stdtypes=True)
+    pandapipes.create_std_type(net, "pump", "linear", PumpStdType("linear", [-0.5, 4.]))
+    std_types = list(net.std_types["pump"].values())
+    coefficients = get_pump_curve_coefficients(std_types)
+    assert coefficients.shape == (len(std_types), max(len(st.reg_par) for st in std_types))
+
+    rng = np.random.default_rng(0)
+    std_type_idx = rng.integers(0, len(std_types), 200)
+    vdot = rng.uniform(-0.01, 0.05, 200)
+    vdot[:len(std_types)] = -1e-3
+    pressure = calc_pump_pressure(coefficients, std_type_idx, vdot)
+    expected = [std_types[i].get_pressure(v) for i, v in zip(std_type_idx, vdot)]
+    assert np.allclose(pressure, expected, rtol=1e-12, atol=1e-12)
+    assert np.all(pressure[vdot < 0] == 0)
+    assert np.all(pressure >= 0)
+    assert np.allclose(std_types[0].get_pressure(vdot), calc_pump_pressure(
+        coefficients, np.zeros(200, dtype=np.int32), vdot), rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_pump_custom_std_type_class(use_numba):
+    """
+    Pump std types that overwrite get_pressure are evaluated one by one.
+        :return:
+        :rtype:
+        """
+    from pandapipes.std_types.std_type_class import PumpStdType
+
+    class ConstantPump(PumpStdType):
+        def get_pressure(self, vdot_m3_per_s):
+            return 0.5
+
+    net = pandapipes.create_empty_network("net", add_stdtypes=True, fluid="water")
+    j = pandapipes.create_junctions(net, 4, pn_bar=5, tfluid_k=283.15)
+    pandapipes.create_pipe(net, j[0], j[1], std_type='125_PE_80_SDR_11', k_mm=1., length_km=0.4)
+    pandapipes.create_pipe(net, j[2], j[3], std_type='125_PE_80_SDR_11', k_mm=1., length_km=0.3)
+    pandapipes.create_ext_grid(net, j[0], 5, 283.15, type="p")
+    pandapipes.create_std_type(net, "pump", "constant", ConstantPump("constant", [0.]))
+    pandapipes.create_pump(net, j[1], j[2], std_type='constant')
+    pandapipes.create_sink(net, j[3], 1.)
+    pandapipes.pipeflow(net, use_numba=use_numba)
+
+    assert np.isclose(net.res_pump.deltap_bar.at[0], 0.5)
+
+
 if __name__ == '__main__':
     n = pytest.main(["test_pump.py"])
@@ -2,6 +2,7 @@
 # and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
+import numpy as np
 import pandapipes as pp
 import pytest
 from pandapipes import networks
@@ -29,5 +30,44 @@ def test_schutterwald():
     assert net3.converged
 
 
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("loop_ratio", [0., 0.2])
+def test_synthetic_gas_water_networks(use_numba, loop_ratio):
+    net = networks.synthetic_gas_network(300, pressure_levels_bar=(4., 1., 0.1),
+                                         loop_ratio=loop_ratio, seed=0)
+    assert len(net.junction) == 300
+    if loop_ratio == 0:
+        assert len(net.pipe) == 297
+    else:
+        assert len(net.pipe) > 297
+    assert len(net.press_control) == 2
+    pp.pipeflow(net, use_numba=use_numba)
+    assert net.converged
+    assert np.allclose(net.res_junction.p_bar.values[net.press_control.controlled_junction],
+                       [1., 0.1])
+
+    net = networks.synthetic_water_network(300, loop_ratio=loop_ratio, seed=0)
+    if loop_ratio == 0:
+        assert len(net.pipe) == 299
+    else:
+        assert len(net.pipe) > 299
+    pp.pipeflow(net, use_numba=use_numba)
+    assert net.converged
+    assert np.all(net.res_junction.p_bar > 0)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_synthetic_heat_network(use_numba):
+    net = networks.synthetic_heat_network(200, loop_ratio=0.1, seed=0)
+    assert len(net.heat_consumer) == 200
+    assert len(net.circ_pump_pressure) == 1
+    pp.pipeflow(net, mode="sequential", use_numba=use_numba)
+    assert net.converged
+    assert np.all(net.res_heat_consumer.mdot_from_kg_per_s > 0)
+
+    net2 = networks.synthetic_heat_network(200, loop_ratio=0.1, seed=0)
+    assert net2.pipe.equals(net.pipe)
+
+
 if __name__ == '__main__':
     n = pytest.main(["test_networks.py"])
\ No newline at end of file
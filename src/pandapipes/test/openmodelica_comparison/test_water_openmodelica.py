@@ -118,7 +118,10 @@ def test_case_meshed_2valves_sj(use_numba, log_results=False):
 @pytest.mark.parametrize("use_numba", [True, False])
 def test_case_meshed_pumps_pc(use_numba, log_results=False):
     net = nw.water_meshed_pumps()
-    max_iter_hyd = 8 if use_numba else 8
+    # 9 instead of 8 iterations since the Colebrook friction factor contributes its exact
+    # derivative dlambda/dm to the Jacobian (before, its sign was wrong), which changes the
+    # Newton path of this net slightly
+    max_iter_hyd = 9 if use_numba else 9
     p_diff, v_diff_abs = pipeflow_openmodelica_comparison(net, log_results,
                                                           max_iter_hyd=max_iter_hyd,
                                                           use_numba=use_numba)
@@ -129,7 +132,8 @@ def test_case_meshed_pumps_pc(use_numba, log_results=False):
 @pytest.mark.parametrize("use_numba", [True, False])
 def test_case_meshed_pumps_sj(use_numba, log_results=False):
     net = nw.water_meshed_pumps(method="swamee-jain")
-    max_iter_hyd = 8 if use_numba else 8
+    # one more iteration due to the exact Colebrook derivative (c.f. test_case_meshed_pumps_pc)
+    max_iter_hyd = 9 if use_numba else 9
     p_diff, v_diff_abs = pipeflow_openmodelica_comparison(net, log_results,
                                                           max_iter_hyd=max_iter_hyd,
                                                           use_numba=use_numba)
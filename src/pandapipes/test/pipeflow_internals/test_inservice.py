@@ -8,7 +8,7 @@ import numpy as np
 import pytest
 
 import pandapipes
-from pandapipes.pf.pipeflow_setup import get_lookup
+from pandapipes.pf.pipeflow_setup import get_lookup, reduce_pit
 from pandapipes.pipeflow import PipeflowNotConverged
 from pandapipes.pipeflow import logger as pf_logger
 
@@ -675,5 +675,32 @@ def test_pipeflow_all_oos(create_net_wo_ext_grid, use_numba):
     assert ~net.converged
 
 
+def test_reduce_pit_without_copies(create_test_net):
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "lgas", overwrite=True)
+    pandapipes.pipeflow(net)
+    maps = net["_lookups"]["active_pit_maps_hydraulics"]
+    active_pit = net["_active_pit"]
+    assert active_pit["node"] is not net["_pit"]["node"]
+    assert len(active_pit["node"]) == np.sum(get_lookup(net, "node", "active_hydraulics"))
+    assert np.all(active_pit["branch"][:, [0, 1]] < len(active_pit["node"]))
+
+    # the index maps and buffers are reused as long as the active elements are the same
+    reduce_pit(net, mode="hydraulics")
+    assert net["_lookups"]["active_pit_maps_hydraulics"] is maps
+    assert net["_active_pit"]["node"] is active_pit["node"]
+
+    # without out of service elements, the active pit is the pit itself
+    net = pandapipes.create_empty_network(fluid="lgas")
+    j = pandapipes.create_junctions(net, 3, pn_bar=1., tfluid_k=283.15)
+    pandapipes.create_ext_grid(net, j[0], p_bar=1., t_k=283.15)
+    pandapipes.create_pipes_from_parameters(net, j[:2], j[1:], length_km=0.5, diameter_m=0.1)
+    pandapipes.create_sink(net, j[2], mdot_kg_per_s=0.01)
+    pandapipes.pipeflow(net)
+    assert net["_active_pit"]["node"] is net["_pit"]["node"]
+    assert net["_active_pit"]["branch"] is net["_pit"]["branch"]
+    assert np.all(net.res_junction.p_bar.values > 0)
+
+
 if __name__ == "__main__":
     pytest.main([r'pandapipes/test/pipeflow_internals/test_inservice.py'])
@@ -0,0 +1,87 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapipes
+from pandapipes.pf.pipeflow_setup import PipeflowNotConverged
+
+
+@pytest.fixture
+def create_island_net():
+    net = pandapipes.create_empty_network(fluid="lgas")
+    # supply area 1: meshed, several iterations required
+    j = pandapipes.create_junctions(net, 5, pn_bar=1., tfluid_k=283.15)
+    pandapipes.create_ext_grid(net, j[0], p_bar=1., t_k=283.15)
+    pandapipes.create_pipes_from_parameters(net, j[[0, 1, 2, 3, 0]], j[[1, 2, 3, 4, 4]],
+                                            length_km=[0.5, 0.3, 0.4, 0.2, 0.8], diameter_m=0.1)
+    pandapipes.create_sinks(net, j[[2, 3]], mdot_kg_per_s=[0.02, 0.03])
+    # supply area 2: small radial feeder
+    k = pandapipes.create_junctions(net, 3, pn_bar=0.5, tfluid_k=283.15)
+    pandapipes.create_ext_grid(net, k[0], p_bar=0.5, t_k=283.15)
+    pandapipes.create_pipes_from_parameters(net, k[[0, 1]], k[[1, 2]], length_km=0.1,
+                                            diameter_m=0.2)
+    pandapipes.create_sink(net, k[2], mdot_kg_per_s=0.001)
+    # junction without supply
+    pandapipes.create_junction(net, pn_bar=1., tfluid_k=283.15)
+    return net
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("island_threads", [1, 2])
+def test_solve_islands(create_island_net, use_numba, island_threads):
+    net = copy.deepcopy(create_island_net)
+    pandapipes.pipeflow(net, use_numba=use_numba)
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe.copy()
+    iterations = net._internal_results["iterations_hydraulics"]
+
+    pandapipes.pipeflow(net, use_numba=use_numba, solve_islands=True,
+                        island_threads=island_threads)
+    assert net.converged
+    island_iterations = net._internal_results["iterations_hydraulics_islands"]
+    assert len(island_iterations) == 2
+    assert net._internal_results["converged_hydraulics_islands"] == [True, True]
+    assert net._internal_results["iterations_hydraulics"] == max(island_iterations) <= iterations
+    assert min(island_iterations) < max(island_iterations)
+
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-6, equal_nan=True)
+    assert np.isnan(net.res_junction.p_bar.values[-1])
+    assert np.allclose(net.res_pipe.values, res_pipe.values, rtol=1e-5, atol=1e-8,
+                       equal_nan=True)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_solve_islands_heat(create_island_net, use_numba):
+    net = copy.deepcopy(create_island_net)
+    pandapipes.create_fluid_from_lib(net, "water", overwrite=True)
+    net.ext_grid.type = "pt"
+    net.pipe.u_w_per_m2k = 5.
+    net.sink.mdot_kg_per_s *= 10
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba)
+    res_junction = net.res_junction.copy()
+    pipe_cols = ["p_from_bar", "p_to_bar", "t_from_k", "t_to_k", "mdot_from_kg_per_s"]
+    res_pipe = net.res_pipe[pipe_cols].copy()
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba, solve_islands=True)
+    # the iterations of every island stop as soon as the island itself has converged, so the
+    # results only agree within the solver tolerance
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-6, equal_nan=True)
+    assert np.allclose(net.res_pipe[pipe_cols].values, res_pipe.values, rtol=1e-4,
+                       equal_nan=True)
+
+
+def test_solve_islands_not_converged(create_island_net):
+    net = copy.deepcopy(create_island_net)
+    net.sink.loc[0, "mdot_kg_per_s"] = 100.
+    with pytest.raises(PipeflowNotConverged, match=r"islands \[0\]"):
+        pandapipes.pipeflow(net, solve_islands=True, max_iter_hyd=5)
+    assert net._internal_results["converged_hydraulics_islands"] == [False, True]
+
+
+if __name__ == '__main__':
+    pytest.main([r'pandapipes/test/pipeflow_internals/test_islands.py'])
@@ -0,0 +1,127 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapipes
+import pandapipes.networks.simple_water_networks as nw_water
+from pandapipes.pf.linear_solver import LINEAR_SOLVERS, get_linear_solver
+from pandapipes.test.pipeflow_internals.test_inservice import create_test_net
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("linear_solver", ["auto", "scipy", "superlu", "umfpack", "klu"])
+def test_linear_solver_backends(create_test_net, linear_solver, use_numba):
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "water")
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba)
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe.copy()
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba, linear_solver=linear_solver)
+    expected_backend = get_linear_solver(linear_solver).name
+    assert net._internal_results["linear_solver"] == expected_backend
+    if linear_solver != "auto" and LINEAR_SOLVERS[linear_solver].is_available():
+        assert expected_backend == linear_solver
+
+    assert np.allclose(net.res_junction.values, res_junction.values, equal_nan=True)
+    assert np.allclose(net.res_pipe.values, res_pipe.values, equal_nan=True)
+
+
+@pytest.mark.parametrize("linear_solver", ["superlu", "umfpack", "klu"])
+def test_symbolic_factorization_reuse(create_test_net, linear_solver):
+    if not LINEAR_SOLVERS[linear_solver].is_available():
+        pytest.skip("linear solver %s is not installed" % linear_solver)
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "lgas")
+
+    pandapipes.pipeflow(net)
+    res_junction = net.res_junction.copy()
+
+    pandapipes.pipeflow(net, linear_solver=linear_solver, reuse_internal_data=True)
+    cache = net._internal_data["factorization_hydraulics"]
+    reused = cache["symbolic_reused"]
+    assert reused == net._internal_results["iterations_hydraulics"] - 1
+    assert np.allclose(net.res_junction.values, res_junction.values, equal_nan=True)
+
+    # same sparsity pattern in the next pipeflow call -> symbolic analysis is kept
+    symbolic = cache["symbolic"]
+    pandapipes.pipeflow(net, linear_solver=linear_solver, reuse_internal_data=True)
+    cache = net._internal_data["factorization_hydraulics"]
+    assert cache["symbolic"] is symbolic
+    assert cache["symbolic_reused"] > reused
+    assert np.allclose(net.res_junction.values, res_junction.values, equal_nan=True)
+
+    # changed topology -> new symbolic analysis
+    net.valve.loc[1, "opened"] = True
+    pandapipes.pipeflow(net, linear_solver=linear_solver, reuse_internal_data=True)
+    res_junction = net.res_junction.copy()
+    assert net._internal_data["factorization_hydraulics"]["symbolic"] is not symbolic
+    pandapipes.pipeflow(net)
+    assert np.allclose(net.res_junction.values, res_junction.values, equal_nan=True)
+    assert "_internal_data" not in net
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("linear_solver", ["scipy", "superlu"])
+def test_chord_method(linear_solver, use_numba):
+    net = nw_water.water_meshed_delta()
+    pandapipes.pipeflow(net, max_iter_hyd=30, use_numba=use_numba)
+    res_junction = net.res_junction.copy()
+    newton_iterations = net._internal_results["iterations_hydraulics"]
+    assert net._internal_results["factorizations_hydraulics"] == newton_iterations
+
+    pandapipes.pipeflow(net, max_iter_hyd=30, use_numba=use_numba, nonlinear_method="chord",
+                        linear_solver=linear_solver, reuse_internal_data=True)
+    assert net._internal_results["factorizations_hydraulics"] < newton_iterations
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-6)
+
+    # the factorization of the last pipeflow call is reused in the first iteration
+    net.sink.mdot_kg_per_s *= 1.01
+    pandapipes.pipeflow(net, max_iter_hyd=30, use_numba=use_numba, nonlinear_method="chord",
+                        linear_solver=linear_solver, reuse_internal_data=True)
+    assert net._internal_results["factorizations_hydraulics"] \
+           < net._internal_results["iterations_hydraulics"]
+
+    # with a warm start, few factorizations are required for a small change
+    net.sink.mdot_kg_per_s *= 1.01
+    pandapipes.pipeflow(net, max_iter_hyd=30, use_numba=use_numba, nonlinear_method="chord",
+                        linear_solver=linear_solver, reuse_internal_data=True, init="results")
+    assert net._internal_results["factorizations_hydraulics"] \
+           < net._internal_results["iterations_hydraulics"]
+    res_junction = net.res_junction.copy()
+    pandapipes.pipeflow(net, max_iter_hyd=30, use_numba=use_numba)
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-6)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_chord_method_heat(create_test_net, use_numba):
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "water")
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba)
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe.copy()
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba, nonlinear_method="chord",
+                        max_iter_hyd=30, max_iter_therm=30)
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-6, equal_nan=True)
+    assert np.allclose(net.res_pipe.values, res_pipe.values, rtol=1e-5, atol=1e-8,
+                       equal_nan=True)
+
+
+def test_linear_solver_unknown(create_test_net):
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "lgas")
+
+    with pytest.raises(UserWarning):
+        pandapipes.pipeflow(net, linear_solver="cholesky")
+
+
+if __name__ == '__main__':
+    pytest.main([r'pandapipes/test/pipeflow_internals/test_linear_solver.py'])
@@ -0,0 +1,70 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapipes
+import pandapipes.networks.simple_water_networks as nw_water
+from pandapipes.networks import synthetic_gas_network, synthetic_heat_network
+from pandapipes.pf.linear_solver import SYMMETRIC_SOLVERS
+
+
+def _compare_formulations(net, **kwargs):
+    pandapipes.pipeflow(net, **kwargs)
+    net_nodal = copy.deepcopy(net)
+    pandapipes.pipeflow(net_nodal, hydraulic_formulation="nodal", reuse_internal_data=True,
+                        **kwargs)
+    assert net_nodal._internal_results.get("iterations_hydraulics") \
+           == net._internal_results.get("iterations_hydraulics")
+    assert np.allclose(net_nodal.res_junction.values, net.res_junction.values, rtol=1e-10,
+                       equal_nan=True)
+    assert np.allclose(net_nodal.res_pipe.values, net.res_pipe.values, rtol=1e-8, atol=1e-12,
+                       equal_nan=True)
+    return net_nodal
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("nonlinear_method", ["constant", "linesearch"])
+@pytest.mark.parametrize("linear_solver", ["scipy", "superlu"])
+def test_nodal_formulation_water(use_numba, nonlinear_method, linear_solver):
+    net = nw_water.water_meshed_delta()
+    net_nodal = _compare_formulations(net, max_iter_hyd=30, use_numba=use_numba,
+                                      nonlinear_method=nonlinear_method,
+                                      linear_solver=linear_solver)
+    nodal = net_nodal._internal_data["nodal_hydraulics"]
+    assert nodal["symmetric"]
+    assert nodal["matrix"].shape[0] == len(net.junction) - len(net.ext_grid)
+    # the symmetric nodal system is solved with a symmetric factorization
+    assert net_nodal._internal_results["linear_solver"] in SYMMETRIC_SOLVERS
+    assert net_nodal._internal_data["factorization_hydraulics_nodal"]["symbolic_reused"] > 0
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_nodal_formulation_gas(use_numba):
+    net = synthetic_gas_network(200, pressure_levels_bar=(0.1,), loop_ratio=0.3, seed=3)
+    net_nodal = _compare_formulations(net, use_numba=use_numba, radial_solver=False)
+    assert net_nodal._internal_data["nodal_hydraulics"] is not None
+    assert not net_nodal._internal_data["nodal_hydraulics"]["symmetric"]
+    assert net_nodal._internal_results["linear_solver"] == "scipy"
+
+    # pressure controllers -> the full system is solved
+    net = synthetic_gas_network(100, pressure_levels_bar=(1., 0.1), loop_ratio=0.3, seed=3)
+    net_nodal = _compare_formulations(net, use_numba=use_numba)
+    assert net_nodal._internal_data["nodal_hydraulics"] is None
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_nodal_formulation_heat(use_numba):
+    net = synthetic_heat_network(20, loop_ratio=0.2, seed=4)
+    net_nodal = _compare_formulations(net, mode="sequential", use_numba=use_numba)
+    # the circulation pump fixes the pressure difference instead of depending on the mass flow,
+    # so the full system is solved
+    assert net_nodal._internal_data["nodal_hydraulics"] is None
+
+
+if __name__ == '__main__':
+    pytest.main([r'pandapipes/test/pipeflow_internals/test_nodal_formulation.py'])
@@ -4,9 +4,13 @@
 
 import copy
 
+import numpy as np
 import pytest
 
 import pandapipes
+import pandapipes.networks.simple_gas_networks as nw_gas
+import pandapipes.networks.simple_water_networks as nw_water
+import pandapipes.pf.internals_toolbox
 import pandapipes.pf.pipeflow_setup
 from pandapipes.pf.pipeflow_setup import PipeflowNotConverged
 from pandapipes.test.pipeflow_internals.test_inservice import create_test_net
@@ -109,5 +113,245 @@ def test_iter(create_test_net, use_numba):
         pandapipes.pipeflow(net, mode='sequential', iter=2)
 
 
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_nonlinear_method_linesearch(use_numba):
+    net = nw_gas.gas_meshed_pumps()
+    pandapipes.pipeflow(net, max_iter_hyd=20, use_numba=use_numba)
+    res_junction = net.res_junction.copy()
+    iterations_newton = net._internal_results["iterations_hydraulics"]
+
+    with pytest.raises(PipeflowNotConverged):
+        pandapipes.pipeflow(net, max_iter_hyd=iterations_newton // 2, use_numba=use_numba)
+
+    pandapipes.pipeflow(net, max_iter_hyd=iterations_newton // 2, use_numba=use_numba,
+                        nonlinear_method="linesearch")
+    assert net._internal_results["iterations_hydraulics"] < iterations_newton
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-6)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_nonlinear_method_linesearch_heat(create_test_net, use_numba):
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "water")
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba)
+    res_junction = net.res_junction.copy()
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba,
+                        nonlinear_method="linesearch")
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-6, equal_nan=True)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_init_results(use_numba):
+    net = nw_gas.gas_meshed_pumps()
+    pandapipes.pipeflow(net, max_iter_hyd=20, use_numba=use_numba)
+    iterations_flat = net._internal_results["iterations_hydraulics"]
+
+    net.sink.mdot_kg_per_s *= 1.05
+    pandapipes.pipeflow(net, max_iter_hyd=20, use_numba=use_numba, init="results")
+    assert net._internal_results["iterations_hydraulics"] < iterations_flat
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe.copy()
+
+    pandapipes.pipeflow(net, max_iter_hyd=20, use_numba=use_numba, init="flat")
+    assert net._internal_results["iterations_hydraulics"] == iterations_flat
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-6)
+    assert np.allclose(net.res_pipe.values, res_pipe.values, rtol=1e-5, atol=1e-8)
+
+    # changed set point of the external grid is not overwritten by the last results
+    net.ext_grid.p_bar += 0.5
+    pandapipes.pipeflow(net, max_iter_hyd=20, use_numba=use_numba, init="auto")
+    assert np.allclose(net.res_junction.p_bar.loc[net.ext_grid.junction].values,
+                       net.ext_grid.p_bar.values)
+    res_junction = net.res_junction.copy()
+    pandapipes.pipeflow(net, max_iter_hyd=20, use_numba=use_numba)
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-6)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_init_results_changed_structure(create_test_net, use_numba):
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "water")
+    pandapipes.create_flow_control(net, 1, 4, 0.05, 0.1)
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba)
+    assert np.isclose(net.res_flow_control.mdot_from_kg_per_s.at[0], 0.05)
+
+    # changed set point of the flow control is not overwritten by the last results
+    net.flow_control.controlled_mdot_kg_per_s = 0.08
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba, init="results")
+    assert np.isclose(net.res_flow_control.mdot_from_kg_per_s.at[0], 0.08)
+
+    # new junction changes the structure -> flat start
+    pandapipes.create_junction(net, 1, 293.15)
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba, init="results")
+    res_junction = net.res_junction.copy()
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba)
+    assert np.allclose(net.res_junction.values, res_junction.values, equal_nan=True)
+
+    with pytest.raises(UserWarning):
+        pandapipes.pipeflow(net, init="dc")
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_instrumentation(create_test_net, use_numba):
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "water")
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba, instrumentation=True)
+    instrumentation = net._internal_results["instrumentation"]
+    timings = instrumentation["timings"]
+    for phase in ["init_options", "result_tables", "lookups", "pit_init", "connectivity",
+                  "derivatives_hydraulic", "derivatives_thermal", "matrix_assembly",
+                  "linear_solve", "result_extraction",
+                  "Pipe.adaption_before_derivatives_hydraulic"]:
+        assert timings[phase] >= 0
+    iterations = instrumentation["iterations"]
+    n_hyd = len([it for it in iterations if it["mode"] == "hydraulics"])
+    n_heat = len([it for it in iterations if it["mode"] == "heat"])
+    assert n_hyd > 0
+    assert n_heat == net._internal_results["iterations_heat"]
+    assert instrumentation["calls"]["derivatives_hydraulic"] == n_hyd
+    assert set(iterations[0]["step_norms"]) == {"mdot", "p", "mdotslack"}
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba)
+    assert "_instrumentation" not in net
+    assert "instrumentation" not in net._internal_results
+
+
+@pytest.mark.parametrize("friction_model", ["nikuradse", "colebrook"])
+@pytest.mark.parametrize("gas", [True, False])
+def test_numba_threads(monkeypatch, friction_model, gas):
+    net = nw_gas.gas_meshed_delta() if gas else nw_water.water_meshed_delta()
+    kwargs = dict(friction_model=friction_model, max_iter_hyd=30)
+    pandapipes.pipeflow(net, **kwargs)
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe.copy()
+
+    # small nets are calculated with the serial kernels
+    assert not pandapipes.pf.internals_toolbox.use_parallel_numba(
+        {"use_numba": True, "numba_threads": 2}, len(net.pipe))
+    monkeypatch.setattr(pandapipes.pf.internals_toolbox, "PARALLEL_MIN_LENGTH", 0)
+    assert pandapipes.pf.internals_toolbox.use_parallel_numba(
+        {"use_numba": True, "numba_threads": 2}, len(net.pipe))
+    pandapipes.pipeflow(net, numba_threads=2, **kwargs)
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-10)
+    assert np.allclose(net.res_pipe.values, res_pipe.values, rtol=1e-8, atol=1e-12)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_colebrook_warm_start(use_numba):
+    from pandapipes.pf.derivative_toolbox import colebrook_np
+    from pandapipes.pf.derivative_toolbox_numba import colebrook_numba
+    colebrook = colebrook_numba if use_numba else colebrook_np
+    rng = np.random.default_rng(0)
+    re = 10 ** rng.uniform(-3, 7, 1000)
+    re[:5] = 0.
+    d = rng.uniform(0.02, 1., 1000)
+    k = rng.uniform(1e-6, 5e-3, 1000)
+    lambda_nikuradse = (-2 * np.log10(k / (3.71 * d))) ** -2
+    dummy = np.ones(1000)
+
+    converged, lambda_cb = colebrook(re, d, k, lambda_nikuradse, dummy, 10)
+    assert converged
+    assert np.array_equal(lambda_cb[:5], lambda_nikuradse[:5])
+    residual = lambda_cb[5:] ** -0.5 + 2 * np.log10(2.51 / (re[5:] * np.sqrt(lambda_cb[5:]))
+                                                    + k[5:] / (3.71 * d[5:]))
+    assert np.max(np.abs(residual)) < 1e-8
+
+    # any positive start value, e.g. the result of the last Newton step, converges to the same
+    # solution
+    for lambda_init in [lambda_cb, lambda_cb * 1.1, np.full(1000, 1e6)]:
+        converged, lambda_warm = colebrook(re, d, k, lambda_init, dummy, 10)
+        assert converged
+        assert np.allclose(lambda_warm[5:], lambda_cb[5:], rtol=1e-10)
+    assert colebrook(re, d, k, lambda_cb, dummy, 1)[0]
+
+    # branches with dummy 0 keep their start values
+    dummy[10:20] = 0
+    _, lambda_dummy = colebrook(re, d, k, lambda_nikuradse, dummy, 10)
+    assert np.array_equal(lambda_dummy[10:20], lambda_nikuradse[10:20])
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("gas", [True, False])
+def test_friction_model_serghides(use_numba, gas):
+    net = nw_gas.gas_meshed_delta() if gas else nw_water.water_meshed_delta()
+    pandapipes.pipeflow(net, friction_model="colebrook", use_numba=use_numba)
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe.copy()
+
+    pandapipes.pipeflow(net, friction_model="serghides", use_numba=use_numba)
+    assert np.allclose(net.res_junction.p_bar, res_junction.p_bar, rtol=1e-4)
+    assert np.allclose(net.res_pipe["lambda"], res_pipe["lambda"], rtol=1e-4)
+    assert np.allclose(net.res_pipe.mdot_from_kg_per_s, res_pipe.mdot_from_kg_per_s, rtol=1e-4)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_results_selection(create_test_net, use_numba):
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "water")
+    net.pipe.sections = 3
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba)
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe.copy()
+
+    pandapipes.pipeflow(net, mode="sequential", use_numba=use_numba,
+                        results={"res_junction": None, "pipe": ["v_mean_m_per_s", "t_to_k"]})
+    assert np.allclose(net.res_junction.values, res_junction.values, equal_nan=True)
+    assert list(net.res_pipe.columns) == ["v_mean_m_per_s", "t_to_k"]
+    assert np.allclose(net.res_pipe.values, res_pipe[["v_mean_m_per_s", "t_to_k"]].values,
+                       equal_nan=True)
+    # tables that are not requested contain no (outdated) results
+    assert net.res_valve.shape == (len(net.valve), 0)
+
+    with pytest.raises(UserWarning):
+        pandapipes.pipeflow(net, results=["pump"])
+    with pytest.raises(UserWarning):
+        pandapipes.pipeflow(net, results={"pipe": ["p_bar"]})
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_results_format_numpy(use_numba):
+    net = nw_gas.gas_meshed_delta()
+    assert pandapipes.pipeflow(net, use_numba=use_numba) is None
+    res_tables = {key: net[key].copy() for key in net.keys() if key.startswith("res_")}
+
+    results = pandapipes.pipeflow(net, use_numba=use_numba, results_format="numpy")
+    assert set(results) == {key[4:] for key in res_tables}
+    for table, columns in results.items():
+        res_table = res_tables["res_" + table]
+        assert list(columns) == list(res_table.columns)
+        for column, values in columns.items():
+            assert isinstance(values, np.ndarray)
+            assert np.allclose(values, res_table[column].values, equal_nan=True)
+    # the result tables of the net are not touched
+    for key, res_table in res_tables.items():
+        assert net[key].equals(res_table)
+
+    results = pandapipes.pipeflow(net, use_numba=use_numba, results_format="numpy",
+                                  results={"junction": "p_bar"})
+    assert list(results) == ["junction"]
+    assert list(results["junction"]) == ["p_bar"]
+    assert np.allclose(results["junction"]["p_bar"], res_tables["res_junction"].p_bar.values)
+
+    with pytest.raises(UserWarning):
+        pandapipes.pipeflow(net, results_format="xarray")
+
+
+def test_warmup():
+    compile_times = pandapipes.warmup()
+    assert "derivative_toolbox_numba.derivatives_hydraulic_comp_numba" in compile_times
+    assert "radial_solver.radial_sweep_numba" in compile_times
+    assert all(t >= 0 for t in compile_times.values())
+
+    # all kernels (apart from the parallel variants) have been compiled or loaded from the cache
+    from pandapipes.warmup import _numba_kernels
+    for name, kernel in _numba_kernels().items():
+        if not name.endswith("_parallel"):
+            assert len(kernel.signatures) > 0, name
+
+
 if __name__ == '__main__':
     pytest.main(["test_options.py"])
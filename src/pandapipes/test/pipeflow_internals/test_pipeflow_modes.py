@@ -118,3 +118,34 @@ def test_heat_only(use_numba):
     temp_diff = np.abs(1 - temp_net / temp_ntw)
 
     assert np.all(temp_diff < 0.01)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_bidirectional_coupled(use_numba):
+    net = pandapipes.create_empty_network("net", add_stdtypes=False, fluid="water")
+    juncs = pandapipes.create_junctions(net, 6, pn_bar=5, tfluid_k=286,
+                                        system=["flow"] * 3 + ["return"] * 3)
+    pandapipes.create_pipes_from_parameters(
+        net, juncs[[0, 1, 3, 4]], juncs[[1, 2, 4, 5]], k_mm=0.1, length_km=1, diameter_m=0.1022,
+        system=["flow"] * 2 + ["return"] * 2, alpha_w_per_m2k=10, text_k=273.15)
+    pandapipes.create_circ_pump_const_pressure(net, juncs[-1], juncs[0], 5, 2, 300, type='pt')
+    pandapipes.create_heat_consumer(net, juncs[1], juncs[4], controlled_mdot_kg_per_s=1,
+                                    qext_w=150000)
+    # the mass flow of the consumer depends on the temperatures -> strong coupling
+    pandapipes.create_heat_consumer(net, juncs[2], juncs[3], treturn_k=263.4459264973806,
+                                    qext_w=75000)
+
+    pandapipes.pipeflow(net, mode="bidirectional", iter=30, use_numba=use_numba)
+    iterations = net._internal_results["iterations_bidirectional"]
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe.copy()
+
+    pandapipes.pipeflow(net, mode="bidirectional", iter=30, use_numba=use_numba,
+                        bidirectional_formulation="coupled")
+    assert net.converged
+    assert net._internal_results["iterations_bidirectional"] < iterations / 2
+    assert np.allclose(net.res_junction.values, res_junction.values, rtol=1e-5)
+    assert np.allclose(net.res_pipe.values, res_pipe.values, rtol=1e-4, atol=1e-6)
+
+    with pytest.raises(UserWarning):
+        pandapipes.pipeflow(net, mode="bidirectional", bidirectional_formulation="monolithic")
@@ -0,0 +1,144 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapipes
+import pandapipes.networks.simple_gas_networks as nw_gas
+from pandapipes.pf.linear_solver import get_linear_solver
+from pandapipes.test.pipeflow_internals.test_inservice import create_test_net
+
+
+def _compare_with_pipeflow(net, **kwargs):
+    # friction results of pipes without flow depend on the solver tolerance, so only pressures
+    # and mass flows are compared
+    pipe_cols = ["p_from_bar", "p_to_bar", "mdot_from_kg_per_s", "mdot_to_kg_per_s"]
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe[pipe_cols].copy()
+    net_ref = copy.deepcopy(net)
+    pandapipes.pipeflow(net_ref, **kwargs)
+    assert np.allclose(res_junction.values, net_ref.res_junction.values, rtol=1e-6,
+                       equal_nan=True)
+    assert np.allclose(res_pipe.values, net_ref.res_pipe[pipe_cols].values, rtol=1e-5,
+                       atol=1e-6, equal_nan=True)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("init", ["flat", "results"])
+def test_pipeflow_session_setters(use_numba, init):
+    net = nw_gas.gas_meshed_delta()
+    session = pandapipes.PipeflowSession(net, use_numba=use_numba, init=init)
+    session.solve()
+    assert net.converged
+    _compare_with_pipeflow(net, use_numba=use_numba)
+
+    session.set_sink_mdot(net.sink.mdot_kg_per_s.values * 1.2)
+    session.solve()
+    _compare_with_pipeflow(net, use_numba=use_numba)
+
+    session.set_sink_mdot(0., index=net.sink.index[0])
+    session.set_ext_grid_p(net.ext_grid.p_bar.values * 0.98)
+    session.solve()
+    assert net.res_sink.at[net.sink.index[0], "mdot_kg_per_s"] == 0.
+    _compare_with_pipeflow(net, use_numba=use_numba)
+
+    with pytest.raises(UserWarning):
+        session.set_sink_mdot(0.1, index=[1000])
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_pipeflow_session_valve(monkeypatch, create_test_net, use_numba):
+    net = copy.deepcopy(create_test_net)
+    pandapipes.create_fluid_from_lib(net, "lgas")
+    pandapipes.create_source(net, 1, 0.05)
+    connectivity_calls = []
+    identify = pandapipes.pipeflow_session.identify_active_nodes_branches
+    monkeypatch.setattr(pandapipes.pipeflow_session, "identify_active_nodes_branches",
+                        lambda net: connectivity_calls.append(1) or identify(net))
+    session = pandapipes.PipeflowSession(net, use_numba=use_numba, init="auto")
+    session.solve()
+    _compare_with_pipeflow(net, use_numba=use_numba)
+    node_pit, active_node_pit = net["_pit"]["node"], net["_active_pit"]["node"]
+    assert len(active_node_pit) < len(node_pit)
+
+    # the setters patch the cached active pit, the connectivity is not identified again
+    session.set_source_mdot(0.08)
+    session.solve()
+    _compare_with_pipeflow(net, use_numba=use_numba)
+    assert net["_pit"]["node"] is node_pit and net["_active_pit"]["node"] is active_node_pit
+    assert len(connectivity_calls) == 1
+
+    session.set_valve_opened(True)
+    session.set_source_mdot(0.1)
+    session.solve()
+    assert np.all(net.valve.opened)
+    assert len(connectivity_calls) == 2
+    _compare_with_pipeflow(net, use_numba=use_numba)
+
+    # a pipeflow in between does not interfere with the session
+    net.valve.opened = False
+    pandapipes.pipeflow(net, use_numba=use_numba)
+    net.valve.opened = True
+    session.solve()
+    _compare_with_pipeflow(net, use_numba=use_numba)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_pipeflow_scenarios(monkeypatch, use_numba):
+    net = nw_gas.gas_meshed_delta()
+    sink_mdot = np.outer([0.8, 1., 1.2], net.sink.mdot_kg_per_s.values)
+    ext_grid_p = np.outer([1., 0.98, 1.02], net.ext_grid.p_bar.values)
+    sink_original = net.sink.mdot_kg_per_s.values.copy()
+
+    # record the size of the factorized matrices and whether the symbolic analysis is reused
+    solver_class = type(get_linear_solver("auto"))
+    factorize = solver_class.factorize
+    factorizations = []
+
+    def recording_factorize(self, matrix, symbolic=None):
+        factorizations.append((matrix.shape[0], symbolic is not None))
+        return factorize(self, matrix, symbolic)
+
+    monkeypatch.setattr(solver_class, "factorize", recording_factorize)
+    pandapipes.pipeflow(copy.deepcopy(net), use_numba=use_numba, linear_solver="auto")
+    single_size = factorizations[0][0]
+    factorizations.clear()
+    results = pandapipes.pipeflow_scenarios(net, sink_mdot=sink_mdot, ext_grid_p=ext_grid_p,
+                                            use_numba=use_numba)
+    monkeypatch.undo()
+    # the scenarios are solved as one batch, i.e. one system for all scenarios per iteration
+    assert all(size == 3 * single_size for size, _ in factorizations)
+    assert [reused for _, reused in factorizations] == [False] + [True] * (len(factorizations) - 1)
+    assert "_internal_data" not in net
+    assert np.all(results["converged"])
+    assert results["res_junction"]["p_bar"].shape == (3, len(net.junction))
+    assert np.array_equal(net.sink.mdot_kg_per_s.values, sink_original)
+
+    for scenario in range(3):
+        net_ref = copy.deepcopy(net)
+        net_ref.sink.mdot_kg_per_s = sink_mdot[scenario]
+        net_ref.ext_grid.p_bar = ext_grid_p[scenario]
+        pandapipes.pipeflow(net_ref, use_numba=use_numba)
+        assert np.allclose(results["res_junction"]["p_bar"][scenario],
+                           net_ref.res_junction.p_bar.values, rtol=1e-6)
+        assert np.allclose(results["res_sink"]["mdot_kg_per_s"][scenario],
+                           net_ref.res_sink.mdot_kg_per_s.values)
+        assert np.allclose(results["res_pipe"]["mdot_from_kg_per_s"][scenario],
+                           net_ref.res_pipe.mdot_from_kg_per_s.values, rtol=1e-4, atol=1e-5)
+
+    with pytest.raises(UserWarning):
+        pandapipes.pipeflow_scenarios(net, sink_mdot=sink_mdot[:, :-1])
+
+    # if the batch does not converge, the scenarios are calculated one after another
+    results = pandapipes.pipeflow_scenarios(net, sink_mdot=sink_mdot, use_numba=use_numba,
+                                            max_iter_hyd=2)
+    assert not np.any(results["converged"])
+    assert np.all(np.isnan(results["res_junction"]["p_bar"]))
+
+
+if __name__ == '__main__':
+    pytest.main([r'pandapipes/test/pipeflow_internals/test_pipeflow_session.py'])
@@ -0,0 +1,66 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+import copy
+
+import numpy as np
+import pytest
+
+import pandapipes
+import pandapipes.networks.simple_water_networks as nw_water
+from pandapipes.networks import synthetic_gas_network, synthetic_water_network
+
+
+def _compare_with_sparse_solver(net, **kwargs):
+    res_junction = net.res_junction.copy()
+    res_pipe = net.res_pipe.copy()
+    iterations = net._internal_results["iterations_hydraulics"]
+    net_ref = copy.deepcopy(net)
+    pandapipes.pipeflow(net_ref, radial_solver=False, **kwargs)
+    assert net_ref._internal_results["iterations_hydraulics"] == iterations
+    assert np.allclose(res_junction.values, net_ref.res_junction.values, rtol=1e-10,
+                       equal_nan=True)
+    assert np.allclose(res_pipe.values, net_ref.res_pipe.values, rtol=1e-8, atol=1e-12,
+                       equal_nan=True)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("nonlinear_method", ["constant", "linesearch"])
+def test_radial_solver_gas(use_numba, nonlinear_method):
+    net = synthetic_gas_network(300, pressure_levels_bar=(0.1,), loop_ratio=0., seed=1)
+    pandapipes.pipeflow(net, use_numba=use_numba, nonlinear_method=nonlinear_method,
+                        radial_solver=True)
+    assert net._internal_results["linear_solver"] == "radial_sweep"
+    _compare_with_sparse_solver(net, use_numba=use_numba, nonlinear_method=nonlinear_method)
+
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_radial_solver_water(use_numba):
+    net = synthetic_water_network(300, loop_ratio=0., seed=2)
+    # a second supply area and an out of service pipe, which splits off a part without supply
+    j = pandapipes.create_junctions(net, 3, pn_bar=5., tfluid_k=293.15)
+    pandapipes.create_ext_grid(net, j[0], p_bar=5., t_k=293.15)
+    pandapipes.create_pipes_from_parameters(net, j[:2], j[1:], length_km=0.2, diameter_m=0.1)
+    pandapipes.create_sink(net, j[2], mdot_kg_per_s=0.5)
+    net.pipe.loc[net.pipe.index[10], "in_service"] = False
+    pandapipes.pipeflow(net, use_numba=use_numba, radial_solver="auto")
+    assert net._internal_results["linear_solver"] == "radial_sweep"
+    _compare_with_sparse_solver(net, use_numba=use_numba)
+
+    # by default, the chosen linear solver is used for radial nets as well
+    pandapipes.pipeflow(net, use_numba=use_numba, linear_solver="superlu")
+    assert net._internal_results["linear_solver"] == "superlu"
+
+
+def test_radial_solver_meshed():
+    net = nw_water.water_meshed_delta()
+    pandapipes.pipeflow(net, max_iter_hyd=30, radial_solver="auto")
+    assert net._internal_results["linear_solver"] != "radial_sweep"
+
+    with pytest.raises(UserWarning):
+        pandapipes.pipeflow(net, radial_solver=True)
+
+
+if __name__ == '__main__':
+    pytest.main([r'pandapipes/test/pipeflow_internals/test_radial_solver.py'])
@@ -2,18 +2,21 @@
 # and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
+import copy
 import os
 import tempfile
 
 import numpy as np
 import pandapower.control as control
+from pandapower.control.basic_controller import Controller
 import pandas as pd
 import pytest
 from pandapower.timeseries import OutputWriter, DFData
 
 from pandapipes import networks as nw
 from pandapipes import pp_dir
-from pandapipes.timeseries import run_timeseries, init_default_outputwriter
+from pandapipes.timeseries import run_timeseries, run_timeseries_parallel, \
+    init_default_outputwriter
 from pandapipes.test import data_path
 
 try:
@@ -176,5 +179,62 @@ def test_time_series_default_ow():
     _compare_results(ow)
 
 
+def test_time_series_parallel():
+    net = nw.gas_versatility()
+    _prepare_grid(net)
+    time_steps = range(25)
+    _output_writer(net, time_steps, ow_path=tempfile.gettempdir())
+    run_timeseries_parallel(net, time_steps, n_workers=3, max_iter_hyd=8,
+                            calc_compression_power=False, init="flat")
+    ow = net.output_writer.iat[0, 0]
+    _compare_results(ow)
+    assert not np.any(ow.output["Parameters"].powerflow_failed)
+    assert np.array_equal(ow.output["res_junction.p_bar"].index, time_steps)
+
+    # with warm start (default), the results are equal within the solver tolerance
+    res_ext_grid = ow.np_results["res_ext_grid.mdot_kg_per_s"].copy()
+    run_timeseries_parallel(net, time_steps, n_workers=3, max_iter_hyd=8,
+                            calc_compression_power=False)
+    assert np.allclose(ow.np_results["res_ext_grid.mdot_kg_per_s"], res_ext_grid, atol=1e-5)
+
+
+class _RampControl(Controller):
+    """
+    Raises the pressure of the external grid with every time step, i.e. carries a state from one
+    time step to the next.
+    """
+    def __init__(self, net, **kwargs):
+        super().__init__(net, **kwargs)
+        self.p_bar = net.ext_grid.p_bar.values.copy()
+        self.steps = 0
+
+    def time_step(self, net, time):
+        self.steps += 1
+        net.ext_grid.p_bar = self.p_bar + 0.01 * self.steps
+
+    def is_converged(self, net):
+        return True
+
+
+def test_time_series_parallel_stateful_controller():
+    net = nw.gas_versatility()
+    _prepare_grid(net)
+    time_steps = range(10)
+    _output_writer(net, time_steps, ow_path=tempfile.gettempdir())
+    ow = net.output_writer.iat[0, 0]
+    net_seq = copy.deepcopy(net)
+    _RampControl(net_seq)
+    run_timeseries(net_seq, time_steps, max_iter_hyd=8, calc_compression_power=False)
+    res_junction = net_seq.output_writer.iat[0, 0].np_results["res_junction.p_bar"]
+
+    # the stateful controller cannot be split into chunks, so the time series is calculated
+    # sequentially and the results equal those of run_timeseries
+    _RampControl(net)
+    run_timeseries_parallel(net, time_steps, n_workers=3, max_iter_hyd=8,
+                            calc_compression_power=False)
+    assert np.allclose(ow.np_results["res_junction.p_bar"], res_junction)
+    assert net.controller.object.at[2].steps == len(time_steps)
+
+
 if __name__ == "__main__":
     pytest.main(test_time_series())
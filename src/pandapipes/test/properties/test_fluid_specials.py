@@ -2,9 +2,15 @@
 # and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
+import numpy as np
 import pytest
+from scipy.interpolate import interp1d
+
 import pandapipes
-from pandapipes.properties.fluids import _add_fluid_to_net
+import pandapipes.properties.fluids
+from pandapipes.networks import synthetic_heat_network
+from pandapipes.properties.fluids import _add_fluid_to_net, FluidPropertyInterExtra, \
+    FluidPropertyCache
 
 
 def test_add_fluid():
@@ -63,5 +69,93 @@ def test_fluid_exceptions():
         pandapipes.call_lib("natural_gas")
 
 
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_interpolated_property(monkeypatch, use_numba):
+    if not use_numba:
+        monkeypatch.setattr(pandapipes.properties.fluids, "numba_installed", False)
+    rng = np.random.default_rng(0)
+    x_values = rng.permutation(np.linspace(263., 373., 12))
+    y_values = rng.normal(1000., 10., 12)
+    at_values = np.concatenate([rng.uniform(200., 450., 100), x_values, [np.nan]])
+
+    prop = FluidPropertyInterExtra(x_values, y_values)
+    reference = interp1d(x_values, y_values, fill_value="extrapolate")
+    assert np.array_equal(prop.get_at_value(at_values), reference(at_values), equal_nan=True)
+    assert np.shape(prop.get_at_value(300.)) == np.shape(reference(300.))
+    assert prop.get_at_value([[300., 500.]]).shape == (1, 2)
+
+    prop = FluidPropertyInterExtra(x_values, y_values, method="interpolate")
+    assert np.allclose(prop.get_at_value(x_values), y_values)
+    with pytest.raises(ValueError, match="below the interpolation range"):
+        prop.get_at_value([300., 200.])
+    with pytest.raises(ValueError, match="above the interpolation range"):
+        prop.get_at_value(400.)
+
+    # the json format is the same as with the formerly used interp1d object
+    net = pandapipes.create_empty_network(fluid="lgas")
+    pandapipes.get_fluid(net).add_property("density", prop)
+    density = pandapipes.get_fluid(pandapipes.from_json_string(pandapipes.to_json(net))) \
+        .all_properties["density"]
+    assert not density.extrapolate
+    assert np.array_equal(density.get_at_value(x_values), prop.get_at_value(x_values))
+    assert set(prop.to_dict().keys()) == {"x", "y", "_fill_value_orig"}
+
+
+def test_fluid_property_cache(monkeypatch):
+    fluid = pandapipes.call_lib("water")
+    evaluations = []
+    get_at_value = FluidPropertyInterExtra.get_at_value
+
+    def counted_get_at_value(self, arg):
+        evaluations.append(arg)
+        return get_at_value(self, arg)
+
+    monkeypatch.setattr(FluidPropertyInterExtra, "get_at_value", counted_get_at_value)
+    cache = FluidPropertyCache(fluid)
+    assert not cache.is_gas
+    temperatures = np.array([283., 293., 303.])
+    density = cache.get_density(temperatures)
+    assert np.array_equal(density, fluid.get_density(temperatures))
+    evaluations.clear()
+
+    # same values (also in a new array) -> no new evaluation
+    assert cache.get_density(temperatures.copy()) is density
+    assert len(evaluations) == 0
+    # changed values or a replaced property -> new evaluation
+    temperatures[0] = 288.
+    assert np.array_equal(cache.get_density(temperatures), fluid.get_density(temperatures))
+    assert len(evaluations) == 2
+    fluid.add_property("density", pandapipes.FluidPropertyConstant(1000.), warn_on_duplicates=False)
+    assert np.allclose(cache.get_density(temperatures), 1000.)
+
+
+@pytest.mark.parametrize("mode", ["hydraulics", "sequential", "bidirectional"])
+def test_fluid_property_cache_pipeflow(monkeypatch, mode):
+    net = synthetic_heat_network(50, seed=0)
+    pandapipes.pipeflow(net, mode=mode)
+    res_junction, res_pipe = net.res_junction.copy(), net.res_pipe.copy()
+
+    evaluations = []
+    get_at_value = FluidPropertyInterExtra.get_at_value
+
+    def counted_get_at_value(self, arg):
+        evaluations.append(arg)
+        return get_at_value(self, arg)
+
+    monkeypatch.setattr(FluidPropertyInterExtra, "get_at_value", counted_get_at_value)
+    pandapipes.pipeflow(net, mode=mode)
+    cached_evaluations = len(evaluations)
+    assert net.res_junction.equals(res_junction)
+    assert net.res_pipe.equals(res_pipe)
+
+    # without the cache, the properties are evaluated more often
+    evaluations.clear()
+    monkeypatch.setattr(pandapipes.properties.fluids.FluidPropertyCache, "size", 0)
+    pandapipes.pipeflow(net, mode=mode)
+    assert len(evaluations) >= cached_evaluations
+    if mode == "hydraulics":
+        assert len(evaluations) > cached_evaluations
+
+
 if __name__ == '__main__':
     pytest.main(["test_fluid_specials.py"])
@@ -5,6 +5,8 @@
 
 import importlib.util
 import os
+import subprocess
+import sys
 
 import pytest
 from pandapipes import pp_dir
@@ -25,5 +27,22 @@ def test_import_packages():
     assert True
 
 
+def test_lazy_imports():
+    # run in a new interpreter, as the subpackages are already imported by other tests
+    code = "\n".join([
+        "import sys",
+        "import pandapipes",
+        "lazy = ['pandapipes.plotting', 'pandapipes.topology', 'pandapipes.multinet.control',",
+        "        'pandapipes.multinet.timeseries']",
+        "assert not any(m in sys.modules for m in lazy), [m for m in lazy if m in sys.modules]",
+        "assert callable(pandapipes.plotting.simple_plot)",
+        "assert callable(pandapipes.create_nxgraph)",
+        "assert callable(pandapipes.multinet.run_control)",
+        "from pandapipes.multinet import run_timeseries",
+        "assert all(m in sys.modules for m in lazy)",
+        "assert 'plotting' in dir(pandapipes)"])
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
 if __name__ == '__main__':
     pytest.main(["test_imports.py"])
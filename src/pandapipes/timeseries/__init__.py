@@ -2,5 +2,5 @@
 # and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
-from pandapipes.timeseries.run_time_series import run_timeseries
+from pandapipes.timeseries.run_time_series import run_timeseries, run_timeseries_parallel
 from pandapipes.timeseries.run_time_series import init_default_outputwriter
@@ -2,9 +2,12 @@
 # and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
 # Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
 
+import os
 import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
-from pandapower.control import NetCalculationNotConverged
+import numpy as np
+from pandapower.control import ConstControl, NetCalculationNotConverged
 
 from pandapipes.pipeflow import PipeflowNotConverged, pipeflow
 from pandapower.control.util.diagnostic import control_diagnostic
@@ -126,3 +129,118 @@ def run_timeseries(net, time_steps=None, continue_on_divergence=False, verbose=T
 
     # cleanup functions after the last time step was calculated
     cleanup(net, ts_variables)
+
+
+def _run_timeseries_chunk(net, time_steps, continue_on_divergence, kwargs):
+    """
+    Runs the time series calculation for a chunk of time steps in a worker process of
+    :func:`run_timeseries_parallel`.
+
+    :param net: The copy of the pandapipes net for this chunk
+    :type net: pandapipesNet
+    :param time_steps: Time steps of the chunk
+    :type time_steps: list
+    :param continue_on_divergence: If True, time series calculation continues in case of errors.
+    :type continue_on_divergence: bool
+    :param kwargs: Keyword arguments for run_control and runpp
+    :type kwargs: dict
+    :return: np_results, parameters - the logged results and the "Parameters" output of the \
+            output writer of the chunk
+    :rtype: dict, pandas.DataFrame
+    """
+    output_writer = net.output_writer.iat[0, 0]
+    # the results are written by the main process after merging the chunks
+    output_writer.output_path = None
+    output_writer.write_time = None
+    run_timeseries(net, time_steps, continue_on_divergence, verbose=False, **kwargs)
+    return output_writer.np_results, output_writer.output["Parameters"]
+
+
+def _stateful_controllers(net):
+    """
+    Returns the indices of all controllers of the net that may carry states from one time step
+    to the next. Only controllers of type ConstControl and controllers with the attribute
+    ``stateless = True`` are regarded as stateless.
+
+    :param net: The pandapipes format network
+    :type net: pandapipesNet
+    :return: indices of the controllers that are not known to be stateless
+    :rtype: list
+    """
+    if "controller" not in net or net.controller.empty:
+        return []
+    return [idx for idx, ctrl in net.controller.object.items()
+            if type(ctrl) is not ConstControl and not getattr(ctrl, "stateless", False)]
+
+
+def run_timeseries_parallel(net, time_steps=None, n_workers=None, continue_on_divergence=False,
+                            verbose=True, **kwargs):
+    """
+    Time series calculation in parallel worker processes.
+
+    The time steps are split into one contiguous chunk per worker. Each worker calculates its
+    chunk with :func:`run_timeseries` on its own copy of the net, with the pipeflow of each time
+    step started from the results of the previous one (option "init" is set to "auto" if not
+    given). The results of the output writers of all chunks are merged in time order into the
+    output writer of the net, which is then written as in :func:`run_timeseries`.
+
+    .. note:: Every chunk starts from the initial state of the net. Therefore, the time steps \
+        have to be independent of each other, i.e. the controllers must not carry states from one \
+        time step to the next. Only ConstControl and controllers with the attribute \
+        ``stateless = True`` are regarded as such. If the net contains any other controller, the \
+        time series is calculated sequentially with :func:`run_timeseries` instead. The net, its \
+        controllers and the output writer have to be picklable. The input and result tables of \
+        the net itself are not changed by the parallel calculation.
+
+    :param net: The pandapipes format network
+    :type net: pandapipesNet
+    :param time_steps: Time steps to calculate as list or tuple (start, stop). If None, all time \
+            steps from provided data source are simulated.
+    :type time_steps: list or tuple, default None
+    :param n_workers: Number of worker processes. If None, the number of CPUs is used.
+    :type n_workers: int, default None
+    :param continue_on_divergence: If True, time series calculation continues in case of errors.
+    :type continue_on_divergence: bool, default False
+    :param verbose: If True, the progress of the chunks is logged
+    :type verbose: bool, default True
+    :param kwargs: Keyword arguments for run_control and runpp
+    :type kwargs: dict
+    :return: No output
+    """
+    stateful = _stateful_controllers(net)
+    if len(stateful):
+        logger.warning("The controllers %s may carry states from one time step to the next, so "
+                       "the time steps cannot be split into independent chunks. The time series "
+                       "is calculated sequentially with run_timeseries instead." % stateful)
+        run_timeseries(net, time_steps, continue_on_divergence, verbose, **kwargs)
+        return
+
+    ts_variables = init_time_series(net, time_steps, continue_on_divergence, False, **kwargs)
+    control_diagnostic(net)
+    time_steps = list(ts_variables["time_steps"])
+    output_writer = net.output_writer.iat[0, 0]
+
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    if "run" not in kwargs:
+        kwargs.setdefault("init", "auto")
+    chunks = [[int(ts) for ts in chunk]
+              for chunk in np.array_split(time_steps, min(n_workers, len(time_steps)))]
+    position = {ts: pos for pos, ts in enumerate(time_steps)}
+
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        futures = [executor.submit(_run_timeseries_chunk, net, chunk, continue_on_divergence,
+                                   kwargs) for chunk in chunks]
+        for i, (chunk, future) in enumerate(zip(chunks, futures)):
+            np_results, parameters = future.result()
+            rows = [position[ts] for ts in chunk]
+            for name, values in np_results.items():
+                output_writer.np_results[name][rows] = values
+            output_writer.output["Parameters"].loc[chunk] = parameters.loc[chunk].values
+            if verbose:
+                logger.info("Time series chunk %d of %d (time steps %s to %s) finished."
+                            % (i + 1, len(chunks), chunk[0], chunk[-1]))
+
+    output_writer.time_step = time_steps[-1]
+    output_writer.dump(net)
+    cleanup(net, ts_variables)
@@ -7,7 +7,6 @@ from collections.abc import Iterable
 
 import numpy as np
 import pandas as pd
-from networkx import has_path
 from pandapower.auxiliary import get_indices
 from pandapower.toolbox import dataframes_equal
 from pandapower.toolbox.result_info import clear_result_tables
@@ -20,7 +19,6 @@ from pandapipes.idx_branch import branch_cols
 from pandapipes.idx_node import node_cols, \
     T as TYPE_T, P as TYPE_P, PC as TYPE_PC, L as TYPE_L
 from pandapipes.pandapipes_net import pandapipesNet
-from pandapipes.topology import create_nxgraph
 
 try:
     import pandaplan.core.pplog as logging
@@ -498,6 +496,8 @@ def drop_pipes(net, pipes):
 
 
 def check_pressure_controllability(net, to_junction, controlled_junction):
+    from networkx import has_path
+    from pandapipes.topology import create_nxgraph
     mg = create_nxgraph(net, include_pressure_circ_pumps=False, include_compressors=False,
                         include_mass_circ_pumps=False, include_press_controls=False)
     return has_path(mg, to_junction, controlled_junction)
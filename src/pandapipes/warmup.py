@@ -0,0 +1,119 @@
+# Copyright (c) 2020-2024 by Fraunhofer Institute for Energy Economics
+# and Energy System Technology (IEE), Kassel, and University of Kassel. All rights reserved.
+# Use of this source code is governed by a BSD-style license that can be found in the LICENSE file.
+
+from time import perf_counter
+
+import pandapipes.pf.coupled_formulation as coupled_formulation
+import pandapipes.pf.internals_toolbox as internals_toolbox
+import pandapipes.pf.radial_solver as radial_solver
+import pandapipes.pf.result_extraction as result_extraction
+from pandapipes.create import create_empty_network, create_junctions, create_ext_grid, \
+    create_pipes_from_parameters, create_sink, create_fluid_from_lib
+from pandapipes.pipeflow import pipeflow
+from pandapipes.properties import fluids
+
+try:
+    from numba.core.dispatcher import Dispatcher
+    numba_installed = True
+except ImportError:
+    numba_installed = False
+
+try:
+    import pandaplan.core.pplog as logging
+except ImportError:
+    import logging
+
+logger = logging.getLogger(__name__)
+
+# calculations that are run by the warm-up: name -> (fluid, meshed, pipeflow options)
+WARMUP_CASES = {
+    "hydraulics_liquid": ("water", True, {"mode": "hydraulics"}),
+    "hydraulics_liquid_colebrook": ("water", True, {"mode": "hydraulics",
+                                                    "friction_model": "colebrook"}),
+    "hydraulics_liquid_radial": ("water", False, {"mode": "hydraulics", "radial_solver": "auto"}),
+    "hydraulics_gas": ("lgas", True, {"mode": "hydraulics"}),
+    "hydraulics_gas_colebrook": ("lgas", True, {"mode": "hydraulics",
+                                                "friction_model": "colebrook"}),
+    "hydraulics_gas_radial": ("lgas", False, {"mode": "hydraulics", "radial_solver": "auto"}),
+    "sequential_liquid": ("water", True, {"mode": "sequential"}),
+    "bidirectional_liquid": ("water", True, {"mode": "bidirectional"}),
+    "bidirectional_coupled_liquid": ("water", True, {"mode": "bidirectional",
+                                                     "bidirectional_formulation": "coupled"}),
+}
+
+
+def _numba_kernels():
+    """
+    Returns all numba kernels of the internal calculation with a unique name.
+    """
+    from pandapipes.pf import derivative_toolbox_numba
+    kernels = dict()
+    for module in [derivative_toolbox_numba, internals_toolbox, result_extraction, radial_solver,
+                   coupled_formulation, fluids]:
+        for name, obj in vars(module).items():
+            if isinstance(obj, Dispatcher):
+                kernels["%s.%s" % (module.__name__.split(".")[-1], name)] = obj
+    return kernels
+
+
+def _warmup_net(fluid, meshed):
+    """
+    Creates a small net with four junctions (meshed with a ring of three pipes or radial) that is
+    used for the warm-up calculations.
+    """
+    gas = fluid != "water"
+    net = create_empty_network(fluid=fluid)
+    create_fluid_from_lib(net, fluid, overwrite=True)
+    j = create_junctions(net, 4, pn_bar=0.1 if gas else 5., tfluid_k=330.)
+    create_ext_grid(net, j[0], p_bar=0.1 if gas else 5., t_k=350.)
+    from_junctions, to_junctions = [j[0], j[1], j[2]], [j[1], j[2], j[3]]
+    if meshed:
+        from_junctions.append(j[0])
+        to_junctions.append(j[2])
+    create_pipes_from_parameters(net, from_junctions, to_junctions, length_km=0.5,
+                                 diameter_m=0.1, k_mm=0.1, u_w_per_m2k=2., text_k=285.)
+    create_sink(net, j[3], mdot_kg_per_s=0.02 if gas else 1.)
+    return net
+
+
+def warmup(parallel=False):
+    """
+    Compiles all numba kernels of the internal calculation by running a set of small pipeflow
+    calculations (hydraulic and thermal, liquid and gas, meshed and radial nets, c.f.
+    WARMUP_CASES), so that the first pipeflow of an application does not contain the
+    compilation. Kernels with a fixed signature are already compiled when they are imported, all
+    kernels are stored in numba's on-disk cache, so that they are only loaded from the cache in
+    further python processes.
+
+    :param parallel: If True, the parallel variants of the kernels (c.f. the option \
+            **numba_threads**) are compiled as well.
+    :type parallel: bool, default False
+    :return: compile_times - the compile time of every kernel in seconds (0 if the kernel was \
+            loaded from the cache or is not used in any of the warm-up calculations)
+    :rtype: dict
+    """
+    if not numba_installed:
+        logger.warning("numba is not installed, so that there is nothing to warm up.")
+        return dict()
+
+    options = {"numba_threads": 0} if parallel else dict()
+    parallel_min_length = internals_toolbox.PARALLEL_MIN_LENGTH
+    if parallel:
+        # the parallel kernels are only used for large nets otherwise
+        internals_toolbox.PARALLEL_MIN_LENGTH = 0
+    try:
+        for case, (fluid, meshed, case_options) in WARMUP_CASES.items():
+            start = perf_counter()
+            pipeflow(_warmup_net(fluid, meshed), use_numba=True, **case_options, **options)
+            logger.info("warm-up calculation %s took %.3f s" % (case, perf_counter() - start))
+    finally:
+        internals_toolbox.PARALLEL_MIN_LENGTH = parallel_min_length
+
+    compile_times = dict()
+    for name, kernel in _numba_kernels().items():
+        timers = [metadata["timers"] for metadata in kernel.get_metadata().values()
+                  if metadata is not None and "timers" in metadata]
+        compile_times[name] = sum(t.get("compiler_lock", 0.) for t in timers)
+    logger.info("compile time of the numba kernels: %.3f s" % sum(compile_times.values()))
+    return compile_times